@@ -0,0 +1,103 @@
+"""Startup benchmark for the ``agent-feedback`` CLI.
+
+Times ``submit`` and JSON ``query`` end to end (a fresh interpreter per
+call, as an agent's tool call would be) against a scratch store, both with
+the store opened directly and with an ``agent-feedback serve`` daemon
+answering, and optionally shows the slowest imports of a ``submit`` from
+``python -X importtime``.
+
+    python benchmarks/startup.py [--runs N] [--importtime]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from agent_feedback.client import request
+
+CLI = [sys.executable, "-m", "agent_feedback.cli"]
+
+
+def submit_args(i: int) -> list[str]:
+    return [
+        "submit",
+        "--agent-id", f"agent-{i % 3}",
+        "--task-type", "bench",
+        "--category", "tip",
+        "--title", f"Benchmark tip number {i}",
+        "--detail", f"Distinct detail text {i} so nothing merges",
+    ]
+
+
+def time_runs(args_for_run, runs: int, env: dict[str, str]) -> list[float]:
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        subprocess.run([*CLI, *args_for_run(i)], env=env, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list[float]) -> None:
+    print(f"  {label:<8} median {statistics.median(timings):7.1f} ms   min {min(timings):7.1f} ms")
+
+
+def bench(env: dict[str, str], runs: int) -> None:
+    report("submit", time_runs(submit_args, runs, env))
+    report("query", time_runs(lambda i: ["query", "--task-type", "bench"], runs, env))
+
+
+def importtime(env: dict[str, str], top: int = 15) -> None:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "agent_feedback.cli", *submit_args(0)],
+        env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _self, cumulative, name = line[len("import time:"):].split("|")
+            rows.append((int(cumulative), name.rstrip()))
+    print(f"Slowest imports of submit (cumulative µs, top {top}):")
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative:>9}  {name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="Invocations per command")
+    parser.add_argument("--importtime", action="store_true", help="Also break down import time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Path(tmp) / "feedback.jsonl"
+        socket = str(Path(tmp) / "bench.sock")
+        env = {**os.environ, "AGENT_FEEDBACK_STORE": str(store), "AGENT_FEEDBACK_SOCKET": socket}
+
+        print(f"Direct store access ({args.runs} runs):")
+        bench(env, args.runs)
+        if args.importtime:
+            importtime(env)
+
+        daemon = subprocess.Popen([*CLI, "serve"], env=env, stdout=subprocess.DEVNULL)
+        try:
+            deadline = time.monotonic() + 10
+            while request(socket, "ping") is None:
+                if time.monotonic() > deadline:
+                    sys.exit("daemon did not start")
+                time.sleep(0.05)
+            print(f"Through the daemon ({args.runs} runs):")
+            bench(env, args.runs)
+            if args.importtime:
+                importtime(env)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,24 @@ from pathlib import Path
 
 import click
 
+from agent_feedback.adapters import RunPolicy
+from agent_feedback.batch import LEDGER_NAME, Manifest, RunSpec, pending_runs, run_batch
+from agent_feedback.checkpoint import ResumeError
+from agent_feedback.dedupe import dedupe_index_path
 from agent_feedback.orchestrator import run_demo
-from agent_feedback.store import JSONLStore
+from agent_feedback.prompt_builder import DEFAULT_TIP_BUDGET
+from agent_feedback.retention import parse_duration
+from agent_feedback.store import open_store
+from agent_feedback.workspace import LINK_MODES
+
+
+def _seconds(ctx: click.Context, param: click.Parameter, value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return parse_duration(value).total_seconds()
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from exc
 
 
 @click.group()
@@ -14,38 +30,131 @@ def cli() -> None:
 
 @cli.command()
 @click.option("--task", required=True, type=click.Path(exists=True, path_type=Path), help="Path to task markdown file")
-@click.option("--agents", default=3, type=int, help="Number of agents to run sequentially")
+@click.option("--agents", default=3, type=int, help="Number of agents to run")
+@click.option(
+    "--parallel",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Agents run at once; each wave learns from the tips of the waves before it",
+)
 @click.option("--adapter", "adapter_name", default="claude-code", help="Adapter name (claude-code, cursor, pi)")
-@click.option("--store", "store_path", default="feedback_data/feedback.jsonl", type=click.Path(path_type=Path), help="Store path")
+@click.option("--store", "store_path", default="feedback_data/feedback.jsonl", type=click.Path(path_type=Path), help="Store path (.jsonl, or .db/.sqlite for SQLite)")
 @click.option("--workspace", "workspace_dir", default="workspace", type=click.Path(path_type=Path), help="Workspace directory")
 @click.option("--no-reset", is_flag=True, help="Don't clear store/workspace before running")
+@click.option("--resume", is_flag=True, help="Carry on from the last finished agent of an interrupted run")
+@click.option(
+    "--template",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory tree each agent's workspace starts from",
+)
+@click.option(
+    "--link-mode",
+    type=click.Choice(LINK_MODES),
+    default="auto",
+    show_default=True,
+    help="How template files are provisioned: reflink, hardlink (shared; for read-only files) or copy",
+)
+@click.option(
+    "--tip-budget",
+    default=DEFAULT_TIP_BUDGET,
+    type=click.IntRange(min=0),
+    show_default=True,
+    help="Estimated tokens of previous agents' tips per prompt, most relevant first (0: no limit)",
+)
+@click.option("--no-condense", is_flag=True, help="List every tip on its own instead of condensing related ones")
+@click.option("--timeout", callback=_seconds, help="Stop an agent that runs longer than this, e.g. 30m")
+@click.option("--idle-timeout", callback=_seconds, help="Stop an agent that prints nothing for this long, e.g. 5m")
+@click.option("--retries", default=0, type=click.IntRange(min=0), show_default=True, help="Retries for an agent that fails or times out")
+@click.option(
+    "--retry-backoff",
+    default="5s",
+    callback=_seconds,
+    show_default=True,
+    help="Wait before the first retry, doubled before each next one",
+)
 def demo(
     task: Path,
     agents: int,
+    parallel: int,
     adapter_name: str,
     store_path: Path,
     workspace_dir: Path,
     no_reset: bool,
+    resume: bool,
+    template: Path | None,
+    link_mode: str,
+    tip_budget: int,
+    no_condense: bool,
+    timeout: float | None,
+    idle_timeout: float | None,
+    retries: int,
+    retry_backoff: float,
 ) -> None:
     """Run the multi-agent demo."""
-    asyncio.run(
-        run_demo(
-            task_path=task,
-            adapter_name=adapter_name,
-            num_agents=agents,
-            store_path=store_path,
-            workspace_dir=workspace_dir,
-            reset=not no_reset,
+    try:
+        asyncio.run(
+            run_demo(
+                task_path=task,
+                adapter_name=adapter_name,
+                num_agents=agents,
+                store_path=store_path,
+                workspace_dir=workspace_dir,
+                reset=not no_reset,
+                tip_budget=tip_budget or None,
+                condense=not no_condense,
+                parallel=parallel,
+                policy=RunPolicy(wall_timeout=timeout, idle_timeout=idle_timeout, retries=retries, backoff=retry_backoff),
+                template=template,
+                link_mode=link_mode,
+                resume=resume,
+            )
         )
-    )
+    except ResumeError as exc:
+        raise click.UsageError(str(exc)) from exc
+
+
+@cli.command()
+@click.argument("manifest_path", metavar="MANIFEST", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--concurrency", type=click.IntRange(min=1), help="Runs at once (default: the manifest's)")
+@click.option("--dry-run", is_flag=True, help="List the runs and which are already done, then stop")
+def batch(manifest_path: Path, concurrency: int | None, dry_run: bool) -> None:
+    """Run the demo over a manifest's task × adapter × agent-count matrix."""
+    try:
+        manifest = Manifest.load(manifest_path)
+    except ValueError as exc:
+        raise click.UsageError(f"{manifest_path}: {exc}") from exc
+    todo, done = pending_runs(manifest)
+    if dry_run:
+        for spec in manifest.runs():
+            click.echo(f"{'done' if spec in done else 'todo'}  {spec.run_id}")
+        click.echo(f"{len(todo)} to run, {len(done)} done")
+        return
+    click.echo(f"{len(todo)} runs to go, {len(done)} already done; ledger: {manifest.output / LEDGER_NAME}")
+
+    def report(kind: str, spec: RunSpec, record: dict | None) -> None:
+        if record is None:
+            click.echo(f"▶ {spec.run_id}")
+        elif record["status"] == "error":
+            click.echo(f"✗ {spec.run_id} ({record['duration_s']:.0f}s): {record['error']}", err=True)
+        else:
+            failed = f", {len(record['failed_agents'])} agents failed" if record["failed_agents"] else ""
+            click.echo(f"✓ {spec.run_id} ({record['duration_s']:.0f}s): {record['total_tips']} tips{failed}")
+
+    records = asyncio.run(run_batch(manifest, concurrency, on_event=report))
+    errors = sum(1 for r in records if r["status"] == "error")
+    click.echo(f"Finished {len(records)} runs, {errors} with errors.")
+    if errors:
+        raise SystemExit(1)
 
 
 @cli.command()
 @click.option("--store", "store_path", default="feedback_data/feedback.jsonl", type=click.Path(path_type=Path))
 def reset(store_path: Path) -> None:
     """Reset the feedback store."""
-    store = JSONLStore(store_path)
+    store = open_store(store_path)
     store.clear()
+    # Its saved cursor points into the old file; leaving it would break the next merge.
+    dedupe_index_path(store_path).unlink(missing_ok=True)
     click.echo("✓ Feedback store cleared.")
 
 
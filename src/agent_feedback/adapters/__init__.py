@@ -1,4 +1,4 @@
-from agent_feedback.adapters.base import AgentAdapter, AgentResult
+from agent_feedback.adapters.base import AgentAdapter, AgentResult, RunPolicy
 from agent_feedback.adapters.claude_code import ClaudeCodeAdapter
 from agent_feedback.adapters.cursor import CursorAdapter
 from agent_feedback.adapters.pi import PiAdapter
@@ -1,8 +1,14 @@
+import asyncio
+import os
+import signal
 from abc import ABC, abstractmethod
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
 
+# Agents print long tool results on a single line.
+STREAM_LIMIT = 10 * 1024 * 1024
+
 
 @dataclass
 class AgentResult:
@@ -10,11 +16,63 @@ class AgentResult:
     output: str
     feedback_submitted: int = 0
     error: str | None = None
+    # "wall" or "idle" when that time limit ended the run.
+    timed_out: str | None = None
+    attempts: int = 1
+
+
+@dataclass(frozen=True)
+class RunPolicy:
+    """Time limits and retries for an agent's run; times are in seconds.
+
+    ``wall_timeout`` bounds a whole attempt, ``idle_timeout`` the silence
+    between two lines of output. A run past either gets SIGTERM, and
+    ``kill_grace`` seconds later SIGKILL, sent to its whole process group.
+    A failed or timed-out attempt is retried up to ``retries`` times,
+    waiting ``backoff`` seconds before the first retry and twice as long
+    before each next one, up to ``max_backoff``.
+    """
+
+    wall_timeout: float | None = None
+    idle_timeout: float | None = None
+    kill_grace: float = 10.0
+    retries: int = 0
+    backoff: float = 5.0
+    max_backoff: float = 300.0
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after failed attempt number ``attempt`` (counting from 1)."""
+        return min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+
+
+@dataclass
+class ProcessOutcome:
+    returncode: int | None
+    stderr: str = ""
+    timed_out: str | None = None
+    limit: float | None = field(default=None, repr=False)
+
+    @property
+    def success(self) -> bool:
+        return self.returncode == 0 and self.timed_out is None
+
+    @property
+    def error(self) -> str | None:
+        if self.timed_out == "idle":
+            return f"Timed out: no output for {self.limit:g}s; process tree terminated"
+        if self.timed_out == "wall":
+            return f"Timed out after {self.limit:g}s; process tree terminated"
+        if self.returncode != 0:
+            return self.stderr or f"Exited with status {self.returncode}"
+        return None
 
 
 class AgentAdapter(ABC):
     """Abstract base for any coding agent harness."""
 
+    def __init__(self, policy: RunPolicy | None = None) -> None:
+        self.policy = policy or RunPolicy()
+
     @abstractmethod
     async def run(
         self,
@@ -34,3 +92,120 @@ class AgentAdapter(ABC):
           "error"    — error output
         """
         ...
+
+    async def run_with_retries(
+        self,
+        prompt: str,
+        work_dir: Path,
+        on_stream: Callable[[str, str], Awaitable[None] | None],
+        env: dict[str, str] | None = None,
+    ) -> AgentResult:
+        """``run``, retried with backoff as ``self.policy`` allows."""
+        attempt = 1
+        while True:
+            result = await self.run(prompt, work_dir, on_stream, env)
+            result.attempts = attempt
+            if result.success or attempt > self.policy.retries:
+                return result
+            delay = self.policy.delay(attempt)
+            await call_stream(on_stream, "error", f"Attempt {attempt} failed; retrying in {delay:g}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+async def run_process(
+    args: Sequence[str],
+    cwd: Path,
+    env: dict[str, str],
+    policy: RunPolicy,
+    on_line: Callable[[str], Awaitable[None]],
+) -> ProcessOutcome:
+    """Run an agent CLI, passing each non-empty stdout line to ``on_line``.
+
+    The process gets a session (and so a process group) of its own, which
+    lets a timeout, or the caller being cancelled, take down everything it
+    started. stderr is collected alongside so a chatty process can't fill
+    the pipe and stall.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=str(cwd),
+        env=env,
+        limit=STREAM_LIMIT,
+        start_new_session=True,
+    )
+    assert proc.stdout is not None and proc.stderr is not None
+    stderr = asyncio.create_task(proc.stderr.read())
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + policy.wall_timeout if policy.wall_timeout is not None else None
+    outcome = ProcessOutcome(None)
+
+    def next_limit(idle: bool) -> tuple[float | None, str]:
+        remaining = deadline - loop.time() if deadline is not None else None
+        if idle and policy.idle_timeout is not None and (remaining is None or policy.idle_timeout < remaining):
+            return policy.idle_timeout, "idle"
+        return remaining, "wall"
+
+    try:
+        while True:
+            timeout, kind = next_limit(idle=True)
+            try:
+                async with asyncio.timeout(timeout):
+                    raw_line = await proc.stdout.readline()
+            except TimeoutError:
+                outcome.timed_out, outcome.limit = kind, policy.idle_timeout if kind == "idle" else policy.wall_timeout
+                break
+            if not raw_line:
+                break
+            line = raw_line.decode().strip()
+            if line:
+                await on_line(line)
+        if outcome.timed_out is None:
+            # Output is closed, but the process may linger; only the wall clock bounds that.
+            try:
+                async with asyncio.timeout(next_limit(idle=False)[0]):
+                    await proc.wait()
+            except TimeoutError:
+                outcome.timed_out, outcome.limit = "wall", policy.wall_timeout
+    finally:
+        if proc.returncode is None:
+            await _terminate(proc, policy.kill_grace)
+        await proc.wait()
+        outcome.returncode = proc.returncode
+        outcome.stderr = (await stderr).decode(errors="replace")
+    return outcome
+
+
+async def _terminate(proc: asyncio.subprocess.Process, grace: float) -> None:
+    """SIGTERM the process group; SIGKILL whatever is left of it after ``grace`` seconds."""
+    _signal_group(proc, signal.SIGTERM)
+    try:
+        async with asyncio.timeout(grace):
+            await proc.wait()
+    except TimeoutError:
+        pass
+    # Children that outlived the leader are killed too.
+    _signal_group(proc, getattr(signal, "SIGKILL", signal.SIGTERM))
+
+
+def _signal_group(proc: asyncio.subprocess.Process, sig: int) -> None:
+    try:
+        if hasattr(os, "killpg"):
+            # With a session of its own, the process leads a group with its pid.
+            os.killpg(proc.pid, sig)
+        else:  # pragma: no cover - non-POSIX platforms
+            proc.send_signal(sig)
+    except ProcessLookupError:
+        pass
+
+
+async def call_stream(
+    on_stream: Callable[[str, str], Awaitable[None] | None],
+    chunk_type: str,
+    text: str,
+) -> None:
+    result = on_stream(chunk_type, text)
+    if result is not None:
+        await result
@@ -1,9 +1,9 @@
-import asyncio
 import json
+import os
 from collections.abc import Awaitable, Callable
 from pathlib import Path
 
-from agent_feedback.adapters.base import AgentAdapter, AgentResult
+from agent_feedback.adapters.base import AgentAdapter, AgentResult, call_stream, run_process
 
 
 class CursorAdapter(AgentAdapter):
@@ -19,44 +19,25 @@ class CursorAdapter(AgentAdapter):
         full_output: list[str] = []
         feedback_count = 0
 
-        proc_env = {**__import__("os").environ, **(env or {})}
-
-        abs_work_dir = str(work_dir.resolve())
-
-        proc = await asyncio.create_subprocess_exec(
-            "cursor-agent",
-            "-p", prompt,
-            "--output-format", "stream-json",
-            "--stream-partial-output",
-            "--workspace", abs_work_dir,
-            "--force",
-            "--trust",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=abs_work_dir,
-            env=proc_env,
-            limit=10 * 1024 * 1024,
-        )
+        proc_env = {**os.environ, **(env or {})}
 
-        assert proc.stdout is not None
+        abs_work_dir = work_dir.resolve()
 
         seen_text_deltas = False
 
-        async for raw_line in proc.stdout:
-            line = raw_line.decode().strip()
-            if not line:
-                continue
+        async def handle_line(line: str) -> None:
+            nonlocal feedback_count, seen_text_deltas
             try:
                 event = json.loads(line)
             except json.JSONDecodeError:
-                continue
+                return
 
             if event.get("type") == "assistant":
                 if "text_delta" in event:
                     seen_text_deltas = True
                 elif seen_text_deltas and event.get("message", {}).get("content"):
                     seen_text_deltas = False
-                    continue
+                    return
 
             for chunk_type, text in _parse_event(event):
                 if not text:
@@ -64,25 +45,35 @@ class CursorAdapter(AgentAdapter):
                 full_output.append(text)
                 if "agent-feedback submit" in text:
                     feedback_count += 1
-                    await _call_stream(on_stream, "feedback", text)
+                    await call_stream(on_stream, "feedback", text)
                 else:
-                    await _call_stream(on_stream, chunk_type, text)
-
-        await proc.wait()
-
-        output_text = "".join(full_output)
-        success = proc.returncode == 0
-        error = None
+                    await call_stream(on_stream, chunk_type, text)
+
+        outcome = await run_process(
+            [
+                "cursor-agent",
+                "-p", prompt,
+                "--output-format", "stream-json",
+                "--stream-partial-output",
+                "--workspace", str(abs_work_dir),
+                "--force",
+                "--trust",
+            ],
+            abs_work_dir,
+            proc_env,
+            self.policy,
+            handle_line,
+        )
 
-        if not success and proc.stderr:
-            error = (await proc.stderr.read()).decode()
-            await _call_stream(on_stream, "error", error)
+        if outcome.error:
+            await call_stream(on_stream, "error", outcome.error)
 
         return AgentResult(
-            success=success,
-            output=output_text,
+            success=outcome.success,
+            output="".join(full_output),
             feedback_submitted=feedback_count,
-            error=error,
+            error=outcome.error,
+            timed_out=outcome.timed_out,
         )
 
 
@@ -124,12 +115,3 @@ def _parse_event(event: dict) -> list[tuple[str, str]]:
 
     return []
 
-
-async def _call_stream(
-    on_stream: Callable[[str, str], Awaitable[None] | None],
-    chunk_type: str,
-    text: str,
-) -> None:
-    result = on_stream(chunk_type, text)
-    if result is not None:
-        await result
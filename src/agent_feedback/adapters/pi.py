@@ -1,10 +1,10 @@
-import asyncio
 import json
+import os
 import shutil
 from collections.abc import Awaitable, Callable
 from pathlib import Path
 
-from agent_feedback.adapters.base import AgentAdapter, AgentResult
+from agent_feedback.adapters.base import AgentAdapter, AgentResult, call_stream, run_process
 
 
 class PiAdapter(AgentAdapter):
@@ -26,54 +26,41 @@ class PiAdapter(AgentAdapter):
         full_output: list[str] = []
         feedback_count = 0
 
-        proc_env = {**__import__("os").environ, **(env or {})}
-
-        proc = await asyncio.create_subprocess_exec(
-            "pi",
-            "-p", prompt,
-            "--mode", "json",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=str(work_dir),
-            env=proc_env,
-            limit=10 * 1024 * 1024,
-        )
-
-        assert proc.stdout is not None
+        proc_env = {**os.environ, **(env or {})}
 
-        async for raw_line in proc.stdout:
-            line = raw_line.decode().strip()
-            if not line:
-                continue
+        async def handle_line(line: str) -> None:
+            nonlocal feedback_count
             try:
                 event = json.loads(line)
             except json.JSONDecodeError:
-                continue
+                return
 
             chunk_type, text = _parse_event(event)
             if text:
                 full_output.append(text)
                 if "agent-feedback submit" in text:
                     feedback_count += 1
-                    await _call_stream(on_stream, "feedback", text)
+                    await call_stream(on_stream, "feedback", text)
                 else:
-                    await _call_stream(on_stream, chunk_type, text)
-
-        await proc.wait()
-
-        output_text = "".join(full_output)
-        success = proc.returncode == 0
-        error = None
+                    await call_stream(on_stream, chunk_type, text)
+
+        outcome = await run_process(
+            ["pi", "-p", prompt, "--mode", "json"],
+            work_dir,
+            proc_env,
+            self.policy,
+            handle_line,
+        )
 
-        if not success and proc.stderr:
-            error = (await proc.stderr.read()).decode()
-            await _call_stream(on_stream, "error", error)
+        if outcome.error:
+            await call_stream(on_stream, "error", outcome.error)
 
         return AgentResult(
-            success=success,
-            output=output_text,
+            success=outcome.success,
+            output="".join(full_output),
             feedback_submitted=feedback_count,
-            error=error,
+            error=outcome.error,
+            timed_out=outcome.timed_out,
         )
 
 
@@ -91,12 +78,3 @@ def _parse_event(event: dict) -> tuple[str, str]:
 
     return "text", event.get("text", "")
 
-
-async def _call_stream(
-    on_stream: Callable[[str, str], Awaitable[None] | None],
-    chunk_type: str,
-    text: str,
-) -> None:
-    result = on_stream(chunk_type, text)
-    if result is not None:
-        await result
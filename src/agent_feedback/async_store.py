@@ -0,0 +1,146 @@
+"""Event-loop friendly access to a feedback store.
+
+``ThreadedStore`` owns a synchronous store and a single dedicated worker
+thread. The store is opened on that thread and every call runs there, so
+parsing a large file or waiting on SQLite never holds up the loop, calls
+are serialized the way the synchronous stores expect, and SQLite's
+same-thread rule is satisfied. ``iter_entries`` streams batches back
+through a bounded queue, so a slow consumer pauses the reader instead of
+letting it buffer the whole store.
+"""
+
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import TypeVar
+
+from agent_feedback.models import FeedbackLike, FeedbackRecord
+from agent_feedback.store import Cursor, Durability, FeedbackStore, TagMatch, open_store
+from agent_feedback.watch import DEFAULT_POLL_INTERVAL, watch_store
+
+T = TypeVar("T")
+
+BATCH_SIZE = 512
+QUEUE_BATCHES = 4
+
+_DONE = object()
+
+
+class ThreadedStore:
+    """An ``AsyncFeedbackStore`` running the store at ``path`` on a worker thread."""
+
+    def __init__(self, path: Path, durability: Durability | str | None = None, queue_batches: int = QUEUE_BATCHES) -> None:
+        self.path = path
+        self.queue_batches = queue_batches
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feedback-store")
+        self._store: FeedbackStore = self._executor.submit(open_store, path, durability).result()
+        # Segmented and sharded stores live in a directory of their own; the others in their parent's.
+        self._watch_dir = path if path.is_dir() else path.parent
+
+    async def save(self, entry: FeedbackLike) -> None:
+        await self._run(self._store.save, entry)
+
+    async def save_many(self, entries: Iterable[FeedbackLike]) -> None:
+        await self._run(self._store.save_many, list(entries))
+
+    async def query(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> list[FeedbackRecord]:
+        return await self._run(self._store.query, task_type, tags, exclude_agent, tags_mode, exclude_tags)
+
+    async def iter_entries(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        since: datetime | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> AsyncIterator[FeedbackRecord]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[object] = asyncio.Queue(self.queue_batches)
+        stop = threading.Event()
+
+        def produce() -> None:
+            def put(item: object) -> None:
+                # Blocks the worker, not the loop, while the queue is full.
+                asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+            try:
+                batch: list[FeedbackRecord] = []
+                for entry in self._store.iter_entries(task_type, tags, exclude_agent, since, tags_mode, exclude_tags):
+                    batch.append(entry)
+                    if len(batch) == BATCH_SIZE:
+                        if stop.is_set():
+                            return
+                        put(batch)
+                        batch = []
+                put(batch)
+                put(_DONE)
+            except BaseException as exc:
+                if not stop.is_set():
+                    put(exc)
+
+        producer = loop.run_in_executor(self._executor, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                for entry in item:  # type: ignore[attr-defined]
+                    yield entry
+        finally:
+            # An abandoned iteration must not leave the worker stuck on a full queue.
+            stop.set()
+            while not producer.done():
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.sleep(0)
+            await producer
+
+    async def search(self, text: str, limit: int = 10) -> list[tuple[FeedbackRecord, float]]:
+        return await self._run(self._store.search, text, limit)
+
+    async def get(self, entry_id: str) -> FeedbackRecord | None:
+        return await self._run(self._store.get, entry_id)
+
+    async def update(self, entry: FeedbackLike) -> None:
+        await self._run(self._store.update, entry)
+
+    async def delete_many(self, entry_ids: Iterable[str]) -> None:
+        await self._run(self._store.delete_many, list(entry_ids))
+
+    async def count(self) -> int:
+        return await self._run(self._store.count)
+
+    async def cursor(self) -> Cursor:
+        return await self._run(self._store.cursor)
+
+    async def changes_since(self, cursor: Cursor) -> tuple[list[FeedbackRecord], Cursor]:
+        return await self._run(self._store.changes_since, cursor)
+
+    def watch(self, cursor: Cursor | None = None, poll_interval: float = DEFAULT_POLL_INTERVAL) -> AsyncIterator[FeedbackRecord]:
+        """Entries written after ``cursor`` as they arrive, read on the worker thread."""
+        return watch_store(self, self._watch_dir, cursor, poll_interval)
+
+    async def clear(self) -> None:
+        await self._run(self._store.clear)
+
+    async def aclose(self) -> None:
+        close = getattr(self._store, "close", None)
+        if close is not None:
+            await self._run(close)
+        self._executor.shutdown(wait=False)
+
+    async def _run(self, fn: Callable[..., T], *args: object) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
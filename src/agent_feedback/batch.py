@@ -0,0 +1,311 @@
+"""Batch experiments: the demo over a task × adapter × agent-count matrix.
+
+A TOML manifest names the matrix and the demo settings every run shares:
+
+    tasks = ["tasks/*.md"]
+    adapters = ["claude-code", "cursor", "pi"]
+    agents = [3, 5]
+    repeats = 1
+    concurrency = 2        # runs at once, over the whole matrix
+    output = "runs"        # default: "<manifest name>-runs"
+
+    [demo]
+    parallel = 1
+    tip_budget = 2000
+    condense = true
+    timeout = "30m"
+    idle_timeout = "5m"
+    retries = 1
+    retry_backoff = "30s"
+    store = "feedback.jsonl"
+    template = "templates/starter"   # optional; see workspace.seed_workspace
+    link_mode = "auto"
+
+Paths are relative to the manifest. Each run gets a directory of its own
+under ``output/runs`` holding its store, its workspace and ``demo.log``,
+the demo's output. Each finished run appends one line with its timings
+and tip counts to ``output/ledger.jsonl``. A run is skipped when its
+latest line there shows it completed with the same settings and task
+text, so a sweep that is stopped and started again carries on where it
+left off. Runs that raised are tried again, resuming from their last
+checkpoint (see ``checkpoint``).
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+import traceback
+import tomllib
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from rich.console import Console
+
+from agent_feedback.adapters import ADAPTERS, RunPolicy
+from agent_feedback.checkpoint import STATE_NAME, ResumeError
+from agent_feedback.orchestrator import DemoSummary, run_demo
+from agent_feedback.retention import parse_duration
+from agent_feedback.workspace import LINK_MODES
+
+LEDGER_NAME = "ledger.jsonl"
+# Ledger statuses of runs that are not run again.
+COMPLETED = ("ok", "partial")
+
+_MANIFEST_KEYS = {"tasks", "adapters", "agents", "repeats", "concurrency", "output", "demo"}
+_DEMO_DEFAULTS: dict[str, Any] = {
+    "parallel": 1,
+    "tip_budget": 2000,
+    "condense": True,
+    "timeout": None,
+    "idle_timeout": None,
+    "retries": 0,
+    "retry_backoff": "5s",
+    "store": "feedback.jsonl",
+    "template": None,
+    "link_mode": "auto",
+}
+
+
+@dataclass(frozen=True)
+class RunSpec:
+    """One cell of the matrix."""
+
+    task: Path
+    adapter: str
+    agents: int
+    repeat: int = 1
+    demo: dict[str, Any] = field(default_factory=dict, compare=False)
+
+    @property
+    def run_id(self) -> str:
+        run_id = f"{self.task.stem}--{self.adapter}--{self.agents}"
+        return run_id if self.repeat == 1 else f"{run_id}--{self.repeat}"
+
+    def fingerprint(self) -> str:
+        """Changes whenever the run's settings or its task's text do."""
+        data = {"task": self.task.read_text(), "adapter": self.adapter, "agents": self.agents, "demo": self.demo}
+        return hashlib.blake2b(json.dumps(data, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+@dataclass(frozen=True)
+class Manifest:
+    tasks: list[Path]
+    adapters: list[str]
+    agents: list[int]
+    output: Path
+    repeats: int = 1
+    concurrency: int = 1
+    demo: dict[str, Any] = field(default_factory=lambda: dict(_DEMO_DEFAULTS))
+
+    @classmethod
+    def load(cls, path: Path) -> "Manifest":
+        with path.open("rb") as f:
+            return cls.from_dict(tomllib.load(f), path.parent, default_output=f"{path.stem}-runs")
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], base: Path, default_output: str = "runs") -> "Manifest":
+        unknown = set(data) - _MANIFEST_KEYS
+        if unknown:
+            raise ValueError(f"Unknown manifest settings: {', '.join(sorted(unknown))}")
+        tasks = _expand_tasks(_as_list(data.get("tasks"), "tasks"), base)
+        stems = [t.stem for t in tasks]
+        clashes = sorted({s for s in stems if stems.count(s) > 1})
+        if clashes:
+            raise ValueError(f"Task files share a name, so their runs would too: {', '.join(clashes)}")
+        adapters = [str(a) for a in _as_list(data.get("adapters"), "adapters")]
+        missing = [a for a in adapters if a not in ADAPTERS]
+        if missing:
+            raise ValueError(f"Unknown adapters: {', '.join(missing)}. Available: {', '.join(sorted(ADAPTERS))}")
+        agents = [int(n) for n in _as_list(data.get("agents"), "agents")]
+        if any(n < 1 for n in agents):
+            raise ValueError("Agent counts must be at least 1")
+        demo = {**_DEMO_DEFAULTS, **data.get("demo", {})}
+        unknown = set(demo) - set(_DEMO_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown demo settings: {', '.join(sorted(unknown))}")
+        if demo["template"] is not None:
+            demo["template"] = str((base / demo["template"]).resolve())
+            if not Path(demo["template"]).is_dir():
+                raise ValueError(f"Template {demo['template']} is not a directory")
+        demo_kwargs(demo)  # Fail now rather than hours into the sweep.
+        return cls(
+            tasks=tasks,
+            adapters=adapters,
+            agents=agents,
+            output=base / data.get("output", default_output),
+            repeats=int(data.get("repeats", 1)),
+            concurrency=int(data.get("concurrency", 1)),
+            demo=demo,
+        )
+
+    def runs(self) -> list[RunSpec]:
+        return [
+            RunSpec(task, adapter, agents, repeat, self.demo)
+            for task in self.tasks
+            for adapter in self.adapters
+            for agents in self.agents
+            for repeat in range(1, self.repeats + 1)
+        ]
+
+
+def demo_kwargs(demo: dict[str, Any]) -> dict[str, Any]:
+    """``run_demo`` arguments for a manifest's ``[demo]`` settings."""
+
+    def seconds(value: Any) -> float | None:
+        return parse_duration(value).total_seconds() if value is not None else None
+
+    return {
+        "parallel": int(demo["parallel"]),
+        "tip_budget": int(demo["tip_budget"]) or None,
+        "condense": bool(demo["condense"]),
+        "policy": RunPolicy(
+            wall_timeout=seconds(demo["timeout"]),
+            idle_timeout=seconds(demo["idle_timeout"]),
+            retries=int(demo["retries"]),
+            backoff=seconds(demo["retry_backoff"]) or 0.0,
+        ),
+        "template": Path(demo["template"]) if demo["template"] is not None else None,
+        "link_mode": _link_mode(demo["link_mode"]),
+    }
+
+
+def _link_mode(mode: Any) -> str:
+    if mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode {mode!r}; expected one of {', '.join(LINK_MODES)}")
+    return mode
+
+
+class Ledger:
+    """Append-only JSONL record of finished runs."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def records(self) -> list[dict[str, Any]]:
+        try:
+            lines = self.path.read_text().splitlines()
+        except FileNotFoundError:
+            return []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # A line cut short when the batch was killed.
+        return records
+
+    def completed(self) -> dict[str, str]:
+        """Fingerprint of each run whose latest record shows it completed."""
+        latest = {r["run_id"]: r for r in self.records()}
+        return {run_id: r["fingerprint"] for run_id, r in latest.items() if r["status"] in COMPLETED}
+
+    def append(self, record: dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def pending_runs(manifest: Manifest) -> tuple[list[RunSpec], list[RunSpec]]:
+    """The manifest's runs split into those still to do and those already completed."""
+    completed = Ledger(manifest.output / LEDGER_NAME).completed()
+    todo, done = [], []
+    for spec in manifest.runs():
+        (done if completed.get(spec.run_id) == spec.fingerprint() else todo).append(spec)
+    return todo, done
+
+
+async def run_batch(
+    manifest: Manifest,
+    concurrency: int | None = None,
+    on_event: Callable[[str, RunSpec, dict[str, Any] | None], None] | None = None,
+) -> list[dict[str, Any]]:
+    """Run every pending cell of the matrix; returns their ledger records.
+
+    At most ``concurrency`` runs (default: the manifest's) go at once.
+    ``on_event(kind, spec, record)`` hears of each run's "start" and
+    "finish", the latter with its record.
+    """
+    ledger = Ledger(manifest.output / LEDGER_NAME)
+    todo, _ = pending_runs(manifest)
+    slots = asyncio.Semaphore(concurrency or manifest.concurrency)
+
+    async def run(spec: RunSpec) -> dict[str, Any]:
+        async with slots:
+            if on_event is not None:
+                on_event("start", spec, None)
+            record = await _execute(spec, manifest.output / "runs" / spec.run_id)
+            ledger.append(record)
+            if on_event is not None:
+                on_event("finish", spec, record)
+            return record
+
+    return list(await asyncio.gather(*(run(spec) for spec in todo)))
+
+
+async def _execute(spec: RunSpec, run_dir: Path) -> dict[str, Any]:
+    record: dict[str, Any] = {
+        "run_id": spec.run_id,
+        "fingerprint": spec.fingerprint(),
+        "task": str(spec.task),
+        "adapter": spec.adapter,
+        "agents": spec.agents,
+        "repeat": spec.repeat,
+        "started": datetime.now(UTC).isoformat(),
+    }
+    run_dir.mkdir(parents=True, exist_ok=True)
+    start = time.monotonic()
+    workspace_dir = run_dir / "workspace"
+    with (run_dir / "demo.log").open("a") as log:
+
+        async def demo(resume: bool) -> DemoSummary:
+            return await run_demo(
+                task_path=spec.task,
+                adapter_name=spec.adapter,
+                num_agents=spec.agents,
+                store_path=run_dir / spec.demo["store"],
+                workspace_dir=workspace_dir,
+                console=Console(file=log, width=120),
+                resume=resume,
+                **demo_kwargs(spec.demo),
+            )
+
+        try:
+            # A run cut short last time carries on from its checkpoint, unless its settings changed since.
+            try:
+                summary = await demo(resume=(workspace_dir / STATE_NAME).exists())
+            except ResumeError:
+                summary = await demo(resume=False)
+        except Exception as exc:
+            # One broken run mustn't end an unattended sweep; it is retried next time.
+            log.write(traceback.format_exc())
+            record.update(status="error", error=f"{type(exc).__name__}: {exc}")
+        else:
+            record.update(
+                status="partial" if summary.failed_agents else "ok",
+                agent_tips=summary.agent_tips,
+                total_tips=summary.total_tips,
+                failed_agents=summary.failed_agents,
+            )
+    record["finished"] = datetime.now(UTC).isoformat()
+    record["duration_s"] = round(time.monotonic() - start, 3)
+    return record
+
+
+def _as_list(value: Any, name: str) -> list[Any]:
+    if value is None:
+        raise ValueError(f"Manifest needs {name!r}")
+    return value if isinstance(value, list) else [value]
+
+
+def _expand_tasks(patterns: list[str], base: Path) -> list[Path]:
+    tasks: list[Path] = []
+    for pattern in patterns:
+        matches = sorted(base.glob(pattern)) if any(c in pattern for c in "*?[") else [base / pattern]
+        if not matches or not all(m.is_file() for m in matches):
+            raise ValueError(f"No task files match {pattern!r}")
+        tasks += [m for m in matches if m not in tasks]
+    return tasks
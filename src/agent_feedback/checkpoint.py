@@ -0,0 +1,92 @@
+"""Checkpoints that let an interrupted demo resume where it stopped.
+
+``run_demo`` keeps ``run-state.json`` in its workspace and rewrites it,
+atomically, when a wave starts and whenever an agent finishes. The file
+records the first agent of the wave in progress, the store cursor and
+time at which that wave started, and each finished agent's result along
+with a hash of the prompt it was given. A settings fingerprint guards
+against resuming a run with a different task or different settings.
+
+Resuming skips the finished agents. Tips the wave's unfinished agents
+had already submitted are discarded, as is their support for tips they
+restated (though not the confidence it added), and those agents start
+over in clean directories, from the same tips the wave started with.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from agent_feedback.store import Cursor
+
+STATE_NAME = "run-state.json"
+VERSION = 1
+
+
+class ResumeError(ValueError):
+    """There is no run to resume, or it was made with other settings."""
+
+
+@dataclass
+class AgentCheckpoint:
+    tips_submitted: int
+    success: bool
+    prompt_hash: str
+    timed_out: str | None = None
+    attempts: int = 1
+
+
+@dataclass
+class RunState:
+    fingerprint: str
+    # The wave in progress: its first agent, and the store as it started.
+    wave_start: int = 1
+    wave_cursor: Cursor = 0
+    wave_started: datetime | None = None
+    agents: dict[int, AgentCheckpoint] = field(default_factory=dict)
+
+    def start_wave(self, first: int, cursor: Cursor, now: datetime) -> None:
+        self.wave_start, self.wave_cursor, self.wave_started = first, cursor, now
+
+    @classmethod
+    def load(cls, path: Path) -> "RunState | None":
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        if data.get("version") != VERSION:
+            raise ResumeError(f"{path} was written by an incompatible version")
+        return cls(
+            fingerprint=data["fingerprint"],
+            wave_start=data["wave_start"],
+            wave_cursor=data["wave_cursor"],
+            wave_started=datetime.fromisoformat(data["wave_started"]) if data["wave_started"] else None,
+            agents={int(i): AgentCheckpoint(**a) for i, a in data["agents"].items()},
+        )
+
+    def save(self, path: Path) -> None:
+        data = {
+            "version": VERSION,
+            "fingerprint": self.fingerprint,
+            "wave_start": self.wave_start,
+            "wave_cursor": self.wave_cursor,
+            "wave_started": self.wave_started.isoformat() if self.wave_started else None,
+            "agents": {str(i): asdict(a) for i, a in sorted(self.agents.items())},
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=2))
+        os.replace(tmp, path)
+
+
+def run_fingerprint(task: str, **settings: Any) -> str:
+    """Identifies a run's task text and the settings that shape its prompts and waves."""
+    data = json.dumps({"task": task, **settings}, sort_keys=True, default=str)
+    return hashlib.blake2b(data.encode(), digest_size=8).hexdigest()
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.blake2b(prompt.encode(), digest_size=8).hexdigest()
@@ -1,22 +1,60 @@
+"""The ``agent-feedback`` command agents call to share and read tips.
+
+Agents run these commands many times per task, so interpreter startup is
+most of their cost. Only click and the standard-library daemon client are
+imported up front: a call the ``serve`` daemon answers never loads pydantic,
+the stores or rich, and the direct-access fallback imports what it needs
+inside each command. rich is only used for ``--format pretty`` tables.
+"""
+
 import json
 import os
+import signal
+import sys
+import textwrap
+from collections.abc import Iterable
+from datetime import datetime
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import click
-from rich.console import Console
-from rich.table import Table
 
-from agent_feedback.models import FeedbackCategory, FeedbackEntry
-from agent_feedback.store import JSONLStore
+from agent_feedback.client import DaemonError, request, socket_path
 
-console = Console()
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from agent_feedback.models import FeedbackLike
+    from agent_feedback.retention import RetentionConfig
+    from agent_feedback.store import FeedbackStore
 
 DEFAULT_STORE_PATH = Path("./feedback_data/feedback.jsonl")
 
+# Mirrors of FeedbackCategory and TagMatch, spelled out so that building the
+# command line doesn't import the models.
+CATEGORIES = ("tip", "difficulty", "approach", "gotcha", "tool_usage")
+TAG_MODES = ("any", "all")
+# Mirror of transfer.FORMATS.
+TRANSFER_FORMATS = ("ndjson", "csv", "columnar")
+
+
+def _store_path() -> Path:
+    return Path(os.environ.get("AGENT_FEEDBACK_STORE", str(DEFAULT_STORE_PATH)))
+
+
+def _get_store() -> "FeedbackStore":
+    from agent_feedback.store import open_store
 
-def _get_store() -> JSONLStore:
-    path = Path(os.environ.get("AGENT_FEEDBACK_STORE", str(DEFAULT_STORE_PATH)))
-    return JSONLStore(path)
+    return open_store(_store_path(), durability=os.environ.get("AGENT_FEEDBACK_DURABILITY"))
+
+
+def _ask_daemon(op: str, **params: Any) -> dict[str, Any] | None:
+    """The running daemon's reply, or None if there is none and the store should be used directly."""
+    try:
+        return request(socket_path(str(_store_path())), op, **params)
+    except DaemonError as exc:
+        raise click.ClickException(str(exc)) from exc
 
 
 @click.group()
@@ -30,13 +68,18 @@ def main() -> None:
 @click.option(
     "--category",
     required=True,
-    type=click.Choice([c.value for c in FeedbackCategory], case_sensitive=False),
+    type=click.Choice(CATEGORIES, case_sensitive=False),
     help="Feedback category",
 )
 @click.option("--title", required=True, help="One-line summary")
 @click.option("--detail", required=True, help="Full explanation")
 @click.option("--tags", default="", help="Comma-separated tags")
 @click.option("--confidence", default=1.0, type=float, help="Confidence 0.0-1.0")
+@click.option(
+    "--merge/--no-merge",
+    default=True,
+    help="Merge into an existing near-duplicate tip instead of adding a new one",
+)
 def submit(
     agent_id: str,
     task_type: str,
@@ -45,26 +88,58 @@ def submit(
     detail: str,
     tags: str,
     confidence: float,
+    merge: bool,
 ) -> None:
     """Submit feedback to the shared store."""
     tag_list = [t.strip() for t in tags.split(",") if t.strip()] if tags else []
-    entry = FeedbackEntry(
-        agent_id=agent_id,
-        task_type=task_type,
-        category=FeedbackCategory(category),
-        title=title,
-        detail=detail,
-        tags=tag_list,
-        confidence=confidence,
-    )
-    store = _get_store()
-    store.save(entry)
-    console.print(f'✓ Feedback saved: [{entry.id}] "{entry.title}"')
+    fields = {
+        "agent_id": agent_id,
+        "task_type": task_type,
+        "category": category.lower(),
+        "title": title,
+        "detail": detail,
+        "tags": tag_list,
+        "confidence": confidence,
+    }
+    reply = _ask_daemon("submit", entry=fields, merge=merge)
+    if reply is not None:
+        stored: dict[str, Any] = reply["entry"]
+        merged: bool = reply["merged"]
+    else:
+        from agent_feedback.dedupe import DuplicateIndex, dedupe_index_path, save_or_merge
+        from agent_feedback.models import FeedbackEntry
+
+        entry = FeedbackEntry(**fields)
+        store = _get_store()
+        if merge:
+            index = DuplicateIndex(dedupe_index_path(_store_path()))
+            try:
+                saved, merged = save_or_merge(store, index, entry)
+            finally:
+                index.close()
+        else:
+            store.save(entry)
+            saved, merged = entry, False
+        stored = {"id": saved.id, "title": saved.title, "supporters": saved.supporters}
+    if merged:
+        click.echo(
+            f'✓ Merged into existing feedback: [{stored["id"]}] "{stored["title"]}" '
+            f'(supported by {len(stored["supporters"])} other agent(s))'
+        )
+    else:
+        click.echo(f'✓ Feedback saved: [{stored["id"]}] "{stored["title"]}"')
 
 
 @main.command()
 @click.option("--task-type", default=None, help="Filter by task type")
 @click.option("--tags", default=None, help="Comma-separated tags to filter by")
+@click.option(
+    "--tags-mode",
+    default="any",
+    type=click.Choice(TAG_MODES),
+    help="Match entries with any or all of --tags",
+)
+@click.option("--exclude-tags", default=None, help="Comma-separated tags to exclude")
 @click.option("--exclude-agent", default=None, help="Exclude feedback from this agent")
 @click.option(
     "--format",
@@ -76,17 +151,39 @@ def submit(
 def query(
     task_type: str | None,
     tags: str | None,
+    tags_mode: str,
+    exclude_tags: str | None,
     exclude_agent: str | None,
     output_format: str,
 ) -> None:
     """Query feedback from the store."""
-    store = _get_store()
-    tag_list = [t.strip() for t in tags.split(",") if t.strip()] if tags else None
-    entries = store.query(task_type=task_type, tags=tag_list, exclude_agent=exclude_agent)
-    if output_format == "json":
-        click.echo(json.dumps([e.model_dump(mode="json") for e in entries], indent=2))
+    filters = {
+        "task_type": task_type,
+        "tags": [t.strip() for t in tags.split(",") if t.strip()] if tags else None,
+        "exclude_agent": exclude_agent,
+        "tags_mode": tags_mode,
+        "exclude_tags": [t.strip() for t in exclude_tags.split(",") if t.strip()] if exclude_tags else None,
+    }
+    _output(_query(**filters), output_format)
+
+
+@main.command()
+@click.argument("text")
+@click.option("--limit", default=10, type=int, help="Maximum number of results")
+@click.option(
+    "--format",
+    "output_format",
+    default="json",
+    type=click.Choice(["json", "pretty"]),
+    help="Output format",
+)
+def search(text: str, limit: int, output_format: str) -> None:
+    """Search tip titles and details, best matches first."""
+    reply = _ask_daemon("search", text=text, limit=limit)
+    if reply is not None:
+        _output(reply["entries"], output_format)
     else:
-        _print_table(entries)
+        _output((entry for entry, _score in _get_store().search(text, limit=limit)), output_format)
 
 
 @main.command(name="list")
@@ -99,27 +196,256 @@ def query(
 )
 def list_all(output_format: str) -> None:
     """List all feedback entries."""
-    store = _get_store()
-    entries = store.get_all()
-    if output_format == "json":
-        click.echo(json.dumps([e.model_dump(mode="json") for e in entries], indent=2))
-    else:
-        _print_table(entries)
+    _output(_query(), output_format)
 
 
 @main.command()
 @click.option("--confirm", is_flag=True, required=True, help="Confirm reset")
 def reset(confirm: bool) -> None:
     """Reset the feedback store."""
+    from agent_feedback.dedupe import dedupe_index_path
+
     store = _get_store()
     store.clear()
-    console.print("✓ Feedback store cleared.")
+    dedupe_index_path(_store_path()).unlink(missing_ok=True)
+    click.echo("✓ Feedback store cleared.")
 
 
-def _print_table(entries: list[FeedbackEntry]) -> None:
-    if not entries:
-        console.print("[dim]No feedback entries found.[/dim]")
-        return
+@main.command()
+@click.option(
+    "--retention",
+    "retention_path",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="TOML retention policy to apply while compacting",
+)
+def compact(retention_path: Path | None) -> None:
+    """Merge store segments, dropping deleted and superseded records."""
+    from agent_feedback.segmented_store import SegmentedStore
+
+    store = _get_store()
+    if not isinstance(store, SegmentedStore):
+        raise click.ClickException(
+            "Compaction needs a segmented store; point AGENT_FEEDBACK_STORE at a directory."
+        )
+    retention = _retention_config(retention_path) if retention_path is not None else None
+    stats = store.compact(retention=retention)
+    click.echo(
+        f"✓ Compacted {stats.segments_merged} segments: "
+        f"{stats.records_kept} live entries kept, {stats.records_dropped} records dropped"
+        + (f" ({stats.records_evicted} evicted by retention)." if retention is not None else ".")
+    )
+
+
+@main.command()
+@click.option(
+    "--config",
+    "config_path",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="TOML retention policy, with per-task-type sections",
+)
+@click.option("--max-age", default=None, help="Evict tips older than this, e.g. 90d, 12h")
+@click.option("--half-life", default=None, help="Halve a tip's confidence score every so often, e.g. 14d")
+@click.option(
+    "--min-score",
+    default=None,
+    type=click.FloatRange(0.0, 1.0),
+    help="Evict tips whose decayed score falls below this",
+)
+@click.option(
+    "--max-entries",
+    default=None,
+    type=click.IntRange(min=0),
+    help="Keep at most this many tips per task type, best scores first",
+)
+@click.option("--dry-run", is_flag=True, help="Only report what would be evicted")
+def gc(
+    config_path: Path | None,
+    max_age: str | None,
+    half_life: str | None,
+    min_score: float | None,
+    max_entries: int | None,
+    dry_run: bool,
+) -> None:
+    """Evict expired, decayed and over-budget tips.
+
+    Options given on the command line override the config's default policy.
+    """
+    from agent_feedback.dedupe import dedupe_index_path
+    from agent_feedback.retention import collect_garbage
+
+    overrides = {
+        "max_age": max_age,
+        "half_life": half_life,
+        "min_score": min_score,
+        "max_entries": max_entries,
+    }
+    config = _retention_config(config_path, {k: v for k, v in overrides.items() if v is not None})
+    if config.is_noop:
+        raise click.ClickException("No retention policy: pass --config or at least one limit.")
+    stats = collect_garbage(_get_store(), config, dry_run=dry_run)
+    if stats.evicted and not dry_run:
+        # Compaction moves entries, so the duplicate index's cursor is stale.
+        dedupe_index_path(_store_path()).unlink(missing_ok=True)
+    click.echo(
+        f"✓ Examined {stats.examined} entries, {'would evict' if dry_run else 'evicted'} {stats.evicted}: "
+        f"{stats.expired} expired, {stats.decayed} decayed, {stats.over_budget} over budget."
+    )
+
+
+@main.command()
+@click.option(
+    "--threshold",
+    default=None,
+    type=click.FloatRange(0.0, 1.0),
+    help="Estimated similarity at which two tips count as duplicates (default 0.7)",
+)
+def dedupe(threshold: float | None) -> None:
+    """Merge near-duplicate tips already in the store."""
+    from agent_feedback.dedupe import DEFAULT_THRESHOLD, dedupe_index_path, dedupe_store
+
+    store = _get_store()
+    stats = dedupe_store(store, threshold=DEFAULT_THRESHOLD if threshold is None else threshold)
+    dedupe_index_path(_store_path()).unlink(missing_ok=True)
+    click.echo(f"✓ Examined {stats.examined} entries, merged {stats.merged} near-duplicates.")
+
+
+@main.command()
+@click.option(
+    "--output",
+    "-o",
+    default="-",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    help="File to write (default: stdout)",
+)
+@click.option(
+    "--format",
+    "fmt",
+    default=None,
+    type=click.Choice(TRANSFER_FORMATS),
+    help="Output format (default: from the file extension, else ndjson)",
+)
+@click.option("--task-type", default=None, help="Only export this task type")
+@click.option("--since", default=None, type=click.DateTime(), help="Only export tips from this time on")
+def export(output: str, fmt: str | None, task_type: str | None, since: datetime | None) -> None:
+    """Stream the store's entries out as NDJSON, CSV or columnar row groups."""
+    from agent_feedback.transfer import export_entries
+
+    entries = _get_store().iter_entries(task_type=task_type, since=since)
+    with click.open_file(output, "wb") as out:
+        written = export_entries(entries, out, _transfer_format(output, fmt))
+    click.echo(f"✓ Exported {written} entries.", err=output == "-")
+
+
+@main.command(name="import")
+@click.argument("source", type=click.Path(dir_okay=False, allow_dash=True))
+@click.option(
+    "--format",
+    "fmt",
+    default=None,
+    type=click.Choice(TRANSFER_FORMATS),
+    help="Input format (default: from the file extension, else ndjson)",
+)
+@click.option("--batch-size", default=10_000, type=click.IntRange(min=1), help="Entries validated and written at once")
+@click.option("--skip-invalid", is_flag=True, help="Skip invalid records instead of stopping at the first batch with one")
+def import_(source: str, fmt: str | None, batch_size: int, skip_invalid: bool) -> None:
+    """Append entries from an NDJSON, CSV or columnar export to the store.
+
+    Entries already in the store (by id) are left out.
+    """
+    import sqlite3
+
+    from agent_feedback.transfer import TransferError, import_entries
+
+    with click.open_file(source, "rb") as f:
+        try:
+            stats = import_entries(_get_store(), f, _transfer_format(source, fmt), batch_size, skip_invalid)
+        except (TransferError, ValueError, OSError, sqlite3.Error) as exc:
+            raise click.ClickException(str(exc)) from exc
+    notes = [f"skipped {stats.skipped} invalid"] if stats.skipped else []
+    if stats.duplicates:
+        notes.append(f"{stats.duplicates} already in the store")
+    click.echo(f"✓ Imported {stats.imported} entries" + (f", {', '.join(notes)}." if notes else "."))
+
+
+@main.command()
+def serve() -> None:
+    """Serve the store over a Unix socket until interrupted.
+
+    While it runs, submit/query/list/search calls for the same store are
+    answered by the daemon instead of each re-reading the store.
+    """
+    # Imported here: only the daemon needs the server side.
+    from agent_feedback.daemon import FeedbackDaemon
+
+    path = socket_path(str(_store_path()))
+    try:
+        daemon = FeedbackDaemon(_store_path(), path, durability=os.environ.get("AGENT_FEEDBACK_DURABILITY"))
+    except (RuntimeError, OSError) as exc:
+        raise click.ClickException(str(exc)) from exc
+    # Let a plain kill shut down cleanly, removing the socket.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    click.echo(f"✓ Serving {_store_path()} on {path}")
+    with daemon:
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def _retention_config(path: Path | None, overrides: dict[str, Any] | None = None) -> "RetentionConfig":
+    from agent_feedback.retention import RetentionConfig
+
+    try:
+        return RetentionConfig.load(path, overrides)
+    except (ValueError, TypeError) as exc:
+        raise click.ClickException(f"Invalid retention policy: {exc}") from exc
+
+
+def _transfer_format(path: str, fmt: str | None) -> str:
+    from agent_feedback.transfer import EXTENSIONS
+
+    return fmt or EXTENSIONS.get(Path(path).suffix, "ndjson")
+
+
+def _query(**filters: Any) -> Iterable["FeedbackLike | dict[str, Any]"]:
+    reply = _ask_daemon("query", **filters)
+    if reply is not None:
+        return reply["entries"]
+    return _get_store().iter_entries(**filters)
+
+
+def _output(entries: Iterable["FeedbackLike | dict[str, Any]"], output_format: str) -> None:
+    """Print entries, given as store records or as the daemon's JSON objects."""
+    if output_format == "json":
+        _echo_json_array(e if isinstance(e, dict) else e.model_dump(mode="json") for e in entries)
+    else:
+        from agent_feedback.models import FeedbackRecord
+
+        _print_table(FeedbackRecord.from_dict(e) if isinstance(e, dict) else e for e in entries)
+
+
+def _echo_json_array(items: Iterable[dict[str, Any]]) -> None:
+    """Stream objects as the same indented JSON array ``json.dumps`` would produce."""
+    first = True
+    for data in items:
+        item = textwrap.indent(json.dumps(data, indent=2), "  ")
+        click.echo(("[\n" if first else ",\n") + item, nl=False)
+        first = False
+    click.echo("[]" if first else "\n]")
+
+
+@cache
+def _console() -> "Console":
+    from rich.console import Console
+
+    return Console()
+
+
+def _print_table(entries: Iterable["FeedbackLike"]) -> None:
+    from rich.table import Table
+
     table = Table(title="Feedback Entries")
     table.add_column("ID", style="dim")
     table.add_column("Agent")
@@ -127,7 +453,9 @@ def _print_table(entries: list[FeedbackEntry]) -> None:
     table.add_column("Title", style="bold")
     table.add_column("Confidence", justify="right")
     table.add_column("Tags")
+    empty = True
     for e in entries:
+        empty = False
         table.add_row(
             e.id,
             e.agent_id,
@@ -136,4 +464,11 @@ def _print_table(entries: list[FeedbackEntry]) -> None:
             f"{e.confidence:.1f}",
             ", ".join(e.tags) if e.tags else "",
         )
-    console.print(table)
+    if empty:
+        _console().print("[dim]No feedback entries found.[/dim]")
+        return
+    _console().print(table)
+
+
+if __name__ == "__main__":
+    main()
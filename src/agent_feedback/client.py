@@ -0,0 +1,89 @@
+"""Thin client for the ``agent-feedback serve`` daemon.
+
+Speaks the daemon's protocol: one JSON object per line in each direction,
+a request carrying an ``op`` and its parameters, and a reply that has
+``ok`` set plus either the result or an ``error`` message. This module
+deliberately imports nothing beyond the standard library so that a CLI call
+answered by the daemon stays cheap.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import time
+from typing import Any
+
+SOCKET_ENV = "AGENT_FEEDBACK_SOCKET"
+TIMEOUT = 30.0
+# Socket paths must fit sockaddr_un's sun_path: 108 bytes on Linux, 104 on macOS.
+MAX_SOCKET_PATH = 100
+
+
+class DaemonError(RuntimeError):
+    """The daemon received the request but refused it."""
+
+
+def socket_path(store_path: str) -> str:
+    """The daemon's socket: ``$AGENT_FEEDBACK_SOCKET``, or next to the store.
+
+    A store too deep for a socket beside it gets one in the temp directory,
+    named after the store's absolute path.
+    """
+    configured = os.environ.get(SOCKET_ENV)
+    if configured:
+        return configured
+    if os.path.isdir(store_path):
+        path = os.path.join(store_path, "daemon.sock")
+    else:
+        path = store_path + ".sock"
+    if len(os.fsencode(path)) <= MAX_SOCKET_PATH:
+        return path
+    digest = hashlib.blake2b(os.fsencode(os.path.abspath(store_path)), digest_size=8).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f"agent-feedback-{digest}.sock")
+
+
+def request(path: str, op: str, **params: Any) -> dict[str, Any] | None:
+    """Send one request; None if no daemon is listening at ``path``.
+
+    A daemon whose listen backlog is full is waited for, up to ``TIMEOUT``.
+    One that cannot be reached or stops answering counts as absent, so
+    callers fall back to the store.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    deadline = time.monotonic() + TIMEOUT
+    delay = 0.005
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(TIMEOUT)
+        try:
+            sock.connect(path)
+            break
+        except BlockingIOError:
+            # The backlog is full (EAGAIN): the daemon is busy, not gone.
+            sock.close()
+            if time.monotonic() + delay > deadline:
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+        except OSError:
+            # Never started, a stale socket left behind by one that died, or unreachable.
+            sock.close()
+            return None
+    try:
+        sock.sendall(json.dumps({"op": op, **params}).encode() + b"\n")
+        with sock.makefile("rb") as reply:
+            line = reply.readline()
+    except OSError:
+        # Includes TimeoutError: a daemon that hangs is as good as none.
+        return None
+    finally:
+        sock.close()
+    if not line:
+        raise DaemonError("daemon closed the connection without replying")
+    result = json.loads(line)
+    if not result.get("ok"):
+        raise DaemonError(result.get("error", "request failed"))
+    return result
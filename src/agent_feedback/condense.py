@@ -0,0 +1,157 @@
+"""Condensing related tips into one prompt block per cluster.
+
+Tips about the same thing keep arriving in different words, and even after
+``dedupe`` merges the restatements they stack up in the prompt. Related
+tips share a category and enough vocabulary: each tip is reduced to a set
+of crudely stemmed content words plus its tags, and a tip joins the
+cluster holding its most similar tip (weighted Jaccard of words and tags)
+if that similarity reaches the threshold, else it starts a cluster.
+
+A cluster renders as the best tip's block (highest confidence, then most
+supporters, then newest) headed by every contributing agent and the
+confidence range, followed by one line per other tip in it. Assignments
+are cached by entry id, so clustering the store again after a few new
+tips only compares the new ones, and only against tips sharing a word.
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from itertools import chain
+
+from agent_feedback.models import FeedbackLike
+from agent_feedback.search import tokenize
+
+DEFAULT_THRESHOLD = 0.25
+# How much tag overlap counts towards similarity when both tips have tags.
+TAG_WEIGHT = 0.25
+
+_STOPWORDS = frozenset(
+    "the and for are but not you your with this that from have has had was were will would can could "
+    "should into onto than then them they their there these those when what which while who why how "
+    "use using used all any each its it's also just only very more most some such too out off over "
+    "about after before because been being does did doing don't make makes made get gets got".split()
+)
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+
+@dataclass
+class TipCluster:
+    """Related tips, in the order they were given."""
+
+    members: list[FeedbackLike]
+
+    @property
+    def best(self) -> FeedbackLike:
+        return max(self.members, key=lambda e: (e.confidence, len(e.supporters), e.timestamp))
+
+    @property
+    def agents(self) -> list[str]:
+        return list(dict.fromkeys(a for e in self.members for a in (e.agent_id, *e.supporters)))
+
+    @property
+    def confidence_range(self) -> tuple[float, float]:
+        return min(e.confidence for e in self.members), max(e.confidence for e in self.members)
+
+    @property
+    def tags(self) -> list[str]:
+        return list(dict.fromkeys(t for e in self.members for t in e.tags))
+
+
+@dataclass
+class _Features:
+    terms: frozenset[str]
+    tags: frozenset[str]
+
+
+@dataclass
+class TipClusterer:
+    """Clusters tips, remembering every entry id's cluster between calls."""
+
+    threshold: float = DEFAULT_THRESHOLD
+    _assignments: dict[str, int] = field(default_factory=dict)
+    _features: dict[str, _Features] = field(default_factory=dict)
+    _clusters: int = 0
+    # (category, term) -> ids of clustered tips containing the term.
+    _postings: dict[tuple[str, str], list[str]] = field(default_factory=dict)
+
+    def assign(self, entries: Iterable[FeedbackLike]) -> dict[str, int]:
+        """Cluster id of each entry; only entries not seen before are compared."""
+        result = {}
+        for entry in entries:
+            cluster = self._assignments.get(entry.id)
+            if cluster is None:
+                cluster = self._add(entry)
+            result[entry.id] = cluster
+        return result
+
+    def cluster(self, entries: Iterable[FeedbackLike]) -> list[TipCluster]:
+        """``entries`` grouped into clusters, ordered by each cluster's first member."""
+        entries = list(entries)
+        groups: dict[int, TipCluster] = {}
+        for entry, cluster in zip(entries, self.assign(entries).values()):
+            groups.setdefault(cluster, TipCluster([])).members.append(entry)
+        return list(groups.values())
+
+    def _add(self, entry: FeedbackLike) -> int:
+        features = _Features(_terms(f"{entry.title}\n{entry.detail}"), frozenset(entry.tags))
+        category = entry.category.value
+        # Counting postings gives every candidate's overlap without a set operation each.
+        shared = Counter(chain.from_iterable(self._postings.get((category, t), ()) for t in features.terms))
+        best_cluster, best_score = None, self.threshold
+        for other, overlap in shared.items():
+            score = _similarity(features, self._features[other], overlap)
+            if score >= best_score:
+                best_cluster, best_score = self._assignments[other], score
+        if best_cluster is None:
+            best_cluster = self._clusters
+            self._clusters += 1
+        self._assignments[entry.id] = best_cluster
+        self._features[entry.id] = features
+        for term in features.terms:
+            self._postings.setdefault((category, term), []).append(entry.id)
+        return best_cluster
+
+
+def format_related(entry: FeedbackLike) -> str:
+    """The line a tip gets in a cluster it isn't the best tip of."""
+    return f'- Also: "{entry.title}" ({entry.agent_id}, confidence: {entry.confidence})\n'
+
+
+def format_cluster(cluster: TipCluster) -> str:
+    best = cluster.best
+    low, high = cluster.confidence_range
+    confidence = f"{low}" if low == high else f"{low}–{high}"
+    lines = [
+        f"### [{best.category.value}] from {', '.join(cluster.agents)} "
+        f"(confidence: {confidence}, {len(cluster.members)} related tips)\n",
+        f'**"{best.title}"**\n',
+        f"{best.detail}\n",
+        *(format_related(e) for e in cluster.members if e is not best),
+        f"Tags: {', '.join(cluster.tags) or 'none'}\n",
+    ]
+    return "".join(lines)
+
+
+def _terms(text: str) -> frozenset[str]:
+    return frozenset(_stem(t) for t in tokenize(text) if len(t) > 2 and t not in _STOPWORDS)
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+def _jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def _similarity(a: _Features, b: _Features, overlap: int) -> float:
+    """Weighted Jaccard similarity, given how many terms ``a`` and ``b`` share."""
+    text = overlap / (len(a.terms) + len(b.terms) - overlap)
+    if a.tags and b.tags:
+        return (1 - TAG_WEIGHT) * text + TAG_WEIGHT * _jaccard(a.tags, b.tags)
+    return text
@@ -0,0 +1,134 @@
+"""Long-running feedback server behind ``agent-feedback serve``.
+
+Every CLI call an agent makes would otherwise start an interpreter, open
+the store cold and throw the warm cache away again. The daemon keeps one
+store (with its read cache and indexes) and one duplicate index open and
+answers requests over a Unix domain socket; see ``client`` for the wire
+format. Requests are handled one at a time on the serving thread, which
+is all the synchronization the store needs. Other processes may keep
+writing to the store directly: reads pick their appends up as usual.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import socketserver
+import subprocess
+import sys
+from collections.abc import AsyncIterator
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+from pydantic import ValidationError
+
+from agent_feedback.client import request, socket_path
+from agent_feedback.dedupe import DuplicateIndex, dedupe_index_path, save_or_merge
+from agent_feedback.models import FeedbackEntry
+from agent_feedback.store import Durability, FeedbackStore, open_store
+
+# Filters a query request may carry; anything else is ignored.
+_QUERY_PARAMS = ("task_type", "tags", "exclude_agent", "tags_mode", "exclude_tags")
+
+
+class FeedbackDaemon(socketserver.UnixStreamServer):
+    """Serve the store at ``store_path`` on the Unix socket ``path``."""
+
+    # Requests are short but handled one at a time; let bursts of clients queue.
+    request_queue_size = 128
+
+    def __init__(self, store_path: Path, path: str, durability: Durability | str | None = None) -> None:
+        self.store_path = store_path
+        self.durability = durability
+        if request(path, "ping") is not None:
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        # Whatever is left is a stale socket from a daemon that died.
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+        super().__init__(path, _Handler)
+
+    # Opened on first use so that they belong to the serving thread, as SQLite requires.
+    @cached_property
+    def store(self) -> FeedbackStore:
+        return open_store(self.store_path, durability=self.durability)
+
+    @cached_property
+    def index(self) -> DuplicateIndex:
+        return DuplicateIndex(dedupe_index_path(self.store_path))
+
+    def server_close(self) -> None:
+        super().server_close()
+        if "index" in self.__dict__:
+            self.index.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.server_address)  # type: ignore[arg-type]
+
+    def handle_request_data(self, data: dict[str, Any]) -> dict[str, Any]:
+        op = data.get("op")
+        if op == "ping":
+            return {"store": str(self.store_path)}
+        if op == "submit":
+            entry = FeedbackEntry(**data["entry"])
+            if not data.get("merge", True):
+                self.store.save(entry)
+                return {"entry": entry.model_dump(mode="json"), "merged": False}
+            stored, merged = save_or_merge(self.store, self.index, entry)
+            return {"entry": stored.model_dump(mode="json"), "merged": merged}
+        if op == "query":
+            filters = {k: data[k] for k in _QUERY_PARAMS if data.get(k) is not None}
+            # query, unlike iter_entries, answers from the warm cache and in-memory index.
+            return {"entries": [e.model_dump(mode="json") for e in self.store.query(**filters)]}
+        if op == "search":
+            hits = self.store.search(data["text"], limit=data.get("limit", 10))
+            return {"entries": [e.model_dump(mode="json") for e, _ in hits], "scores": [s for _, s in hits]}
+        raise ValueError(f"unknown op {op!r}")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: FeedbackDaemon
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                reply = {"ok": True, **self.server.handle_request_data(json.loads(line))}
+            except ValidationError as exc:
+                reply = {"ok": False, "error": _validation_message(exc)}
+            except (ValueError, KeyError, TypeError) as exc:
+                reply = {"ok": False, "error": f"bad request: {exc}"}
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+            self.wfile.flush()
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in exc.errors())
+
+
+@contextlib.asynccontextmanager
+async def running_daemon(store_path: Path, startup_timeout: float = 10.0) -> AsyncIterator[str | None]:
+    """Run ``agent-feedback serve`` for the block; yields its socket path.
+
+    Yields None if the daemon didn't come up in time, in which case clients
+    simply use the store directly.
+    """
+    path = socket_path(str(store_path))
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "agent_feedback.cli", "serve",
+        env={**os.environ, "AGENT_FEEDBACK_STORE": str(store_path), "AGENT_FEEDBACK_SOCKET": path},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        ready = False
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + startup_timeout
+        while proc.returncode is None and loop.time() < deadline:
+            if await asyncio.to_thread(request, path, "ping") is not None:
+                ready = True
+                break
+            await asyncio.sleep(0.05)
+        yield path if ready else None
+    finally:
+        if proc.returncode is None:
+            proc.terminate()
+            await proc.wait()
@@ -0,0 +1,246 @@
+"""Near-duplicate detection and merging of tips.
+
+Each tip's ``title`` + ``detail`` gets two fingerprints: an exact hash of its
+normalized tokens, and a MinHash signature over word bigrams whose Jaccard
+similarity it estimates. Signatures are split into LSH bands; two tips that
+share any band bucket are candidates, and a candidate whose estimated
+similarity reaches the threshold is treated as a restatement, provided it
+has the same task type and category: the same words can be a tip for one
+task and a gotcha for another.
+
+``DuplicateIndex`` keeps the fingerprints and band buckets in a SQLite side
+database, so finding candidates is a handful of indexed lookups however
+large the store is. It catches up with the store through ``changes_since``.
+"""
+
+import hashlib
+import json
+import random
+import sqlite3
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from agent_feedback.models import FeedbackLike, FeedbackRecord
+from agent_feedback.search import tokenize
+from agent_feedback.store import Cursor, FeedbackStore, is_directory_store
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+DEFAULT_THRESHOLD = 0.7
+
+# Each "permutation" XORs a fixed random mask into a shingle's 64-bit hash.
+# That is several times cheaper than modular hashing in pure Python and, over
+# well-mixed hashes, still gives an unbiased similarity estimate.
+_MASKS = [random.Random(0x5EED + i).getrandbits(64) for i in range(NUM_PERM)]
+_EMPTY = (1 << 64) - 1
+
+
+def content_hash(title: str, detail: str) -> str:
+    """Hash of the normalized text, so case, punctuation and spacing don't matter."""
+    text = " ".join(tokenize(f"{title}\n{detail}"))
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def signature(title: str, detail: str) -> array:
+    """MinHash signature of the text's word bigrams."""
+    tokens = tokenize(f"{title}\n{detail}")
+    shingles = {f"{a} {b}" for a, b in zip(tokens, tokens[1:])} or set(tokens)
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") for s in shingles]
+    if not hashes:
+        return array("Q", [_EMPTY] * NUM_PERM)
+    return array("Q", [min([h ^ mask for h in hashes]) for mask in _MASKS])
+
+
+def similarity(a: array, b: array) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def band_keys(sig: array) -> list[int]:
+    keys = []
+    for band in range(BANDS):
+        chunk = sig[band * ROWS:(band + 1) * ROWS].tobytes() + bytes([band])
+        keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True))
+    return keys
+
+
+def same_kind(a: FeedbackLike, b: FeedbackLike) -> bool:
+    """Whether two tips are for the same task type and of the same category, as merged tips must be."""
+    return a.task_type == b.task_type and a.category == b.category
+
+
+def merge(existing: FeedbackRecord, incoming: FeedbackLike) -> FeedbackRecord:
+    """Fold a restated tip into the one it repeats.
+
+    A new supporting agent raises confidence as independent evidence would
+    (noisy-or); the same agent repeating itself only keeps the higher value.
+    """
+    supporters = list(existing.supporters)
+    if incoming.agent_id != existing.agent_id and incoming.agent_id not in supporters:
+        supporters.append(incoming.agent_id)
+        confidence = 1 - (1 - existing.confidence) * (1 - incoming.confidence)
+    else:
+        confidence = max(existing.confidence, incoming.confidence)
+    return existing._replace(
+        confidence=confidence,
+        tags=list(dict.fromkeys([*existing.tags, *incoming.tags])),
+        supporters=supporters,
+    )
+
+
+class DuplicateIndex:
+    """MinHash/LSH fingerprints of a store's tips, kept in a SQLite database.
+
+    ``path`` defaults to an in-memory database, which suits one-off passes
+    such as ``dedupe_store``.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            entry_id TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            signature BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_fingerprints_hash ON fingerprints(content_hash);
+        CREATE TABLE IF NOT EXISTS buckets (
+            band_key INTEGER NOT NULL,
+            entry_id TEXT NOT NULL,
+            PRIMARY KEY (band_key, entry_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_buckets_entry ON buckets(entry_id);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path: Path | str = ":memory:", threshold: float = DEFAULT_THRESHOLD) -> None:
+        self.threshold = threshold
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self._SCHEMA)
+
+    def sync(self, store: FeedbackStore) -> None:
+        """Fingerprint whatever the store gained since the last sync."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'cursor'").fetchone()
+        cursor: Cursor = json.loads(row[0]) if row is not None else 0
+        changes, cursor = store.changes_since(cursor)
+        with self._conn:
+            self._add(changes)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('cursor', ?)", (json.dumps(cursor),)
+            )
+
+    def add(self, entry: FeedbackLike) -> None:
+        with self._conn:
+            self._add([entry])
+
+    def remove(self, entry_id: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM buckets WHERE entry_id = ?", (entry_id,))
+            self._conn.execute("DELETE FROM fingerprints WHERE entry_id = ?", (entry_id,))
+
+    def find(self, entry: FeedbackLike) -> list[tuple[str, float]]:
+        """Stored tips ``entry`` nearly duplicates, most similar first."""
+        exact = self._conn.execute(
+            "SELECT entry_id FROM fingerprints WHERE content_hash = ? AND entry_id != ?",
+            (content_hash(entry.title, entry.detail), entry.id),
+        ).fetchall()
+        matches = {entry_id: 1.0 for (entry_id,) in exact}
+        sig = signature(entry.title, entry.detail)
+        keys = band_keys(sig)
+        placeholders = ", ".join("?" for _ in keys)
+        rows = self._conn.execute(
+            f"SELECT entry_id, signature FROM fingerprints WHERE entry_id IN ("
+            f"SELECT entry_id FROM buckets WHERE band_key IN ({placeholders})) AND entry_id != ?",
+            (*keys, entry.id),
+        )
+        for entry_id, blob in rows:
+            if entry_id in matches:
+                continue
+            candidate = array("Q")
+            candidate.frombytes(blob)
+            score = similarity(sig, candidate)
+            if score >= self.threshold:
+                matches[entry_id] = score
+        return sorted(matches.items(), key=lambda m: -m[1])
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _add(self, entries: Iterable[FeedbackLike]) -> None:
+        fingerprints = []
+        buckets = []
+        for entry in entries:
+            sig = signature(entry.title, entry.detail)
+            fingerprints.append((entry.id, content_hash(entry.title, entry.detail), sig.tobytes()))
+            buckets.extend((key, entry.id) for key in band_keys(sig))
+        # An updated entry re-enters with its new fingerprint.
+        self._conn.executemany("DELETE FROM buckets WHERE entry_id = ?", [(f[0],) for f in fingerprints])
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO fingerprints (entry_id, content_hash, signature) VALUES (?, ?, ?)",
+            fingerprints,
+        )
+        self._conn.executemany("INSERT OR IGNORE INTO buckets (band_key, entry_id) VALUES (?, ?)", buckets)
+
+
+def dedupe_index_path(store_path: Path) -> Path:
+    """Where the duplicate index for the store at ``store_path`` lives."""
+    if is_directory_store(store_path):
+        return store_path / "DEDUPE.db"
+    return store_path.with_name(store_path.name + ".dedupe")
+
+
+def save_or_merge(store: FeedbackStore, index: DuplicateIndex, entry: FeedbackLike) -> tuple[FeedbackLike, bool]:
+    """Save ``entry``, or merge it into a stored tip it nearly duplicates.
+
+    Returns the entry as stored and whether it was merged.
+    """
+    index.sync(store)
+    for entry_id, _score in index.find(entry):
+        existing = store.get(entry_id)
+        if existing is None:
+            # Deleted since it was fingerprinted.
+            index.remove(entry_id)
+            continue
+        if not same_kind(existing, entry):
+            continue
+        merged = merge(existing, entry)
+        store.update(merged)
+        return merged, True
+    store.save(entry)
+    return entry, False
+
+
+@dataclass
+class DedupeStats:
+    examined: int
+    merged: int
+
+
+def dedupe_store(store: FeedbackStore, threshold: float = DEFAULT_THRESHOLD) -> DedupeStats:
+    """Merge every near-duplicate already in the store into its earliest copy."""
+    index = DuplicateIndex(threshold=threshold)
+    kept: dict[str, FeedbackRecord] = {}
+    changed: set[str] = set()
+    dropped: list[str] = []
+    for entry in store.iter_entries():
+        target = next(
+            (entry_id for entry_id, _ in index.find(entry) if entry_id in kept and same_kind(kept[entry_id], entry)),
+            None,
+        )
+        if target is None:
+            kept[entry.id] = entry
+            index.add(entry)
+        else:
+            kept[target] = merge(kept[target], entry)
+            changed.add(target)
+            dropped.append(entry.id)
+    index.close()
+    for entry_id in changed:
+        store.update(kept[entry_id])
+    store.delete_many(dropped)
+    return DedupeStats(examined=len(kept) + len(dropped), merged=len(dropped))
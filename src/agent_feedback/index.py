@@ -0,0 +1,187 @@
+"""Inverted index from task type, agent and tag values to entry ordinals.
+
+An entry's ordinal is its position in the store's append order, so posting
+lists are built already sorted and stay that way as entries are added.
+Queries combine posting lists by merging (``any``) or by probing the
+smallest list against the others (``all``), which costs time in proportion
+to the lists involved rather than to the size of the store.
+
+On disk an index is a magic string, a JSON header holding the source file's
+position (a ``SnapshotHeader``) and a directory of ``value -> (start,
+count)``, followed by the posting lists and the byte offset of every entry.
+``IndexReader`` reads just the directory up front and seeks to the posting
+lists and offsets a query actually needs.
+"""
+
+import heapq
+import json
+import os
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from dataclasses import asdict
+from pathlib import Path
+
+from agent_feedback.models import FeedbackLike
+from agent_feedback.snapshot import U32, SnapshotHeader, pack_array, unpack_array
+
+MAGIC = b"AFIDX001"
+FIELDS = ("task_type", "agent_id", "tags")
+
+_U32_SIZE = array("I").itemsize
+_I64_SIZE = array("q").itemsize
+_EMPTY = array("I")
+
+
+class InvertedIndex:
+    """In-memory posting lists, extended as entries are appended."""
+
+    def __init__(self) -> None:
+        self.postings: dict[str, dict[str, array]] = {field: {} for field in FIELDS}
+        self.offsets = array("q")
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def extend(self, entries: Iterable[FeedbackLike], offsets: Iterable[int]) -> None:
+        task_types = self.postings["task_type"]
+        agent_ids = self.postings["agent_id"]
+        tags = self.postings["tags"]
+        ordinal = len(self.offsets)
+        for entry, offset in zip(entries, offsets):
+            self.offsets.append(offset)
+            _posting(task_types, entry.task_type).append(ordinal)
+            _posting(agent_ids, entry.agent_id).append(ordinal)
+            for tag in dict.fromkeys(entry.tags):
+                _posting(tags, tag).append(ordinal)
+            ordinal += 1
+
+    def lookup(self, field: str, value: str) -> Sequence[int]:
+        return self.postings[field].get(value, _EMPTY)
+
+    def write(self, path: Path, header: SnapshotHeader) -> None:
+        """Atomically write the index, recording where its source file stood."""
+        directory: dict[str, dict[str, list[int]]] = {}
+        blocks: list[bytes] = []
+        pos = 0
+        for field, postings in self.postings.items():
+            directory[field] = {}
+            for value, ordinals in postings.items():
+                directory[field][value] = [pos, len(ordinals)]
+                blocks.append(pack_array(ordinals))
+                pos += len(ordinals) * _U32_SIZE
+        meta = {**asdict(header), "rows": len(self.offsets), "offsets_at": pos, "directory": directory}
+        payload = json.dumps(meta).encode()
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            f.write(MAGIC + U32.pack(len(payload)) + payload)
+            f.writelines(blocks)
+            f.write(pack_array(self.offsets))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, reader: "IndexReader") -> "InvertedIndex":
+        """Read a persisted index fully into memory."""
+        index = cls()
+        data = memoryview(reader.path.read_bytes())[reader.data_start:]
+        for field, entries in reader.directory.items():
+            index.postings[field] = {
+                value: unpack_array("I", data[start:start + count * _U32_SIZE])
+                for value, (start, count) in entries.items()
+            }
+        at = reader.offsets_at
+        index.offsets = unpack_array("q", data[at:at + reader.rows * _I64_SIZE])
+        return index
+
+
+class IndexReader:
+    """A persisted index whose posting lists are read on demand."""
+
+    def __init__(self, path: Path, meta: dict, data_start: int) -> None:
+        self.path = path
+        self.data_start = data_start
+        self.rows: int = meta.pop("rows")
+        self.offsets_at: int = meta.pop("offsets_at")
+        self.directory: dict[str, dict[str, list[int]]] = meta.pop("directory")
+        self.header = SnapshotHeader(**meta)
+
+    def lookup(self, field: str, value: str) -> Sequence[int]:
+        entry = self.directory.get(field, {}).get(value)
+        if entry is None:
+            return _EMPTY
+        start, count = entry
+        with self.path.open("rb") as f:
+            f.seek(self.data_start + start)
+            return unpack_array("I", memoryview(f.read(count * _U32_SIZE)))
+
+    def offsets(self, ordinals: Sequence[int]) -> list[int]:
+        """Byte offsets of the given (sorted) ordinals, reading only runs that cover them."""
+        result: list[int] = []
+        with self.path.open("rb") as f:
+            i = 0
+            while i < len(ordinals):
+                # Adjacent ordinals are fetched with a single read.
+                j = i + 1
+                while j < len(ordinals) and ordinals[j] == ordinals[j - 1] + 1:
+                    j += 1
+                f.seek(self.data_start + self.offsets_at + ordinals[i] * _I64_SIZE)
+                result.extend(unpack_array("q", memoryview(f.read((j - i) * _I64_SIZE))))
+                i = j
+        return result
+
+
+def read_index(path: Path) -> IndexReader | None:
+    """The index's directory, or None if it is missing or not an index."""
+    try:
+        with path.open("rb") as f:
+            head = f.read(len(MAGIC) + U32.size)
+            if len(head) < len(MAGIC) + U32.size or not head.startswith(MAGIC):
+                return None
+            (size,) = U32.unpack_from(head, len(MAGIC))
+            meta = json.loads(f.read(size))
+    except FileNotFoundError:
+        return None
+    return IndexReader(path, meta, len(MAGIC) + U32.size + size)
+
+
+def select(
+    required: list[Sequence[int]],
+    any_of: list[Sequence[int]],
+    excluded: list[Sequence[int]],
+) -> list[int]:
+    """Sorted ordinals present in every ``required`` list, in at least one
+    ``any_of`` list (when any are given) and in none of the ``excluded`` ones.
+
+    At least one of ``required``/``any_of`` must be non-empty.
+    """
+    if any_of:
+        candidates: Iterable[int] = _union(any_of)
+    else:
+        required = sorted(required, key=len)
+        candidates, required = required[0], required[1:]
+    return [
+        o for o in candidates
+        if all(_contains(p, o) for p in required) and not any(_contains(p, o) for p in excluded)
+    ]
+
+
+def _posting(postings: dict[str, array], value: str) -> array:
+    ordinals = postings.get(value)
+    if ordinals is None:
+        ordinals = postings[value] = array("I")
+    return ordinals
+
+
+def _union(lists: list[Sequence[int]]) -> list[int]:
+    if len(lists) == 1:
+        return list(lists[0])
+    merged: list[int] = []
+    for o in heapq.merge(*lists):
+        if not merged or merged[-1] != o:
+            merged.append(o)
+    return merged
+
+
+def _contains(ordinals: Sequence[int], ordinal: int) -> bool:
+    i = bisect_left(ordinals, ordinal)
+    return i < len(ordinals) and ordinals[i] == ordinal
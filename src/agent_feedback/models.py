@@ -1,5 +1,7 @@
+import json
 from datetime import UTC, datetime
 from enum import Enum
+from typing import Any, NamedTuple
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
@@ -25,3 +27,77 @@ class FeedbackEntry(BaseModel):
     timestamp: datetime = Field(default_factory=lambda: datetime.now(UTC))
     harness: str = ""
     parent_tips_used: list[str] = Field(default_factory=list)
+    # Other agents whose near-duplicate submissions were merged into this one.
+    supporters: list[str] = Field(default_factory=list)
+
+
+_CATEGORIES = {c.value: c for c in FeedbackCategory}
+
+
+class FeedbackRecord(NamedTuple):
+    """Compact, read-only view of a stored entry, built without validation.
+
+    Stores hand these back from their read paths: rows were validated as
+    ``FeedbackEntry`` when submitted, so re-checking bounds, enum values and
+    dates on every read is wasted work. A tuple-backed record carries the
+    same attributes in a fraction of the memory of a pydantic model.
+    """
+
+    id: str
+    agent_id: str
+    task_type: str
+    category: FeedbackCategory
+    title: str
+    detail: str
+    confidence: float
+    tags: list[str]
+    timestamp: datetime
+    harness: str
+    parent_tips_used: list[str]
+    supporters: list[str]
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "FeedbackRecord":
+        """Build from a decoded JSON object as written by ``FeedbackEntry.model_dump_json``."""
+        return cls(
+            data["id"],
+            data["agent_id"],
+            data["task_type"],
+            _CATEGORIES[data["category"]],
+            data["title"],
+            data["detail"],
+            data.get("confidence", 1.0),
+            data.get("tags") or [],
+            datetime.fromisoformat(data["timestamp"]),
+            data.get("harness", ""),
+            data.get("parent_tips_used") or [],
+            data.get("supporters") or [],
+        )
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "FeedbackRecord":
+        return cls.from_dict(json.loads(raw))
+
+    def to_entry(self) -> FeedbackEntry:
+        return FeedbackEntry.model_construct(**self._asdict())
+
+    def model_dump(self, mode: str = "python") -> dict[str, Any]:
+        """Same shape as ``FeedbackEntry.model_dump`` so callers can treat both alike."""
+        data = self._asdict()
+        if mode == "json":
+            data["category"] = self.category.value
+            data["timestamp"] = _json_datetime(self.timestamp)
+        return data
+
+    def model_dump_json(self) -> str:
+        return json.dumps(self.model_dump(mode="json"), ensure_ascii=False, separators=(",", ":"))
+
+
+# Anything a store accepts for writing; reads always return FeedbackRecord.
+FeedbackLike = FeedbackEntry | FeedbackRecord
+
+
+def _json_datetime(value: datetime) -> str:
+    # Match pydantic's serialization, which spells UTC as "Z".
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
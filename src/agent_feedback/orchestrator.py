@@ -1,11 +1,31 @@
 import asyncio
-import shutil
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
 from pathlib import Path
 
-from agent_feedback.adapters import get_adapter
-from agent_feedback.prompt_builder import build_agent_prompt
-from agent_feedback.store import JSONLStore
+from rich.console import Console
+
+from agent_feedback.adapters import RunPolicy, get_adapter
+from agent_feedback.async_store import ThreadedStore
+from agent_feedback.checkpoint import STATE_NAME, AgentCheckpoint, ResumeError, RunState, prompt_hash, run_fingerprint
+from agent_feedback.client import SOCKET_ENV
+from agent_feedback.condense import TipClusterer
+from agent_feedback.daemon import running_daemon
+from agent_feedback.dedupe import dedupe_index_path
+from agent_feedback.models import FeedbackRecord
+from agent_feedback.prompt_builder import DEFAULT_TIP_BUDGET, build_agent_prompt, select_tips
+from agent_feedback.store import AsyncFeedbackStore, Cursor, as_utc
 from agent_feedback.stream import StreamDisplay
+from agent_feedback.workspace import retire_workspace, seed_workspace
+
+
+@dataclass
+class DemoSummary:
+    # Tips each agent submitted, in agent order.
+    agent_tips: list[int] = field(default_factory=list)
+    total_tips: int = 0
+    # Agents whose run failed or timed out after all their attempts.
+    failed_agents: list[str] = field(default_factory=list)
 
 
 async def run_demo(
@@ -15,65 +35,205 @@ async def run_demo(
     store_path: Path = Path("feedback_data/feedback.jsonl"),
     workspace_dir: Path = Path("workspace"),
     reset: bool = True,
-) -> None:
-    store = JSONLStore(store_path)
-    display = StreamDisplay()
-
-    if reset:
-        store.clear()
-        if workspace_dir.exists():
-            shutil.rmtree(workspace_dir)
-        workspace_dir.mkdir(parents=True, exist_ok=True)
-
+    tip_budget: int | None = DEFAULT_TIP_BUDGET,
+    condense: bool = True,
+    parallel: int = 1,
+    policy: RunPolicy | None = None,
+    console: Console | None = None,
+    template: Path | None = None,
+    link_mode: str = "auto",
+    resume: bool = False,
+) -> DemoSummary:
+    """Run ``num_agents`` agents on the task, each learning from the ones before.
+
+    Agents run in waves of ``parallel``: every agent of a wave starts from
+    the tips of all earlier waves, and a semaphore keeps at most
+    ``parallel`` agents running at once. ``policy`` bounds each agent's
+    run; one that times out or fails is retried as it allows, and the
+    demo moves on once its attempts are used up.
+
+    With ``template``, each agent starts from a copy of that tree made with
+    ``link_mode`` (see ``workspace.seed_workspace``) instead of an empty
+    directory. A reset moves the old workspace aside at once and deletes it
+    in the background while the agents run.
+
+    Progress is checkpointed to ``run-state.json`` in the workspace (see
+    ``checkpoint``). With ``resume``, nothing is reset: the agents the
+    checkpoint shows finished are skipped, and the run carries on from
+    the wave that was in progress. ``ResumeError`` means there is no
+    checkpoint, or it was made with another task or settings;
+    ``num_agents`` may differ, to extend a finished chain.
+    """
     task = task_path.read_text()
-
-    agent_tip_counts: list[int] = []
-
-    for i in range(1, num_agents + 1):
+    state_path = workspace_dir / STATE_NAME
+    fingerprint = run_fingerprint(
+        task,
+        adapter=adapter_name,
+        parallel=parallel,
+        tip_budget=tip_budget,
+        condense=condense,
+        template=template,
+        link_mode=link_mode,
+    )
+    if resume:
+        state = RunState.load(state_path)
+        if state is None:
+            raise ResumeError(f"No run to resume in {workspace_dir}")
+        if state.fingerprint != fingerprint:
+            raise ResumeError(f"The run in {workspace_dir} used another task or other settings")
+    else:
+        state = RunState(fingerprint)
+
+    # Store I/O runs on a worker thread so the heartbeat and streaming never stall.
+    store = ThreadedStore(store_path)
+    display = StreamDisplay(console)
+
+    teardowns = []
+    if reset and not resume:
+        await store.clear()
+        # Its fingerprints would otherwise merge new tips into cleared ones.
+        dedupe_index_path(store_path).unlink(missing_ok=True)
+        teardowns.append(retire_workspace(workspace_dir))
+    workspace_dir.mkdir(parents=True, exist_ok=True)
+
+    summary = DemoSummary()
+    # Kept for the whole run, so each agent's prompt only clusters the new tips.
+    clusterer = TipClusterer() if condense else None
+    slots = asyncio.Semaphore(parallel)
+
+    async def run_agent(i: int, snapshot: list[FeedbackRecord], socket_path: str | None) -> None:
         agent_id = f"agent-{i}"
         is_first = i == 1
+        # Side-by-side agents share the terminal, so each labels its lines.
+        agent_display = display if parallel == 1 else StreamDisplay(display.console, label=agent_id)
+        agent_display.idle_timeout = policy.idle_timeout if policy is not None else None
 
-        existing_feedback = store.query(exclude_agent=agent_id)
+        existing_feedback = [e for e in snapshot if e.agent_id != agent_id]
         tip_count = len(existing_feedback)
 
-        display.show_agent_header(i, tip_count)
-
-        prompt = build_agent_prompt(
-            task=task,
-            agent_id=agent_id,
-            feedback_entries=existing_feedback,
-            is_first_agent=is_first,
-        )
-
-        agent_work_dir = workspace_dir / agent_id
-        agent_work_dir.mkdir(parents=True, exist_ok=True)
-
-        adapter = get_adapter(adapter_name)
-
-        agent_env = {"AGENT_FEEDBACK_STORE": str(store_path.resolve())}
-
-        store_count_before = len(store.get_all())
-
-        display.start_heartbeat()
-        result = await adapter.run(
-            prompt=prompt,
-            work_dir=agent_work_dir,
-            on_stream=display.on_stream,
-            env=agent_env,
-        )
-        await display.stop_heartbeat()
-
-        tips_submitted = len(store.get_all()) - store_count_before
-        agent_tip_counts.append(tips_submitted)
-
-        display.show_agent_footer(
-            agent_num=i,
-            tips_consumed=tip_count,
-            tips_submitted=tips_submitted,
-        )
-
-        if i < num_agents:
-            await asyncio.sleep(2)
-
-    total_tips = len(store.get_all())
-    display.show_demo_summary(agent_tip_counts, total_tips)
+        async with slots:
+            agent_display.show_agent_header(i, tip_count)
+
+            # The most useful tips that fit the budget; the rest are reported, not sent.
+            selection = select_tips(task, existing_feedback, tip_budget, clusterer=clusterer)
+            if not is_first and existing_feedback:
+                agent_display.show_tip_selection(selection)
+
+            prompt = build_agent_prompt(
+                task=task,
+                agent_id=agent_id,
+                feedback_entries=selection.entries,
+                is_first_agent=is_first,
+                clusterer=clusterer,
+            )
+
+            agent_work_dir = workspace_dir / agent_id
+            agent_work_dir.mkdir(parents=True, exist_ok=True)
+            if template is not None:
+                await asyncio.to_thread(seed_workspace, template, agent_work_dir, link_mode)
+
+            adapter = get_adapter(adapter_name, policy=policy)
+
+            agent_env = {"AGENT_FEEDBACK_STORE": str(store_path.resolve())}
+            if socket_path is not None:
+                agent_env[SOCKET_ENV] = socket_path
+
+            cursor = await store.cursor()
+
+            agent_display.start_heartbeat()
+            follower = asyncio.create_task(_follow_submissions(store, cursor, agent_id, agent_display))
+            try:
+                result = await adapter.run_with_retries(
+                    prompt=prompt,
+                    work_dir=agent_work_dir,
+                    on_stream=agent_display.on_stream,
+                    env=agent_env,
+                )
+            finally:
+                follower.cancel()
+                await asyncio.gather(follower, return_exceptions=True)
+            await agent_display.stop_heartbeat()
+
+            # Agents of the same wave write to the store too; count only this one's tips.
+            submitted, _ = await store.changes_since(cursor)
+            tips_submitted = sum(1 for e in submitted if _is_from(e, agent_id))
+
+            agent_display.show_agent_footer(
+                agent_num=i,
+                tips_consumed=len(selection.selected),
+                tips_submitted=tips_submitted,
+                result=result,
+            )
+            state.agents[i] = AgentCheckpoint(
+                tips_submitted=tips_submitted,
+                success=result.success,
+                prompt_hash=prompt_hash(prompt),
+                timed_out=result.timed_out,
+                attempts=result.attempts,
+            )
+            state.save(state_path)
+
+    # Agents' CLI calls go to a warm daemon instead of each re-reading the store.
+    try:
+        async with running_daemon(store_path.resolve()) as socket_path:
+            for first in range(state.wave_start, num_agents + 1, parallel):
+                wave = range(first, min(first + parallel, num_agents + 1))
+                todo = [i for i in wave if i not in state.agents]
+                if not todo:
+                    continue
+                if first == state.wave_start and state.wave_started is not None:
+                    # Resuming this wave: what its finished agents learned stays out of the others' prompts.
+                    snapshot = await _resume_wave(store, state, wave, todo)
+                    teardowns += [retire_workspace(workspace_dir / f"agent-{i}") for i in todo]
+                else:
+                    state.start_wave(first, await store.cursor(), datetime.now(UTC))
+                    state.save(state_path)
+                    # One read per wave: everything the earlier waves submitted.
+                    snapshot = [e async for e in store.iter_entries()]
+                await asyncio.gather(*(run_agent(i, snapshot, socket_path) for i in todo))
+
+                if parallel == 1 and wave.stop <= num_agents:
+                    await asyncio.sleep(2)
+        summary.total_tips = await store.count()
+    finally:
+        await store.aclose()
+
+    summary.agent_tips = [state.agents[i].tips_submitted for i in range(1, num_agents + 1)]
+    summary.failed_agents = [f"agent-{i}" for i in range(1, num_agents + 1) if not state.agents[i].success]
+    for teardown in teardowns:
+        if teardown is not None:
+            await asyncio.to_thread(teardown.join)
+    display.show_demo_summary(summary.agent_tips, summary.total_tips)
+    return summary
+
+
+async def _resume_wave(store: AsyncFeedbackStore, state: RunState, wave: range, todo: list[int]) -> list[FeedbackRecord]:
+    """The wave's starting tips, after dropping what its unfinished agents had submitted.
+
+    Their tips are deleted and their names struck from the supporters of
+    tips they restated. The confidence such a merge added stays: it can't be
+    told apart from the tip's own.
+    """
+    authors = {f"agent-{i}" for i in wave}
+    later, _ = await store.changes_since(state.wave_cursor)
+    created = [e for e in later if e.agent_id in authors and as_utc(e.timestamp) >= state.wave_started]
+    unfinished = {f"agent-{i}" for i in todo}
+    discarded = {e.id for e in created if e.agent_id in unfinished}
+    await store.delete_many(discarded)
+    for entry in later:
+        if entry.id not in discarded and unfinished.intersection(entry.supporters):
+            await store.update(entry._replace(supporters=[a for a in entry.supporters if a not in unfinished]))
+    exclude = {e.id for e in created}
+    return [e async for e in store.iter_entries() if e.id not in exclude]
+
+
+async def _follow_submissions(store: AsyncFeedbackStore, cursor: Cursor, agent_id: str, display: StreamDisplay) -> None:
+    """Show the agent's submissions as they land in the store."""
+    async for entry in store.watch(cursor):
+        if _is_from(entry, agent_id):
+            display.on_feedback(entry)
+
+
+def _is_from(entry: FeedbackRecord, agent_id: str) -> bool:
+    # A restated tip is merged into an earlier one and credited as a supporter.
+    return entry.agent_id == agent_id or agent_id in entry.supporters
@@ -1,27 +1,177 @@
-from agent_feedback.models import FeedbackEntry
+import heapq
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from agent_feedback.condense import TipCluster, TipClusterer, format_cluster
+from agent_feedback.models import FeedbackLike
+from agent_feedback.search import TextIndex
+from agent_feedback.store import as_utc
+
+DEFAULT_TIP_BUDGET = 2000
+
+
+@dataclass(frozen=True)
+class SelectionWeights:
+    """How much each signal contributes to a tip's value, each on a 0-1 scale."""
+
+    relevance: float = 1.0
+    confidence: float = 0.5
+    recency: float = 0.25
+    recency_half_life: timedelta = timedelta(days=7)
+    # Every tip already chosen from a category scales the value of the next one by this.
+    diversity: float = 0.7
+    # Likewise for tips from the same cluster of related tips, when clustering.
+    redundancy: float = 0.3
+
+
+@dataclass
+class ScoredTip:
+    entry: FeedbackLike
+    score: float
+    tokens: int
+
+
+@dataclass
+class TipSelection:
+    """Tips chosen for a prompt, best first, and the ones left out for lack of budget."""
+
+    selected: list[ScoredTip]
+    dropped: list[ScoredTip]
+    budget: int | None
+
+    @property
+    def entries(self) -> list[FeedbackLike]:
+        return [tip.entry for tip in self.selected]
+
+    @property
+    def tokens(self) -> int:
+        return sum(tip.tokens for tip in self.selected)
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly four characters per token, as for English prose and code; no tokenizer needed."""
+    return (len(text) + 3) // 4
+
+
+def format_tip(entry: FeedbackLike) -> str:
+    tags_str = ", ".join(entry.tags) if entry.tags else "none"
+    support = f", confirmed by {', '.join(entry.supporters)}" if entry.supporters else ""
+    return (
+        f"### [{entry.category.value}] from {entry.agent_id} "
+        f"(confidence: {entry.confidence}{support})\n"
+        f'**"{entry.title}"**\n'
+        f"{entry.detail}\n"
+        f"Tags: {tags_str}\n"
+    )
+
+
+def select_tips(
+    task: str,
+    entries: Iterable[FeedbackLike],
+    budget: int | None = DEFAULT_TIP_BUDGET,
+    weights: SelectionWeights = SelectionWeights(),
+    now: datetime | None = None,
+    clusterer: TipClusterer | None = None,
+) -> TipSelection:
+    """Pick the most valuable tips whose rendered text fits in ``budget`` tokens.
+
+    A tip's value mixes its BM25 relevance to ``task`` (over title, detail
+    and tags, scaled so the best match scores 1), its confidence and its
+    recency. Tips are taken greedily by value, each discounted by
+    ``weights.diversity`` for every tip of its category already taken; a
+    tip too large for what is left of the budget is dropped and the next
+    one tried. ``budget=None`` keeps every tip, still ranked.
+
+    With a ``clusterer`` the tips are rendered condensed, so a tip whose
+    cluster is already in the prompt costs what it adds to the cluster's
+    block (its line, and the header naming its agent), and its value is
+    discounted by ``weights.redundancy`` for each tip of the cluster taken.
+    """
+    entries = list(entries)
+    now = as_utc(now) if now is not None else datetime.now(UTC)
+    index = TextIndex()
+    index.extend_texts(f"{e.title}\n{e.detail}\n{' '.join(e.tags)}" for e in entries)
+    relevance = dict(index.search(task, len(entries)))
+    best = max(relevance.values(), default=0.0) or 1.0
+
+    clusters = clusterer.assign(entries) if clusterer is not None else {}
+    values = []
+    for ordinal, entry in enumerate(entries):
+        age = max((now - as_utc(entry.timestamp)) / weights.recency_half_life, 0.0)
+        values.append(
+            weights.relevance * relevance.get(ordinal, 0.0) / best
+            + weights.confidence * entry.confidence
+            + weights.recency * 0.5**age
+        )
+
+    # Lazy greedy: a category's discount only grows, so a tip's stored value is an
+    # upper bound, and a tip whose value is still current when popped is the best.
+    heap = [(-value, ordinal, value) for ordinal, value in enumerate(values)]
+    heapq.heapify(heap)
+    taken: Counter[str] = Counter()
+    taken_from_cluster: dict[int, list[FeedbackLike]] = {}
+    selected: list[ScoredTip] = []
+    dropped: list[ScoredTip] = []
+    remaining = budget
+    while heap:
+        _, ordinal, stored = heapq.heappop(heap)
+        entry = entries[ordinal]
+        cluster = clusters.get(entry.id, -1)
+        members = taken_from_cluster.get(cluster, []) if clusterer is not None else []
+        repeats = len(members)
+        value = values[ordinal] * weights.diversity ** taken[entry.category.value] * weights.redundancy**repeats
+        if value < stored:
+            heapq.heappush(heap, (-value, ordinal, value))
+            continue
+        tokens = estimate_tokens(_render_block([*members, entry]))
+        if members:
+            # The block is re-rendered with the tip in it; its lead may even change.
+            tokens = max(tokens - estimate_tokens(_render_block(members)), 0)
+        tip = ScoredTip(entry, value, tokens)
+        if remaining is not None and tip.tokens > remaining:
+            dropped.append(tip)
+            continue
+        selected.append(tip)
+        taken[entry.category.value] += 1
+        taken_from_cluster.setdefault(cluster, []).append(entry)
+        if remaining is not None:
+            remaining -= tip.tokens
+    return TipSelection(selected, dropped, budget)
+
+
+def _render_block(members: list[FeedbackLike]) -> str:
+    """How ``build_agent_prompt`` renders tips of one cluster, in selection order."""
+    return format_cluster(TipCluster(members)) if len(members) > 1 else format_tip(members[0])
 
 
 def build_agent_prompt(
     task: str,
     agent_id: str,
-    feedback_entries: list[FeedbackEntry],
+    feedback_entries: Sequence[FeedbackLike],
     is_first_agent: bool = False,
+    token_budget: int | None = None,
+    clusterer: TipClusterer | None = None,
 ) -> str:
+    """The agent's prompt.
+
+    ``token_budget`` caps the tips through ``select_tips``; with a
+    ``clusterer`` related tips are condensed into one block each.
+    """
     sections: list[str] = []
 
     sections.append("## Your Task\n\n" + task.strip())
 
+    if token_budget is not None:
+        feedback_entries = select_tips(task, feedback_entries, token_budget, clusterer=clusterer).entries
+
     if not is_first_agent and feedback_entries:
         tips_lines: list[str] = ["## Tips & Experiences from Previous Agents\n"]
-        for entry in feedback_entries:
-            tags_str = ", ".join(entry.tags) if entry.tags else "none"
-            tips_lines.append(
-                f"### [{entry.category.value}] from {entry.agent_id} "
-                f"(confidence: {entry.confidence})\n"
-                f'**"{entry.title}"**\n'
-                f"{entry.detail}\n"
-                f"Tags: {tags_str}\n"
-            )
+        if clusterer is None:
+            tips_lines.extend(format_tip(entry) for entry in feedback_entries)
+        else:
+            tips_lines.extend(_render_block(c.members) for c in clusterer.cluster(feedback_entries))
         sections.append("\n".join(tips_lines))
 
     sections.append(
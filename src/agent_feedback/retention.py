@@ -0,0 +1,181 @@
+"""Retention policies that keep a store from growing without bound.
+
+A policy can expire tips past a ``max_age``. It can fade them: a tip's
+*score* is its confidence halved every ``half_life`` since its timestamp,
+and tips scoring below ``min_score`` are dropped. It can also cap a task
+type at ``max_entries`` tips, evicting the lowest scores first. Policies are
+set per task type, with a default for the rest, usually from a TOML file:
+
+    [default]
+    max_age = "90d"
+    half_life = "14d"
+    max_entries = 500
+
+    [task_types.build-todo-app]
+    max_entries = 100
+
+Choosing what to evict is one streaming pass over the store. The cap keeps
+a min-heap of the best ``max_entries`` scores per task type, so memory is
+bounded by the caps rather than by the size of the store.
+"""
+
+import heapq
+import re
+import tomllib
+from collections.abc import Iterable
+from dataclasses import dataclass, field, fields
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from agent_feedback.models import FeedbackLike
+from agent_feedback.sharded_store import ShardedStore
+from agent_feedback.store import FeedbackStore, JSONLStore, as_utc
+
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*$")
+_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_duration(text: str | int | float) -> timedelta:
+    """``"90d"``, ``"12h"``, ``"30m"``, ``"45s"``, ``"2w"`` or a number of seconds."""
+    if isinstance(text, int | float):
+        return timedelta(seconds=text)
+    match = _DURATION.match(text)
+    if match is None:
+        raise ValueError(f"Invalid duration {text!r}; use e.g. 90d, 12h, 30m or 45s")
+    return timedelta(seconds=float(match[1]) * _UNITS[match[2]])
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    max_age: timedelta | None = None
+    half_life: timedelta | None = None
+    min_score: float = 0.0
+    max_entries: int | None = None
+
+    @property
+    def is_noop(self) -> bool:
+        return self.max_age is None and self.min_score <= 0 and self.max_entries is None
+
+    def score(self, entry: FeedbackLike, now: datetime) -> float:
+        """Confidence, halved for every ``half_life`` of age."""
+        if self.half_life is None:
+            return entry.confidence
+        age = (now - as_utc(entry.timestamp)) / self.half_life
+        return entry.confidence * 0.5 ** max(age, 0.0)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RetentionPolicy":
+        unknown = set(data) - {f.name for f in fields(cls)}
+        if unknown:
+            raise ValueError(f"Unknown retention settings: {', '.join(sorted(unknown))}")
+        return cls(
+            max_age=parse_duration(data["max_age"]) if "max_age" in data else None,
+            half_life=parse_duration(data["half_life"]) if "half_life" in data else None,
+            min_score=float(data.get("min_score", 0.0)),
+            max_entries=int(data["max_entries"]) if "max_entries" in data else None,
+        )
+
+
+@dataclass(frozen=True)
+class RetentionConfig:
+    default: RetentionPolicy = RetentionPolicy()
+    task_types: dict[str, RetentionPolicy] = field(default_factory=dict)
+
+    def policy(self, task_type: str) -> RetentionPolicy:
+        return self.task_types.get(task_type, self.default)
+
+    @property
+    def is_noop(self) -> bool:
+        return self.default.is_noop and all(p.is_noop for p in self.task_types.values())
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RetentionConfig":
+        """Per-task-type sections inherit every setting they don't override from ``default``."""
+        base = data.get("default", {})
+        return cls(
+            default=RetentionPolicy.from_dict(base),
+            task_types={
+                task_type: RetentionPolicy.from_dict({**base, **overrides})
+                for task_type, overrides in data.get("task_types", {}).items()
+            },
+        )
+
+    @classmethod
+    def load(cls, path: Path | None, overrides: dict[str, Any] | None = None) -> "RetentionConfig":
+        """Read a TOML policy file (if any); ``overrides`` replace settings of its default policy."""
+        data: dict[str, Any] = {}
+        if path is not None:
+            with path.open("rb") as f:
+                data = tomllib.load(f)
+        if overrides:
+            data["default"] = {**data.get("default", {}), **overrides}
+        return cls.from_dict(data)
+
+
+@dataclass
+class RetentionStats:
+    examined: int = 0
+    expired: int = 0
+    decayed: int = 0
+    over_budget: int = 0
+
+    @property
+    def evicted(self) -> int:
+        return self.expired + self.decayed + self.over_budget
+
+
+def select_evictions(
+    entries: Iterable[FeedbackLike],
+    config: RetentionConfig,
+    now: datetime | None = None,
+) -> tuple[list[str], RetentionStats]:
+    """Ids of the entries ``config`` evicts, in one pass over ``entries``."""
+    now = as_utc(now) if now is not None else datetime.now(UTC)
+    stats = RetentionStats()
+    evicted: list[str] = []
+    # Per capped task type: a min-heap of (score, timestamp, ordinal, id), so
+    # the lowest score, and among equals the oldest, is pushed out first.
+    kept: dict[str, list[tuple[float, datetime, int, str]]] = {}
+    for ordinal, entry in enumerate(entries):
+        stats.examined += 1
+        policy = config.policy(entry.task_type)
+        timestamp = as_utc(entry.timestamp)
+        if policy.max_age is not None and now - timestamp > policy.max_age:
+            stats.expired += 1
+            evicted.append(entry.id)
+            continue
+        score = policy.score(entry, now)
+        if score < policy.min_score:
+            stats.decayed += 1
+            evicted.append(entry.id)
+            continue
+        if policy.max_entries is None:
+            continue
+        heap = kept.setdefault(entry.task_type, [])
+        item = (score, timestamp, ordinal, entry.id)
+        if len(heap) < policy.max_entries:
+            heapq.heappush(heap, item)
+        else:
+            stats.over_budget += 1
+            evicted.append(heapq.heappushpop(heap, item)[3] if heap else entry.id)
+    return evicted, stats
+
+
+def collect_garbage(
+    store: FeedbackStore,
+    config: RetentionConfig,
+    now: datetime | None = None,
+    dry_run: bool = False,
+) -> RetentionStats:
+    """Delete whatever ``config`` evicts from ``store``; ``dry_run`` only counts.
+
+    JSONL stores only blank deleted lines, so they are compacted afterwards to
+    give the space back; segmented stores reclaim it when they next compact.
+    """
+    evicted, stats = select_evictions(store.iter_entries(), config, now)
+    if not dry_run and evicted:
+        store.delete_many(evicted)
+        if isinstance(store, JSONLStore | ShardedStore):
+            store.compact()
+    return stats
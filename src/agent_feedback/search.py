@@ -0,0 +1,156 @@
+"""BM25 full-text index over tip titles and details.
+
+Like the tag index, documents are identified by their ordinal in the store's
+append order, so posting lists grow by appending and never need a rebuild.
+Each posting list pairs the ordinals containing a term with the term's
+frequency there; together with every document's length that is all BM25
+needs, and scoring a query only touches the lists of its own terms.
+
+The on-disk form mirrors ``index``: a magic string, a JSON header (the
+source position plus a ``term -> (start, count)`` directory) and the packed
+lists. ``TextIndexReader.load`` pulls in just the terms a query mentions.
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+from array import array
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import asdict
+from pathlib import Path
+
+from agent_feedback.models import FeedbackLike
+from agent_feedback.snapshot import U32, SnapshotHeader, pack_array, unpack_array
+
+MAGIC = b"AFFTS001"
+
+# Standard BM25 parameters: term-frequency saturation and length normalization.
+K1 = 1.2
+B = 0.75
+
+_U32_SIZE = array("I").itemsize
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+class TextIndex:
+    """In-memory BM25 index, extended as entries are appended."""
+
+    def __init__(self) -> None:
+        self.postings: dict[str, tuple[array, array]] = {}
+        self.lengths = array("I")
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def extend(self, entries: Iterable[FeedbackLike]) -> None:
+        self.extend_texts(f"{entry.title}\n{entry.detail}" for entry in entries)
+
+    def extend_texts(self, texts: Iterable[str]) -> None:
+        """Index arbitrary documents, for callers ranking more than titles and details."""
+        postings = self.postings
+        ordinal = len(self.lengths)
+        for text in texts:
+            terms = tokenize(text)
+            self.lengths.append(len(terms))
+            self.total_length += len(terms)
+            for term, tf in Counter(terms).items():
+                posting = postings.get(term)
+                if posting is None:
+                    posting = postings[term] = (array("I"), array("I"))
+                posting[0].append(ordinal)
+                posting[1].append(tf)
+            ordinal += 1
+
+    def search(self, query: str, limit: int) -> list[tuple[int, float]]:
+        """The ``limit`` best ``(ordinal, score)`` pairs, best first; ties keep store order."""
+        n = len(self.lengths)
+        if not n or limit <= 0:
+            return []
+        avgdl = self.total_length / n or 1.0
+        lengths = self.lengths
+        scores: dict[int, float] = {}
+        for term in dict.fromkeys(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            ordinals, tfs = posting
+            idf = math.log(1 + (n - len(ordinals) + 0.5) / (len(ordinals) + 0.5))
+            for o, tf in zip(ordinals, tfs):
+                norm = K1 * (1 - B + B * lengths[o] / avgdl)
+                scores[o] = scores.get(o, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        return heapq.nlargest(limit, scores.items(), key=lambda hit: (hit[1], -hit[0]))
+
+    def write(self, path: Path, header: SnapshotHeader) -> None:
+        """Atomically write the index, recording where its source file stood."""
+        directory: dict[str, list[int]] = {}
+        blocks: list[bytes] = []
+        pos = 0
+        for term, (ordinals, tfs) in self.postings.items():
+            directory[term] = [pos, len(ordinals)]
+            blocks += [pack_array(ordinals), pack_array(tfs)]
+            pos += 2 * len(ordinals) * _U32_SIZE
+        meta = {
+            **asdict(header),
+            "rows": len(self.lengths),
+            "total_length": self.total_length,
+            "lengths_at": pos,
+            "directory": directory,
+        }
+        payload = json.dumps(meta).encode()
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            f.write(MAGIC + U32.pack(len(payload)) + payload)
+            f.writelines(blocks)
+            f.write(pack_array(self.lengths))
+        os.replace(tmp, path)
+
+
+class TextIndexReader:
+    """A persisted text index whose posting lists are read on demand."""
+
+    def __init__(self, path: Path, meta: dict, data_start: int) -> None:
+        self.path = path
+        self.data_start = data_start
+        self.rows: int = meta.pop("rows")
+        self.total_length: int = meta.pop("total_length")
+        self.lengths_at: int = meta.pop("lengths_at")
+        self.directory: dict[str, list[int]] = meta.pop("directory")
+        self.header = SnapshotHeader(**meta)
+
+    def load(self, query: str | None = None) -> TextIndex:
+        """An in-memory index holding the terms of ``query`` (all terms if None)."""
+        index = TextIndex()
+        index.total_length = self.total_length
+        terms = self.directory if query is None else [t for t in dict.fromkeys(tokenize(query)) if t in self.directory]
+        with self.path.open("rb") as f:
+            for term in terms:
+                start, count = self.directory[term]
+                f.seek(self.data_start + start)
+                block = memoryview(f.read(2 * count * _U32_SIZE))
+                split = count * _U32_SIZE
+                index.postings[term] = (unpack_array("I", block[:split]), unpack_array("I", block[split:]))
+            f.seek(self.data_start + self.lengths_at)
+            index.lengths = unpack_array("I", memoryview(f.read(self.rows * _U32_SIZE)))
+        return index
+
+
+def read_text_index(path: Path) -> TextIndexReader | None:
+    """The index's directory, or None if it is missing or not a text index."""
+    try:
+        with path.open("rb") as f:
+            head = f.read(len(MAGIC) + U32.size)
+            if len(head) < len(MAGIC) + U32.size or not head.startswith(MAGIC):
+                return None
+            (size,) = U32.unpack_from(head, len(MAGIC))
+            meta = json.loads(f.read(size))
+    except FileNotFoundError:
+        return None
+    return TextIndexReader(path, meta, len(MAGIC) + U32.size + size)
@@ -0,0 +1,455 @@
+import json
+import os
+import threading
+from collections.abc import AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from agent_feedback.models import FeedbackLike, FeedbackRecord
+from agent_feedback.retention import RetentionConfig, select_evictions
+from agent_feedback.search import TextIndex
+from agent_feedback.store import Cursor, Durability, EntryFilter, TagMatch, fdatasync, locked_fd
+
+MANIFEST_NAME = "MANIFEST.json"
+LOCK_NAME = "LOCK"
+
+# (op, lsn, entry id, entry) where op is "put" or "del" and entry is None for "del".
+_Record = tuple[str, int, str, FeedbackRecord | None]
+
+
+@dataclass
+class CompactionStats:
+    segments_merged: int
+    records_kept: int
+    records_dropped: int
+    # Live entries removed by a retention policy; also counted as dropped.
+    records_evicted: int = 0
+
+
+class SegmentedStore:
+    """Log-structured store made of rotated JSONL segments listed in a manifest.
+
+    Every record carries a log sequence number (LSN). ``update`` appends a new
+    ``put`` for an existing id and ``delete`` appends a ``del`` tombstone; the
+    newest record for an id wins. Once the active segment reaches
+    ``segment_bytes`` it is sealed and a new one is started. ``compact`` folds
+    the sealed segments into a single segment of live records and removes the
+    old files, so reads only ever touch segments the manifest still lists.
+
+    With ``auto_compact_segments`` set, a background compaction starts once
+    that many sealed segments have piled up; leave it unset for short-lived
+    processes such as the CLI and run ``agent-feedback compact`` instead.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        segment_bytes: int = 4 * 1024 * 1024,
+        auto_compact_segments: int | None = None,
+        durability: Durability | str = Durability.NONE,
+    ) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.auto_compact_segments = auto_compact_segments
+        self.durability = Durability(durability)
+        self._compact_lock = threading.Lock()
+        self._compaction: threading.Thread | None = None
+        self._sealed_key: tuple[str, ...] | None = None
+        self._sealed_live: dict[str, FeedbackRecord] = {}
+        self._active_name: str | None = None
+        self._active_end: int = 0
+        self._text_key: tuple | None = None
+        self._text = TextIndex()
+        self._text_entries: list[FeedbackRecord] = []
+        self._text_ids: set[str] = set()
+        # How many of the active segment's records the text index has seen.
+        self._text_records = 0
+        self._active_records: list[_Record] = []
+        # The folded live view, rebuilt only when the segments have changed since.
+        self._live_key: tuple | None = None
+        self._live_view: dict[str, FeedbackRecord] = {}
+
+    def save(self, entry: FeedbackLike) -> None:
+        self.save_many([entry])
+
+    def save_many(self, entries: Iterable[FeedbackLike]) -> None:
+        self._append([("put", e.id, e) for e in entries])
+
+    def update(self, entry: FeedbackLike) -> None:
+        """Supersede the stored entry with the same id."""
+        self._append([("put", entry.id, entry)])
+
+    def delete(self, entry_id: str) -> None:
+        self._append([("del", entry_id, None)])
+
+    def delete_many(self, entry_ids: Iterable[str]) -> None:
+        self._append([("del", entry_id, None) for entry_id in entry_ids])
+
+    def get(self, entry_id: str) -> FeedbackRecord | None:
+        return self._live().get(entry_id)
+
+    def query(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> list[FeedbackRecord]:
+        return list(
+            self.iter_entries(task_type, tags, exclude_agent, tags_mode=tags_mode, exclude_tags=exclude_tags)
+        )
+
+    def iter_entries(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        since: datetime | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> Iterator[FeedbackRecord]:
+        criteria = EntryFilter(task_type, tags, exclude_agent, since, tags_mode, exclude_tags)
+        for entry in self._live().values():
+            if criteria.matches(entry):
+                yield entry
+
+    def search(self, text: str, limit: int = 10) -> list[tuple[FeedbackRecord, float]]:
+        """Live entries ranked by BM25 relevance to ``text``.
+
+        New entries appended to the active segment are added to the text
+        index as they arrive. It is rebuilt from the live entries only when an
+        update or delete retires an indexed document, or the sealed segments
+        change.
+        """
+        live = self._live()
+        key, records = self._live_key, self._active_records
+        if key != self._text_key:
+            same_segments = self._text_key is not None and key[:2] == self._text_key[:2]
+            if not (same_segments and self._extend_text(records[self._text_records:])):
+                self._text = TextIndex()
+                self._text_entries = list(live.values())
+                self._text_ids = {entry.id for entry in self._text_entries}
+                self._text.extend(self._text_entries)
+            self._text_key, self._text_records = key, len(records)
+        return [(self._text_entries[o], score) for o, score in self._text.search(text, limit)]
+
+    def get_all(self) -> list[FeedbackRecord]:
+        return list(self._live().values())
+
+    def count(self) -> int:
+        return len(self._live())
+
+    def cursor(self) -> Cursor:
+        return self._last_lsn(self._read_manifest())
+
+    def changes_since(self, cursor: Cursor) -> tuple[list[FeedbackRecord], Cursor]:
+        """The latest version of each entry put after LSN ``cursor``, if still live.
+
+        Entries come in the order of their latest put; sealed segments wholly
+        older than ``cursor`` are skipped.
+        """
+        for _ in range(3):
+            manifest = self._read_manifest()
+            names = [s["name"] for s in manifest["segments"] if s["max_lsn"] > cursor]
+            names.append(manifest["active"])
+            try:
+                changed: dict[str, FeedbackRecord] = {}
+                new_cursor = cursor
+                for name in names:
+                    records, _ = _read_records(self.root / name, 0, missing_ok=name == manifest["active"])
+                    for op, lsn, entry_id, entry in records:
+                        if lsn > cursor:
+                            new_cursor = max(new_cursor, lsn)
+                            # Popped first so a later put moves the entry to the end.
+                            changed.pop(entry_id, None)
+                            if op == "put":
+                                changed[entry_id] = entry  # type: ignore[assignment]
+                return list(changed.values()), new_cursor
+            except FileNotFoundError:
+                # A compaction swapped segments underneath us; re-read the manifest.
+                continue
+        raise RuntimeError(f"Segments in {self.root} kept changing while reading")
+
+    def watch(self, cursor: Cursor | None = None, poll_interval: float = 0.5) -> AsyncIterator[FeedbackRecord]:
+        """Entries written after ``cursor`` as they arrive (see ``watch.watch_store``)."""
+        # Imported here to keep asyncio out of short-lived CLI processes.
+        from agent_feedback.watch import watch_store
+
+        return watch_store(self, self.root, cursor, poll_interval)
+
+    def clear(self) -> None:
+        with locked_fd(self.root / LOCK_NAME, os.O_RDWR | os.O_CREAT):
+            manifest = self._read_manifest()
+            names = [s["name"] for s in manifest["segments"]] + [manifest["active"]]
+            # Kept, like after compaction, so LSNs (and cursors) are never reused.
+            manifest["sealed_lsn"] = self._last_lsn(manifest)
+            manifest["segments"] = []
+            manifest["active"] = _segment_name(manifest["next_segment"])
+            manifest["next_segment"] += 1
+            self._write_manifest(manifest)
+            for name in names:
+                (self.root / name).unlink(missing_ok=True)
+
+    def compact(self, retention: RetentionConfig | None = None) -> CompactionStats:
+        """Merge every sealed segment into one, dropping dead and superseded records.
+
+        The active segment is sealed first so its records are included. Writers
+        are only blocked while the manifest is read and swapped, not while the
+        merged segment is written. With ``retention``, entries the policy evicts
+        are left out of the merged segment too, with no tombstones needed.
+        """
+        with self._compact_lock:
+            with locked_fd(self.root / LOCK_NAME, os.O_RDWR | os.O_CREAT):
+                manifest = self._read_manifest()
+                if (self.root / manifest["active"]).exists():
+                    self._rotate(manifest)
+                merged = [s["name"] for s in manifest["segments"]]
+                if len(merged) <= 1 and retention is None and not self._has_dead_records(merged):
+                    return CompactionStats(0, 0, 0)
+                output = _segment_name(manifest["next_segment"])
+                manifest["next_segment"] += 1
+                self._write_manifest(manifest)
+
+            total = 0
+            live: dict[str, tuple[int, FeedbackRecord]] = {}
+            for name in merged:
+                for op, lsn, entry_id, entry in _read_records(self.root / name, 0)[0]:
+                    total += 1
+                    if op == "del":
+                        live.pop(entry_id, None)
+                    else:
+                        live[entry_id] = (lsn, entry)  # type: ignore[assignment]
+            evicted: list[str] = []
+            if retention is not None:
+                evicted, _ = select_evictions((entry for _, entry in live.values()), retention)
+                for entry_id in evicted:
+                    del live[entry_id]
+
+            max_lsn = 0
+            if live:
+                tmp = self.root / (output + ".tmp")
+                with tmp.open("w") as f:
+                    for lsn, entry in live.values():
+                        f.write(_put_line(lsn, entry))
+                        max_lsn = max(max_lsn, lsn)
+                os.replace(tmp, self.root / output)
+
+            with locked_fd(self.root / LOCK_NAME, os.O_RDWR | os.O_CREAT):
+                manifest = self._read_manifest()
+                current = [s["name"] for s in manifest["segments"]]
+                if current[: len(merged)] != merged:
+                    # Another process compacted or cleared the store meanwhile.
+                    (self.root / output).unlink(missing_ok=True)
+                    return CompactionStats(0, 0, 0)
+                replacement = [{"name": output, "max_lsn": max_lsn}] if live else []
+                manifest["segments"] = replacement + manifest["segments"][len(merged):]
+                self._write_manifest(manifest)
+            for name in merged:
+                (self.root / name).unlink(missing_ok=True)
+            return CompactionStats(len(merged), len(live), total - len(live), len(evicted))
+
+    def compact_in_background(self) -> threading.Thread:
+        """Run ``compact`` on a daemon thread unless one is already running."""
+        if self._compaction is not None and self._compaction.is_alive():
+            return self._compaction
+        self._compaction = threading.Thread(target=self.compact, name="feedback-compaction", daemon=True)
+        self._compaction.start()
+        return self._compaction
+
+    def _append(self, ops: list[tuple[str, str, FeedbackLike | None]]) -> None:
+        if not ops:
+            return
+        sealed_count = 0
+        with locked_fd(self.root / LOCK_NAME, os.O_RDWR | os.O_CREAT):
+            manifest = self._read_manifest()
+            lsn = self._last_lsn(manifest)
+            lines: list[str] = []
+            for op, entry_id, entry in ops:
+                lsn += 1
+                if op == "put":
+                    lines.append(_put_line(lsn, entry))  # type: ignore[arg-type]
+                else:
+                    lines.append(json.dumps({"op": "del", "lsn": lsn, "id": entry_id}) + "\n")
+            fd = os.open(self.root / manifest["active"], os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                view = memoryview("".join(lines).encode())
+                while view:
+                    view = view[os.write(fd, view):]
+                if self.durability is Durability.FLUSH:
+                    fdatasync(fd)
+                elif self.durability is Durability.FSYNC:
+                    os.fsync(fd)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            if size >= self.segment_bytes:
+                self._rotate(manifest, lsn)
+            sealed_count = len(manifest["segments"])
+        if self.auto_compact_segments is not None and sealed_count >= self.auto_compact_segments:
+            self.compact_in_background()
+
+    def _rotate(self, manifest: dict, max_lsn: int | None = None) -> None:
+        """Seal the active segment and start a new one. Caller holds the lock."""
+        if max_lsn is None:
+            max_lsn = self._last_lsn(manifest)
+        manifest["segments"].append({"name": manifest["active"], "max_lsn": max_lsn})
+        manifest["sealed_lsn"] = max_lsn
+        manifest["active"] = _segment_name(manifest["next_segment"])
+        manifest["next_segment"] += 1
+        self._write_manifest(manifest)
+
+    def _extend_text(self, records: list[_Record]) -> bool:
+        """Index newly appended entries, or return False if one retires an indexed document."""
+        added: dict[str, FeedbackRecord] = {}
+        for op, _, entry_id, entry in records:
+            if entry_id in self._text_ids or entry_id in added:
+                return False
+            if op == "put":
+                added[entry_id] = entry  # type: ignore[assignment]
+        self._text.extend(added.values())
+        self._text_entries.extend(added.values())
+        self._text_ids.update(added)
+        return True
+
+    def _has_dead_records(self, names: list[str]) -> bool:
+        seen: set[str] = set()
+        for name in names:
+            for op, _, entry_id, _ in _read_records(self.root / name, 0)[0]:
+                if op == "del" or entry_id in seen:
+                    return True
+                seen.add(entry_id)
+        return False
+
+    def _live(self) -> dict[str, FeedbackRecord]:
+        for _ in range(3):
+            manifest = self._read_manifest()
+            try:
+                return self._fold(manifest)
+            except FileNotFoundError:
+                # A compaction swapped segments underneath us; re-read the manifest.
+                self._sealed_key = None
+                continue
+        raise RuntimeError(f"Segments in {self.root} kept changing while reading")
+
+    def _fold(self, manifest: dict) -> dict[str, FeedbackRecord]:
+        # Sealed segments are immutable, so their folded state is cached until
+        # the manifest's list of sealed segments changes.
+        sealed_key = tuple(s["name"] for s in manifest["segments"])
+        if sealed_key != self._sealed_key:
+            live: dict[str, FeedbackRecord] = {}
+            for name in sealed_key:
+                _apply(live, _read_records(self.root / name, 0)[0])
+            self._sealed_live = live
+            self._sealed_key = sealed_key
+
+        active = self.root / manifest["active"]
+        if manifest["active"] != self._active_name:
+            self._active_name = manifest["active"]
+            self._active_end = 0
+            self._active_records = []
+        records, self._active_end = _read_records(active, self._active_end, missing_ok=True)
+        self._active_records.extend(records)
+
+        # A new dict per change rather than one patched in place, so iterators
+        # over an earlier view survive writes made while they run.
+        key = (sealed_key, self._active_name, self._active_end)
+        if key != self._live_key:
+            live = dict(self._sealed_live)
+            _apply(live, self._active_records)
+            self._live_view, self._live_key = live, key
+        return self._live_view
+
+    def _last_lsn(self, manifest: dict) -> int:
+        last = _last_line(self.root / manifest["active"])
+        if last is not None:
+            return json.loads(last)["lsn"]
+        # Tracked separately from the segments so LSNs are never reused, even
+        # after compaction drops the records that carried the highest ones.
+        return manifest["sealed_lsn"]
+
+    def _read_manifest(self) -> dict:
+        try:
+            return json.loads((self.root / MANIFEST_NAME).read_text())
+        except FileNotFoundError:
+            return {
+                "version": 1,
+                "next_segment": 2,
+                "sealed_lsn": 0,
+                "segments": [],
+                "active": _segment_name(1),
+            }
+
+    def _write_manifest(self, manifest: dict) -> None:
+        tmp = self.root / (MANIFEST_NAME + ".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, self.root / MANIFEST_NAME)
+
+
+def _segment_name(number: int) -> str:
+    return f"seg-{number:06d}.jsonl"
+
+
+def _put_line(lsn: int, entry: FeedbackLike) -> str:
+    return f'{{"op":"put","lsn":{lsn},"entry":{entry.model_dump_json()}}}\n'
+
+
+def _apply(live: dict[str, FeedbackRecord], records: Iterable[_Record]) -> None:
+    for op, _, entry_id, entry in records:
+        if op == "del":
+            live.pop(entry_id, None)
+        else:
+            live[entry_id] = entry  # type: ignore[assignment]
+
+
+def _read_records(path: Path, offset: int, missing_ok: bool = False) -> tuple[list[_Record], int]:
+    """Parse complete records from ``offset`` onwards; return them and the new offset."""
+    try:
+        with path.open("rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        if missing_ok:
+            return [], offset
+        raise
+    records: list[_Record] = []
+    *lines, _partial = data.split(b"\n")
+    for line in lines:
+        offset += len(line) + 1
+        if not line.strip():
+            continue
+        raw = json.loads(line)
+        if raw["op"] == "del":
+            records.append(("del", raw["lsn"], raw["id"], None))
+        else:
+            entry = FeedbackRecord.from_dict(raw["entry"])
+            records.append(("put", raw["lsn"], entry.id, entry))
+    return records, offset
+
+
+def _last_line(path: Path) -> bytes | None:
+    """The last complete line of ``path``, read backwards in blocks."""
+    try:
+        f = path.open("rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > 0:
+            start = max(0, pos - 8192)
+            f.seek(start)
+            buf = f.read(pos - start) + buf
+            pos = start
+            # Anything after the last newline is a partial write, and the piece
+            # before the first newline is only whole once we reach the file start.
+            head, newline, _ = buf.rpartition(b"\n")
+            if not newline:
+                continue
+            lines = head.split(b"\n")
+            for line in reversed(lines if pos == 0 else lines[1:]):
+                if line.strip():
+                    return line
+        return None
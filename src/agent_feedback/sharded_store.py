@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import re
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import TypeVar
+
+from agent_feedback.models import FeedbackLike, FeedbackRecord
+from agent_feedback.store import Cursor, Durability, JSONLStore, TagMatch, locked_fd
+
+T = TypeVar("T")
+
+MANIFEST_NAME = "SHARDS.json"
+LOCK_NAME = "LOCK"
+
+# Each shard's byte offset takes this many bits of the combined cursor.
+_CURSOR_BITS = 48
+_CURSOR_MASK = (1 << _CURSOR_BITS) - 1
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+class ShardedStore:
+    """Store partitioned by task type: one JSONLStore per task type in ``root``.
+
+    ``SHARDS.json`` lists the shards in the order they were created, mapping
+    each task type to its file. A query for one task type opens only that
+    shard, so its cache, snapshot and indexes cover nothing else; anything
+    spanning task types fans out over the shards on a thread pool of up to
+    ``max_workers`` threads and concatenates the results shard by shard.
+
+    The cursor packs every shard's byte offset into one integer, with shard
+    ``i`` in bits ``48 * i`` and up. Shards are never renumbered, so old
+    cursors stay valid as new shards are added.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        durability: Durability | str = Durability.NONE,
+        max_workers: int | None = None,
+    ) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.durability = Durability(durability)
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self._pool: ThreadPoolExecutor | None = None
+        self._manifest_key: tuple[int, int, int] | None = None
+        self._task_types: list[str] = []
+        self._shards: dict[str, JSONLStore] = {}
+
+    def save(self, entry: FeedbackLike) -> None:
+        self.save_many([entry])
+
+    def save_many(self, entries: Iterable[FeedbackLike]) -> None:
+        by_task_type: dict[str, list[FeedbackLike]] = {}
+        for entry in entries:
+            by_task_type.setdefault(entry.task_type, []).append(entry)
+        shards = [(self._shard(task_type, create=True), batch) for task_type, batch in by_task_type.items()]
+        self._fan_out(lambda item: item[0].save_many(item[1]), shards)
+
+    def update(self, entry: FeedbackLike) -> None:
+        """Replace the stored entry with the same id, moving it if its task type changed."""
+        shard = self._shard(entry.task_type, create=True)
+        moved = shard.get(entry.id) is None
+        shard.update(entry)
+        if moved:
+            self._fan_out(lambda s: s.delete(entry.id), [s for s in self._all_shards() if s is not shard])
+
+    def delete(self, entry_id: str) -> None:
+        self.delete_many([entry_id])
+
+    def delete_many(self, entry_ids: Iterable[str]) -> None:
+        wanted = list(entry_ids)
+        if wanted:
+            self._fan_out(lambda s: s.delete_many(wanted), self._all_shards())
+
+    def get(self, entry_id: str) -> FeedbackRecord | None:
+        for found in self._fan_out(lambda s: s.get(entry_id), self._all_shards()):
+            if found is not None:
+                return found
+        return None
+
+    def query(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> list[FeedbackRecord]:
+        results = self._fan_out(
+            lambda s: s.query(task_type, tags, exclude_agent, tags_mode, exclude_tags), self._shards_for(task_type)
+        )
+        return [entry for result in results for entry in result]
+
+    def iter_entries(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        since: datetime | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> Iterator[FeedbackRecord]:
+        """Stream matching entries shard by shard.
+
+        Shards are read one after another rather than fanned out, so memory
+        stays bounded by a parse batch however large the store is.
+        """
+        for shard in self._shards_for(task_type):
+            yield from shard.iter_entries(task_type, tags, exclude_agent, since, tags_mode, exclude_tags)
+
+    def search(self, text: str, limit: int = 10) -> list[tuple[FeedbackRecord, float]]:
+        """The best ``limit`` hits over all shards.
+
+        Each shard scores with its own BM25 statistics, so a term is weighted
+        by how rare it is within its task type rather than across the store.
+        """
+        results = self._fan_out(lambda s: s.search(text, limit), self._all_shards())
+        hits = [hit for result in results for hit in result]
+        return sorted(hits, key=lambda hit: hit[1], reverse=True)[:limit]
+
+    def get_all(self) -> list[FeedbackRecord]:
+        return [entry for result in self._fan_out(JSONLStore.get_all, self._all_shards()) for entry in result]
+
+    def count(self) -> int:
+        return sum(self._fan_out(JSONLStore.count, self._all_shards()))
+
+    def cursor(self) -> Cursor:
+        return _pack_cursor(self._fan_out(JSONLStore.cursor, self._all_shards()))
+
+    def changes_since(self, cursor: Cursor) -> tuple[list[FeedbackRecord], Cursor]:
+        """Entries appended to any shard after ``cursor``, plus the cursor to resume from."""
+        shards = self._all_shards()
+        offsets = _unpack_cursor(cursor, len(shards))
+        results = self._fan_out(lambda item: item[0].changes_since(item[1]), list(zip(shards, offsets)))
+        return [entry for entries, _ in results for entry in entries], _pack_cursor([c for _, c in results])
+
+    def watch(self, cursor: Cursor | None = None, poll_interval: float = 0.5) -> AsyncIterator[FeedbackRecord]:
+        """Entries written after ``cursor`` as they arrive (see ``watch.watch_store``)."""
+        # Imported here to keep asyncio out of short-lived CLI processes.
+        from agent_feedback.watch import watch_store
+
+        return watch_store(self, self.root, cursor, poll_interval)
+
+    def clear(self) -> None:
+        """Empty every shard; the shards themselves are kept so cursors keep their layout."""
+        self._fan_out(JSONLStore.clear, self._all_shards())
+
+    def compact(self) -> int:
+        """Compact every shard (see ``JSONLStore.compact``), returning the bytes reclaimed."""
+        return sum(self._fan_out(JSONLStore.compact, self._all_shards()))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _fan_out(self, fn: Callable[[T], object], items: list[T]) -> list:
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="feedback-shard")
+        return list(self._pool.map(fn, items))
+
+    def _shards_for(self, task_type: str | None) -> list[JSONLStore]:
+        if task_type is None:
+            return self._all_shards()
+        shard = self._shard(task_type)
+        return [shard] if shard is not None else []
+
+    def _all_shards(self) -> list[JSONLStore]:
+        self._load_manifest()
+        return [self._shards[task_type] for task_type in self._task_types]
+
+    def _shard(self, task_type: str, create: bool = False) -> JSONLStore | None:
+        self._load_manifest()
+        if task_type not in self._shards and create:
+            with locked_fd(self.root / LOCK_NAME, os.O_RDWR | os.O_CREAT):
+                manifest = self._read_manifest()
+                # Another process may have added it since we last looked.
+                if not any(s["task_type"] == task_type for s in manifest["shards"]):
+                    manifest["shards"].append({"task_type": task_type, "file": _shard_file(task_type)})
+                    self._write_manifest(manifest)
+            self._load_manifest()
+        return self._shards.get(task_type)
+
+    def _load_manifest(self) -> None:
+        try:
+            st = (self.root / MANIFEST_NAME).stat()
+        except FileNotFoundError:
+            return
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if key == self._manifest_key:
+            return
+        shards = self._read_manifest()["shards"]
+        self._task_types = [s["task_type"] for s in shards]
+        for s in shards:
+            if s["task_type"] not in self._shards:
+                self._shards[s["task_type"]] = JSONLStore(self.root / s["file"], durability=self.durability)
+        self._manifest_key = key
+
+    def _read_manifest(self) -> dict:
+        try:
+            return json.loads((self.root / MANIFEST_NAME).read_text())
+        except FileNotFoundError:
+            return {"version": 1, "shards": []}
+
+    def _write_manifest(self, manifest: dict) -> None:
+        tmp = self.root / (MANIFEST_NAME + ".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, self.root / MANIFEST_NAME)
+
+
+def _shard_file(task_type: str) -> str:
+    """A readable file name that stays unique even for task types that slug alike."""
+    slug = _UNSAFE.sub("-", task_type).strip("-")[:40] or "shard"
+    digest = hashlib.blake2b(task_type.encode(), digest_size=4).hexdigest()
+    return f"{slug}-{digest}.jsonl"
+
+
+def _pack_cursor(offsets: list[int]) -> Cursor:
+    cursor = 0
+    for i, offset in enumerate(offsets):
+        cursor |= offset << (_CURSOR_BITS * i)
+    return cursor
+
+
+def _unpack_cursor(cursor: Cursor, shards: int) -> list[int]:
+    return [(cursor >> (_CURSOR_BITS * i)) & _CURSOR_MASK for i in range(shards)]
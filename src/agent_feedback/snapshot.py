@@ -0,0 +1,364 @@
+"""Binary columnar snapshots of feedback entries.
+
+A snapshot is a magic string, a small JSON header and a sequence of row
+groups. Each row group stores its columns as flat ``array`` buffers:
+low-cardinality strings (agent, task type, category, harness, tags, parent
+tips, supporters) are interned into a per-group dictionary and stored as indices,
+``confidence`` and ``timestamp`` are numeric arrays, and free-text columns are
+one concatenated string plus character offsets. Loading therefore costs one
+read and a handful of ``frombytes``/``decode`` calls per group instead of a
+JSON decode and model validation per row.
+"""
+
+import gc
+import json
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO
+
+from agent_feedback.models import FeedbackCategory, FeedbackLike, FeedbackRecord
+
+# Bumped whenever the column layout changes; older snapshots are simply
+# ignored and rewritten.
+MAGIC = b"AFSNAP02"
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_U32_ITEMSIZE = array("I").itemsize
+# Length prefix of the JSON headers in the snapshot and index files.
+U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+# Dictionary, ids, titles and details, then 13 numeric columns.
+_BLOCKS = 17
+
+
+@dataclass
+class SnapshotHeader:
+    """Where the snapshot's source file stood when it was taken.
+
+    ``source_end`` is the byte offset just past the last line captured, and
+    the length/CRC of that line let a reader confirm the file has only been
+    appended to since.
+    """
+
+    source_ino: int = 0
+    source_end: int = 0
+    last_line_len: int = 0
+    last_line_crc: int = 0
+    version: int = 1
+
+
+class SnapshotWriter:
+    """Write entries to a snapshot file one row group at a time."""
+
+    def __init__(self, path: Path, header: SnapshotHeader) -> None:
+        self.path = path
+        self._tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        self._f = self._tmp.open("wb")
+        write_header(self._f, header)
+
+    def write_row_group(self, entries: Sequence[FeedbackLike], offsets: Sequence[int] | None = None) -> None:
+        write_row_group(self._f, entries, offsets)
+
+    def close(self) -> None:
+        self._f.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        self._f.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_header(f: BinaryIO, header: SnapshotHeader) -> None:
+    payload = json.dumps(asdict(header)).encode()
+    f.write(MAGIC + U32.pack(len(payload)) + payload)
+
+
+def write_row_group(f: BinaryIO, entries: Sequence[FeedbackLike], offsets: Sequence[int] | None = None) -> None:
+    """Append one row group of ``entries`` to ``f``, just past the header or the previous group."""
+    if not entries:
+        return
+    interned: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        index = interned.get(value)
+        if index is None:
+            index = interned[value] = len(interned)
+        return index
+
+    tag_offsets = array("I", [0])
+    tags = array("I")
+    parent_offsets = array("I", [0])
+    parents = array("I")
+    supporter_offsets = array("I", [0])
+    supporters = array("I")
+    for e in entries:
+        tags.extend(intern(t) for t in e.tags)
+        tag_offsets.append(len(tags))
+        parents.extend(intern(p) for p in e.parent_tips_used)
+        parent_offsets.append(len(parents))
+        supporters.extend(intern(a) for a in e.supporters)
+        supporter_offsets.append(len(supporters))
+
+    columns = [
+        array("q", offsets if offsets is not None else [0] * len(entries)),
+        array("I", [intern(e.agent_id) for e in entries]),
+        array("I", [intern(e.task_type) for e in entries]),
+        array("I", [intern(e.category.value) for e in entries]),
+        array("I", [intern(e.harness) for e in entries]),
+        array("d", [e.confidence for e in entries]),
+        array("q", [_to_micros(e.timestamp) for e in entries]),
+        tag_offsets,
+        tags,
+        parent_offsets,
+        parents,
+        supporter_offsets,
+        supporters,
+    ]
+    blocks = [_pack_strings(list(interned))]
+    blocks += [_pack_strings([e.id for e in entries])]
+    blocks += [_pack_strings([e.title for e in entries])]
+    blocks += [_pack_strings([e.detail for e in entries])]
+    blocks += [pack_array(c) for c in columns]
+
+    f.write(U32.pack(len(entries)))
+    for block in blocks:
+        f.write(_U64.pack(len(block)))
+        f.write(block)
+
+
+class RowGroup:
+    """One decoded row group; entries are only built for the rows asked for."""
+
+    def __init__(self, buf: memoryview, rows: int) -> None:
+        self.rows = rows
+        blocks: list[memoryview] = []
+        pos = 0
+        for _ in range(_BLOCKS):
+            (size,) = _U64.unpack_from(buf, pos)
+            pos += _U64.size
+            blocks.append(buf[pos:pos + size])
+            pos += size
+        self.size = pos
+        self.dictionary = _unpack_strings(blocks[0])
+        self._ids = blocks[1]
+        self._titles = blocks[2]
+        self._details = blocks[3]
+        (
+            self.offsets,
+            self.agent_ids,
+            self.task_types,
+            self.categories,
+            self.harnesses,
+            self.confidences,
+            self.timestamps,
+            self.tag_offsets,
+            self.tags,
+            self.parent_offsets,
+            self.parents,
+            self.supporter_offsets,
+            self.supporters,
+        ) = [unpack_array(code, block) for code, block in zip("qIIIIdqIIIIII", blocks[4:])]
+
+    def select(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        since: datetime | None = None,
+        tags_mode: str = "any",
+        exclude_tags: list[str] | None = None,
+    ) -> list[int]:
+        """Row numbers matching the filters, evaluated on the encoded columns."""
+        lookup = {value: i for i, value in enumerate(self.dictionary)}
+        rows: Sequence[int] = range(self.rows)
+        tag_offsets, row_tags = self.tag_offsets, self.tags
+        if task_type is not None:
+            wanted = lookup.get(task_type)
+            rows = [r for r in rows if self.task_types[r] == wanted]
+        if tags is not None and tags_mode == "all":
+            if any(t not in lookup for t in tags):
+                return []
+            required = {lookup[t] for t in tags}
+            rows = [r for r in rows if required.issubset(row_tags[tag_offsets[r]:tag_offsets[r + 1]])]
+        elif tags is not None:
+            wanted_tags = {lookup[t] for t in tags if t in lookup}
+            rows = [r for r in rows if not wanted_tags.isdisjoint(row_tags[tag_offsets[r]:tag_offsets[r + 1]])]
+        if exclude_tags:
+            unwanted = {lookup[t] for t in exclude_tags if t in lookup}
+            rows = [r for r in rows if unwanted.isdisjoint(row_tags[tag_offsets[r]:tag_offsets[r + 1]])]
+        if exclude_agent is not None:
+            excluded = lookup.get(exclude_agent)
+            rows = [r for r in rows if self.agent_ids[r] != excluded]
+        if since is not None:
+            cutoff = _to_micros(since)
+            rows = [r for r in rows if self.timestamps[r] >= cutoff]
+        return list(rows)
+
+    def entries(self, rows: Sequence[int] | None = None) -> list[FeedbackRecord]:
+        if rows is None:
+            rows = range(self.rows)
+        ids = _unpack_strings(self._ids)
+        titles = _unpack_strings(self._titles)
+        details = _unpack_strings(self._details)
+        d = self.dictionary
+        categories = [_CATEGORIES.get(v) for v in d]
+        tag_offsets, tags = self.tag_offsets, self.tags
+        parent_offsets, parents = self.parent_offsets, self.parents
+        supporter_offsets, supporters = self.supporter_offsets, self.supporters
+        with gc_paused():
+            return [
+                FeedbackRecord(
+                    ids[r],
+                    d[self.agent_ids[r]],
+                    d[self.task_types[r]],
+                    categories[self.categories[r]],
+                    titles[r],
+                    details[r],
+                    self.confidences[r],
+                    [d[i] for i in tags[tag_offsets[r]:tag_offsets[r + 1]]],
+                    _from_micros(self.timestamps[r]),
+                    d[self.harnesses[r]],
+                    [d[i] for i in parents[parent_offsets[r]:parent_offsets[r + 1]]],
+                    [d[i] for i in supporters[supporter_offsets[r]:supporter_offsets[r + 1]]],
+                )
+                for r in rows
+            ]
+
+
+def read_header(path: Path) -> SnapshotHeader | None:
+    """The snapshot's header, or None if it is missing or not a snapshot."""
+    try:
+        with path.open("rb") as f:
+            head = f.read(len(MAGIC) + U32.size)
+            if len(head) < len(MAGIC) + U32.size or not head.startswith(MAGIC):
+                return None
+            (size,) = U32.unpack_from(head, len(MAGIC))
+            return SnapshotHeader(**json.loads(f.read(size)))
+    except FileNotFoundError:
+        return None
+
+
+def iter_row_groups(path: Path) -> Iterator[RowGroup]:
+    """Read the whole snapshot in one call and decode it group by group."""
+    buf = memoryview(path.read_bytes())
+    if not buf[:len(MAGIC)] == MAGIC:
+        raise ValueError(f"{path} is not a feedback snapshot")
+    (size,) = U32.unpack_from(buf, len(MAGIC))
+    pos = len(MAGIC) + U32.size + size
+    while pos < len(buf):
+        (rows,) = U32.unpack_from(buf, pos)
+        pos += U32.size
+        group = RowGroup(buf[pos:], rows)
+        pos += group.size
+        yield group
+
+
+def read_row_groups(f: BinaryIO) -> Iterator[RowGroup]:
+    """Decode a snapshot from a stream, holding only one row group in memory at a time."""
+    head = f.read(len(MAGIC) + U32.size)
+    if len(head) < len(MAGIC) + U32.size or not head.startswith(MAGIC):
+        raise ValueError("not a feedback snapshot")
+    f.read(U32.unpack_from(head, len(MAGIC))[0])
+    while head := f.read(U32.size):
+        (rows,) = U32.unpack(_read_exactly(f, U32.size, head))
+        buf = bytearray()
+        for _ in range(_BLOCKS):
+            size_bytes = _read_exactly(f, _U64.size)
+            buf += size_bytes
+            buf += _read_exactly(f, _U64.unpack(size_bytes)[0])
+        yield RowGroup(memoryview(buf), rows)
+
+
+def _read_exactly(f: BinaryIO, size: int, start: bytes = b"") -> bytes:
+    data = start
+    while len(data) < size:
+        chunk = f.read(size - len(data))
+        if not chunk:
+            raise ValueError("truncated feedback snapshot")
+        data += chunk
+    return data
+
+
+_CATEGORIES = {c.value: c for c in FeedbackCategory}
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """Disable the cyclic garbage collector for the block's duration."""
+    # Bulk-building many long-lived objects otherwise triggers repeated,
+    # fruitless full collections.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _to_micros(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def pack_array(values: array) -> bytes:
+    """The array's items as little-endian bytes, the byte order of every sidecar file."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def unpack_array(typecode: str, block: memoryview) -> array:
+    """Inverse of ``pack_array``."""
+    values = array(typecode)
+    values.frombytes(block)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _pack_strings(values: list[str]) -> bytes:
+    offsets = array("I", [0])
+    total = 0
+    for v in values:
+        total += len(v)
+        offsets.append(total)
+    return U32.pack(len(values)) + pack_array(offsets) + "".join(values).encode("utf-8", "surrogatepass")
+
+
+def _unpack_strings(block: memoryview) -> list[str]:
+    (count,) = U32.unpack_from(block, 0)
+    end = U32.size + _U32_ITEMSIZE * (count + 1)
+    offsets = unpack_array("I", block[U32.size:end])
+    text = bytes(block[end:]).decode("utf-8", "surrogatepass")
+    return [text[offsets[i]:offsets[i + 1]] for i in range(count)]
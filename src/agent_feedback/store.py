@@ -1,57 +1,1205 @@
+import json
+import mmap
+import os
+import re
+import sqlite3
+import zlib
+from array import array
+from bisect import bisect_left
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from enum import Enum
 from pathlib import Path
 from typing import Protocol, runtime_checkable
 
-from agent_feedback.models import FeedbackEntry
+from agent_feedback.index import IndexReader, InvertedIndex, read_index, select
+from agent_feedback.models import FeedbackCategory, FeedbackLike, FeedbackRecord
+from agent_feedback.search import TextIndex, TextIndexReader, read_text_index, tokenize
+from agent_feedback.snapshot import (
+    DEFAULT_ROW_GROUP_SIZE,
+    SnapshotHeader,
+    SnapshotWriter,
+    gc_paused,
+    iter_row_groups,
+    pack_array,
+    read_header,
+    unpack_array,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+
+class Durability(str, Enum):
+    """How hard an append pushes data towards the disk before returning.
+
+    NONE  — hand the bytes to the OS; readers see them immediately.
+    FLUSH — additionally ``fdatasync`` the file data.
+    FSYNC — full ``fsync`` of data and metadata.
+    """
+
+    NONE = "none"
+    FLUSH = "flush"
+    FSYNC = "fsync"
+
+
+class TagMatch(str, Enum):
+    """Whether a tag filter needs any or all of the listed tags."""
+
+    ANY = "any"
+    ALL = "all"
+
+
+# Opaque position in a store's history: a byte offset for JSONL files, the
+# last row sequence number for SQLite. Only ever compare it with the store
+# that produced it.
+Cursor = int
 
 
 @runtime_checkable
 class FeedbackStore(Protocol):
-    def save(self, entry: FeedbackEntry) -> None: ...
+    def save(self, entry: FeedbackLike) -> None: ...
+    def save_many(self, entries: Iterable[FeedbackLike]) -> None: ...
     def query(
         self,
         task_type: str | None = None,
         tags: list[str] | None = None,
         exclude_agent: str | None = None,
-    ) -> list[FeedbackEntry]: ...
-    def get_all(self) -> list[FeedbackEntry]: ...
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> list[FeedbackRecord]: ...
+    def iter_entries(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        since: datetime | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> Iterator[FeedbackRecord]: ...
+    def search(self, text: str, limit: int = 10) -> list[tuple[FeedbackRecord, float]]: ...
+    def get(self, entry_id: str) -> FeedbackRecord | None: ...
+    def update(self, entry: FeedbackLike) -> None: ...
+    def delete(self, entry_id: str) -> None: ...
+    def delete_many(self, entry_ids: Iterable[str]) -> None: ...
+    def get_all(self) -> list[FeedbackRecord]: ...
+    def count(self) -> int: ...
+    def cursor(self) -> Cursor: ...
+    def changes_since(self, cursor: Cursor) -> tuple[list[FeedbackRecord], Cursor]: ...
+    def watch(self, cursor: Cursor | None = None, poll_interval: float = 0.5) -> AsyncIterator[FeedbackRecord]: ...
     def clear(self) -> None: ...
 
 
+@runtime_checkable
+class AsyncFeedbackStore(Protocol):
+    """The ``FeedbackStore`` operations for use on an event loop, none of which block it."""
+
+    async def save(self, entry: FeedbackLike) -> None: ...
+    async def save_many(self, entries: Iterable[FeedbackLike]) -> None: ...
+    async def query(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> list[FeedbackRecord]: ...
+    def iter_entries(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        since: datetime | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> AsyncIterator[FeedbackRecord]: ...
+    async def search(self, text: str, limit: int = 10) -> list[tuple[FeedbackRecord, float]]: ...
+    async def get(self, entry_id: str) -> FeedbackRecord | None: ...
+    async def update(self, entry: FeedbackLike) -> None: ...
+    async def delete_many(self, entry_ids: Iterable[str]) -> None: ...
+    async def count(self) -> int: ...
+    async def cursor(self) -> Cursor: ...
+    async def changes_since(self, cursor: Cursor) -> tuple[list[FeedbackRecord], Cursor]: ...
+    def watch(self, cursor: Cursor | None = None, poll_interval: float = 0.5) -> AsyncIterator[FeedbackRecord]: ...
+    async def clear(self) -> None: ...
+    async def aclose(self) -> None: ...
+
+
 class JSONLStore:
-    def __init__(self, path: Path) -> None:
+    """Append-only JSONL store with an incremental, offset-indexed read cache.
+
+    Parsed entries are cached together with the byte offset of each line. The
+    cache is validated against the file's inode, size and mtime on every read,
+    so appends made by other processes (e.g. ``agent-feedback submit``) are
+    picked up by parsing only the new tail of the file.
+
+    Writes hold an exclusive ``flock`` and go out in a single ``write`` call,
+    so concurrent submitters never interleave or tear each other's lines.
+
+    ``update`` and ``delete`` never move existing bytes: the old line is
+    overwritten with spaces in place (readers skip blank lines) and its offset
+    is appended to ``<name>.retired``; an update appends the new version. Byte
+    offsets, cursors and the sidecar files below therefore stay valid, and
+    readers drop retired rows from them by offset.
+    ``compact`` reclaims the blanked space by rewriting the file.
+
+    Every ``snapshot_every`` newly parsed entries the cache is also written to
+    a columnar snapshot next to the file (``<name>.snap``). A cold reader loads
+    the snapshot and only parses the JSONL written after it; pass ``None`` to
+    disable snapshots. Short-lived processes such as the CLI never parse that
+    much, so a writer whose append leaves about as many entries' worth of
+    bytes after the snapshot takes one too.
+
+    An inverted index of task types, agents and tags (see ``index``) is kept
+    alongside the cache and persisted with each snapshot (``<name>.idx``), so
+    filtered queries touch only the matching entries plus the unindexed tail.
+    A BM25 text index over titles and details (see ``search``) is maintained
+    and persisted the same way (``<name>.fts``).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        durability: Durability | str = Durability.NONE,
+        snapshot_every: int | None = 10_000,
+    ) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.durability = Durability(durability)
+        self.snapshot_every = snapshot_every
+        self.snapshot_path = path.with_name(path.name + ".snap")
+        self.index_path = path.with_name(path.name + ".idx")
+        self.text_index_path = path.with_name(path.name + ".fts")
+        self.retired_path = path.with_name(path.name + ".retired")
+        self._reset_cache()
+
+    def save(self, entry: FeedbackLike) -> None:
+        self.save_many([entry])
+
+    def save_many(self, entries: Iterable[FeedbackLike]) -> None:
+        payload = "".join(e.model_dump_json() + "\n" for e in entries).encode()
+        if not payload:
+            return
+        with locked_fd(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT) as fd:
+            _write_all(fd, payload)
+            self._sync(fd)
+            st = os.fstat(fd)
+        self._snapshot_if_behind(st)
+
+    def update(self, entry: FeedbackLike) -> None:
+        """Replace the stored entry with the same id (appending it if there is none)."""
+        with locked_fd(self.path, os.O_RDWR | os.O_CREAT) as fd:
+            old = _find_line(fd, entry.id)
+            os.lseek(fd, 0, os.SEEK_END)
+            _write_all(fd, (entry.model_dump_json() + "\n").encode())
+            if old is not None:
+                self._retire(fd, [old])
+            self._sync(fd)
+            st = os.fstat(fd)
+        self._snapshot_if_behind(st)
+
+    def delete(self, entry_id: str) -> None:
+        if not self.path.exists():
+            return
+        with locked_fd(self.path, os.O_RDWR) as fd:
+            old = _find_line(fd, entry_id)
+            if old is not None:
+                self._retire(fd, [old])
+                self._sync(fd)
+
+    def delete_many(self, entry_ids: Iterable[str]) -> None:
+        """Delete several entries with a single pass over the file."""
+        wanted = set(entry_ids)
+        if not wanted or not self.path.exists():
+            return
+        with locked_fd(self.path, os.O_RDWR) as fd:
+            spans = _find_lines(fd, wanted)
+            if spans:
+                self._retire(fd, spans)
+                self._sync(fd)
+
+    def get(self, entry_id: str) -> FeedbackRecord | None:
+        if self._stat_key is not None:
+            self._refresh()
+            ordinal = self._positions.get(entry_id)
+            return self._entries[ordinal] if ordinal is not None else None
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        try:
+            found = _find_line(fd, entry_id)
+            if found is None:
+                return None
+            start, end = found
+            return _parse_lines([os.pread(fd, end - start, start)])[0]
+        finally:
+            os.close(fd)
+
+    def query(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> list[FeedbackRecord]:
+        self._refresh()
+        criteria = EntryFilter(task_type, tags, exclude_agent, None, tags_mode, exclude_tags)
+        if criteria.indexable:
+            candidates = [self._entries[o] for o in criteria.ordinals(self._index)]
+        else:
+            candidates = self._entries
+        return [e for e in candidates if e is not None and criteria.matches(e)]
+
+    def iter_entries(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        since: datetime | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> Iterator[FeedbackRecord]:
+        """Stream matching entries straight from disk, one line at a time.
+
+        Unlike ``query`` this bypasses the in-memory cache, so peak memory is
+        bounded by a single line. Task type and tag filters are answered from
+        the persisted index when there is one; otherwise rows are pre-screened
+        on their raw bytes and only candidates that survive are decoded.
+        """
+        criteria = EntryFilter(task_type, tags, exclude_agent, since, tags_mode, exclude_tags)
+        try:
+            f = self.path.open("rb")
+        except FileNotFoundError:
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            index = self._valid_index(st) if criteria.indexable else None
+            snapshot = self._valid_snapshot(st) if index is None else None
+            if index is not None:
+                # Only the posting lists involved and the matching lines are read;
+                # retired rows read back as blank lines and are skipped.
+                offsets = index.offsets(criteria.ordinals(index))
+                for i in range(0, len(offsets), _PARSE_BATCH):
+                    lines = []
+                    for offset in offsets[i:i + _PARSE_BATCH]:
+                        f.seek(offset)
+                        line = f.readline()
+                        if line.strip():
+                            lines.append(line)
+                    yield from (e for e in _parse_lines(lines) if criteria.matches(e))
+                f.seek(index.header.source_end)
+            elif snapshot is not None:
+                # Filters run on the encoded columns; only matching rows are built.
+                retired = self._read_retired()
+                for group in iter_row_groups(self.snapshot_path):
+                    rows = group.select(task_type, tags, exclude_agent, criteria.since, tags_mode, exclude_tags)
+                    if retired:
+                        rows = [r for r in rows if group.offsets[r] not in retired]
+                    yield from group.entries(rows)
+                f.seek(snapshot[0].source_end)
+            # Candidates are decoded in small batches: one JSON decode per batch
+            # is far cheaper than one per line, and memory stays bounded.
+            batch: list[bytes] = []
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip() and criteria.accepts_line(line):
+                    batch.append(line)
+                if len(batch) >= _PARSE_BATCH:
+                    yield from (e for e in _parse_lines(batch) if criteria.matches(e))
+                    batch = []
+            yield from (e for e in _parse_lines(batch) if criteria.matches(e))
+
+    def search(self, text: str, limit: int = 10) -> list[tuple[FeedbackRecord, float]]:
+        """Entries ranked by BM25 relevance of their title and detail to ``text``.
+
+        A store with a cold cache answers from the persisted text index,
+        reading only the query's posting lists, the hit lines and the tail.
+        """
+        if self._stat_key is None:
+            hits = self._search_persisted(text, limit)
+            if hits is not None:
+                return hits
+        self._refresh()
+        # Retired rows keep their ordinals until the cache is compacted.
+        hits = self._text.search(text, limit + self._holes)
+        return [(self._entries[o], score) for o, score in hits if self._entries[o] is not None][:limit]
+
+    def get_all(self) -> list[FeedbackRecord]:
+        self._refresh()
+        if not self._holes:
+            return list(self._entries)
+        return [e for e in self._entries if e is not None]
+
+    def count(self) -> int:
+        self._refresh()
+        return len(self._entries) - self._holes
+
+    def cursor(self) -> Cursor:
+        """Byte offset just past the last complete line, found without parsing."""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+        with self.path.open("rb") as f:
+            pos = size
+            while pos > 0:
+                start = max(0, pos - 8192)
+                f.seek(start)
+                newline = f.read(pos - start).rfind(b"\n")
+                if newline != -1:
+                    return start + newline + 1
+                pos = start
+        return 0
+
+    def changes_since(self, cursor: Cursor) -> tuple[list[FeedbackRecord], Cursor]:
+        """Entries appended after ``cursor``, plus the cursor to resume from.
+
+        Only the bytes past ``cursor`` are read, so updated entries show up as
+        changes (their new version is appended). A cursor that isn't at the
+        start of a line of the file, because it lies beyond its end or the
+        file was cleared and refilled since, is stale: everything counts as new.
+        """
+        try:
+            f = self.path.open("rb")
+        except FileNotFoundError:
+            return [], 0
+        with f:
+            if cursor > os.fstat(f.fileno()).st_size:
+                cursor = 0
+            elif cursor > 0:
+                # JSON lines hold no raw newlines, so one just before the cursor puts it
+                # at a line start. A refill can still line up with an old cursor exactly;
+                # nothing in a plain byte offset tells the two files apart.
+                f.seek(cursor - 1)
+                if f.read(1) != b"\n":
+                    cursor = 0
+            f.seek(cursor)
+            data = f.read()
+        *lines, _partial = data.split(b"\n")
+        for line in lines:
+            cursor += len(line) + 1
+        return _parse_lines([line for line in lines if line.strip()]), cursor
+
+    def watch(self, cursor: Cursor | None = None, poll_interval: float = 0.5) -> AsyncIterator[FeedbackRecord]:
+        """Entries written after ``cursor`` as they arrive (see ``watch.watch_store``)."""
+        # Imported here because the watch module builds on this one.
+        from agent_feedback.watch import watch_store
+
+        return watch_store(self, self.path.parent, cursor, poll_interval)
+
+    def clear(self) -> None:
+        if self.path.exists():
+            with locked_fd(self.path, os.O_WRONLY) as fd:
+                os.ftruncate(fd, 0)
+                self.retired_path.unlink(missing_ok=True)
+        self.snapshot_path.unlink(missing_ok=True)
+        self.index_path.unlink(missing_ok=True)
+        self.text_index_path.unlink(missing_ok=True)
+        self._reset_cache()
+
+    def compact(self) -> int:
+        """Rewrite the file without its blanked lines, returning the bytes reclaimed.
+
+        The live lines are copied to a temporary file that replaces the store
+        while the lock is held, so writers waiting on the lock append to the
+        new file. Offsets change, so the sidecars are dropped and outstanding
+        cursors, like after ``clear``, no longer point into the file.
+        """
+        if not self.path.exists():
+            return 0
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with locked_fd(self.path, os.O_RDWR) as fd:
+            before = os.fstat(fd).st_size
+            with open(fd, "rb", closefd=False) as src, tmp.open("wb") as dst:
+                dst.writelines(line for line in src if line.strip())
+                dst.flush()
+                self._sync(dst.fileno())
+                after = dst.tell()
+            # The retired offsets describe the old file; drop them before the swap.
+            self.retired_path.unlink(missing_ok=True)
+            os.replace(tmp, self.path)
+        self.snapshot_path.unlink(missing_ok=True)
+        self.index_path.unlink(missing_ok=True)
+        self.text_index_path.unlink(missing_ok=True)
+        self._reset_cache()
+        return before - after
+
+    def write_snapshot(self) -> None:
+        """Write the current contents as a columnar snapshot and inverted index."""
+        self._refresh()
+        self._write_snapshot()
+
+    def _snapshot_if_behind(self, st: os.stat_result) -> None:
+        """Snapshot once the file holds about ``snapshot_every`` entries past its snapshot.
+
+        Only the snapshot's header is read to decide, judging entries by size.
+        """
+        if self.snapshot_every is None:
+            return
+        header = read_header(self.snapshot_path)
+        covered = 0
+        if header is not None and header.source_ino == st.st_ino and header.source_end <= st.st_size:
+            covered = header.source_end
+        if st.st_size - covered >= self.snapshot_every * _ENTRY_BYTES:
+            self._refresh()
+            # The refresh may have taken the snapshot itself.
+            if self._snapshot_rows != len(self._entries):
+                self._write_snapshot()
+
+    def _sync(self, fd: int) -> None:
+        if self.durability is Durability.FLUSH:
+            fdatasync(fd)
+        elif self.durability is Durability.FSYNC:
+            os.fsync(fd)
+
+    def _retire(self, fd: int, spans: list[tuple[int, int]]) -> None:
+        # Offsets are recorded before the lines are blanked, so a reader never
+        # sees a blank without being able to learn which row it was.
+        retired_fd = os.open(self.retired_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            _write_all(retired_fd, pack_array(array("q", [start for start, _ in spans])))
+            self._sync(retired_fd)
+        finally:
+            os.close(retired_fd)
+        for start, end in spans:
+            os.pwrite(fd, b" " * (end - start), start)
+
+    def _read_retired(self, skip: int = 0) -> array:
+        try:
+            with self.retired_path.open("rb") as f:
+                f.seek(skip)
+                data = f.read()
+        except FileNotFoundError:
+            return array("q")
+        # A concurrently appended offset may be cut short; it is read next time.
+        return unpack_array("q", memoryview(data)[:len(data) - len(data) % _OFFSET_SIZE])
+
+    def _reset_cache(self) -> None:
+        # Retired rows become None holes so ordinals (and the indexes keyed by
+        # them) stay stable; the next snapshot compacts them away.
+        self._entries: list[FeedbackRecord | None] = []
+        self._offsets: list[int] = []
+        self._positions: dict[str, int] = {}
+        self._holes = 0
+        self._retired_seen = 0
+        self._index = InvertedIndex()
+        self._text = TextIndex()
+        self._last_line: bytes = b""
+        self._end: int = 0
+        self._stat_key: tuple[int, int, int] | None = None
+        self._snapshot_rows: int = 0
+
+    def _valid_snapshot(self, st: os.stat_result) -> tuple[SnapshotHeader, bytes] | None:
+        """The snapshot header and its last captured line, if it still describes this file."""
+        if self.snapshot_every is None:
+            return None
+        header = read_header(self.snapshot_path)
+        last_line = self._captured_line(header, st)
+        if header is None or last_line is None:
+            return None
+        return header, last_line
+
+    def _valid_index(self, st: os.stat_result) -> IndexReader | None:
+        if self.snapshot_every is None:
+            return None
+        index = read_index(self.index_path)
+        if index is None or self._captured_line(index.header, st) is None:
+            return None
+        return index
+
+    def _valid_text_index(self, st: os.stat_result) -> TextIndexReader | None:
+        if self.snapshot_every is None:
+            return None
+        index = read_text_index(self.text_index_path)
+        if index is None or self._captured_line(index.header, st) is None:
+            return None
+        return index
+
+    def _search_persisted(self, text: str, limit: int) -> list[tuple[FeedbackRecord, float]] | None:
+        try:
+            f = self.path.open("rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            st = os.fstat(f.fileno())
+            text_index = self._valid_text_index(st)
+            index = self._valid_index(st)
+            if text_index is None or index is None or text_index.header != index.header:
+                return None
+            loaded = text_index.load(text)
+            f.seek(text_index.header.source_end)
+            *lines, _partial = f.read().split(b"\n")
+            tail = _parse_lines([line for line in lines if line.strip()])
+            loaded.extend(tail)
+            # Retired rows still score, so ask for enough hits to drop them.
+            hits = loaded.search(text, limit + len(self._read_retired()))
+            indexed = sorted(o for o, _ in hits if o < text_index.rows)
+            found: dict[int, FeedbackRecord] = {}
+            for ordinal, offset in zip(indexed, index.offsets(indexed)):
+                f.seek(offset)
+                line = f.readline()
+                if line.strip():
+                    found[ordinal] = _parse_lines([line])[0]
+        results = []
+        for o, score in hits:
+            entry = tail[o - text_index.rows] if o >= text_index.rows else found.get(o)
+            if entry is not None:
+                results.append((entry, score))
+        return results[:limit]
+
+    def _captured_line(self, header: SnapshotHeader | None, st: os.stat_result) -> bytes | None:
+        """The last line ``header`` captured, if the file has only been appended to since.
+
+        The line may since have been retired (blanked in place), which readers
+        account for separately.
+        """
+        if (
+            header is None
+            or header.source_ino != st.st_ino
+            or not 0 < header.source_end <= st.st_size
+        ):
+            return None
+        with self.path.open("rb") as f:
+            f.seek(header.source_end - header.last_line_len)
+            last_line = f.read(header.last_line_len)
+        if zlib.crc32(last_line) != header.last_line_crc and not _is_blank_line(last_line):
+            return None
+        return last_line
+
+    def _load_snapshot(self, st: os.stat_result) -> None:
+        snapshot = self._valid_snapshot(st)
+        if snapshot is None:
+            return
+        header, self._last_line = snapshot
+        for group in iter_row_groups(self.snapshot_path):
+            self._entries.extend(group.entries())
+            self._offsets.extend(group.offsets)
+        self._positions = {e.id: i for i, e in enumerate(self._entries)}
+        index = self._valid_index(st)
+        if index is not None and index.header == header:
+            self._index = InvertedIndex.load(index)
+        else:
+            self._index.extend(self._entries, self._offsets)
+        text_index = self._valid_text_index(st)
+        if text_index is not None and text_index.header == header:
+            self._text = text_index.load()
+        else:
+            self._text.extend(self._entries)
+        self._end = header.source_end
+        self._snapshot_rows = len(self._entries)
+
+    def _write_snapshot(self) -> None:
+        if self._holes:
+            self._compact_cache()
+        if not self._entries or self._stat_key is None:
+            return
+        header = SnapshotHeader(
+            source_ino=self._stat_key[0],
+            source_end=self._offsets[-1] + len(self._last_line),
+            last_line_len=len(self._last_line),
+            last_line_crc=zlib.crc32(self._last_line),
+        )
+        with SnapshotWriter(self.snapshot_path, header) as writer:
+            for i in range(0, len(self._entries), DEFAULT_ROW_GROUP_SIZE):
+                writer.write_row_group(
+                    self._entries[i:i + DEFAULT_ROW_GROUP_SIZE],
+                    self._offsets[i:i + DEFAULT_ROW_GROUP_SIZE],
+                )
+        self._index.write(self.index_path, header)
+        self._text.write(self.text_index_path, header)
+        self._snapshot_rows = len(self._entries)
+
+    def _compact_cache(self) -> None:
+        """Drop retired rows so ordinals are dense again, rebuilding the indexes."""
+        live = [i for i, e in enumerate(self._entries) if e is not None]
+        self._entries = [self._entries[i] for i in live]
+        self._offsets = [self._offsets[i] for i in live]
+        self._positions = {e.id: i for i, e in enumerate(self._entries)}
+        self._index = InvertedIndex()
+        self._index.extend(self._entries, self._offsets)
+        self._text = TextIndex()
+        self._text.extend(self._entries)
+        self._holes = 0
+
+    def _retire_row(self, ordinal: int) -> None:
+        entry = self._entries[ordinal]
+        if entry is None:
+            return
+        self._entries[ordinal] = None
+        self._holes += 1
+        if self._positions.get(entry.id) == ordinal:
+            del self._positions[entry.id]
+
+    def _refresh(self) -> None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset_cache()
+            return
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if key == self._stat_key:
+            return
+        if self._stat_key is not None and (st.st_ino != self._stat_key[0] or st.st_size < self._end):
+            self._reset_cache()
+        if not self._offsets:
+            self._load_snapshot(st)
+
+        # Re-read the last indexed line along with the tail so that a file that
+        # was truncated and rewritten past our old end is not mistaken for an append.
+        start = self._offsets[-1] if self._offsets else 0
+        with self.path.open("rb") as f:
+            f.seek(start)
+            data = f.read()
+        head = data[:len(self._last_line)]
+        if self._last_line and head != self._last_line and not _is_blank_line(head):
+            self._reset_cache()
+            start = 0
+            with self.path.open("rb") as f:
+                data = f.read()
+        elif self._last_line:
+            data = data[len(self._last_line):]
+            start += len(self._last_line)
+
+        # The last element is either empty or a partially written line, which is
+        # picked up once the writer finishes it.
+        pos = start
+        first = len(self._offsets)
+        *lines, _partial = data.split(b"\n")
+        complete: list[bytes] = []
+        for line in lines:
+            if line.strip():
+                complete.append(line)
+                self._offsets.append(pos)
+                self._last_line = line + b"\n"
+            pos += len(line) + 1
+        parsed = _parse_lines(complete)
+        # Extended first: the version an entry supersedes may be in this same batch.
+        self._entries.extend(parsed)
+        for ordinal, entry in enumerate(parsed, first):
+            # A newer version of an id supersedes the one we hold, even before
+            # the writer has got round to retiring the old line.
+            previous = self._positions.get(entry.id)
+            if previous is not None:
+                self._retire_row(previous)
+            self._positions[entry.id] = ordinal
+        self._index.extend(parsed, self._offsets[first:])
+        self._text.extend(parsed)
+        for offset in self._read_retired(self._retired_seen):
+            self._retired_seen += _OFFSET_SIZE
+            ordinal = bisect_left(self._offsets, offset)
+            if ordinal < len(self._offsets) and self._offsets[ordinal] == offset:
+                self._retire_row(ordinal)
+        self._end = pos
+        self._stat_key = key
+        if self.snapshot_every is not None and len(self._entries) - self._snapshot_rows >= self.snapshot_every:
+            self._write_snapshot()
+
+
+class SQLiteStore:
+    """SQLite-backed store with indexed task type, agent and tag filters.
+
+    Tags are mirrored into a normalized ``entry_tags`` table keyed by
+    ``(tag, entry)`` so tag filters are index lookups rather than per-row set
+    intersections; the ``tags`` column keeps their original order for reads.
+    Titles and details are indexed by an external-content FTS5 table for
+    ``search``, ranked with its built-in ``bm25()``.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL UNIQUE,
+            agent_id TEXT NOT NULL,
+            task_type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            title TEXT NOT NULL,
+            detail TEXT NOT NULL,
+            confidence REAL NOT NULL,
+            timestamp TEXT NOT NULL,
+            harness TEXT NOT NULL,
+            parent_tips_used TEXT NOT NULL,
+            tags TEXT NOT NULL,
+            supporters TEXT NOT NULL DEFAULT '[]'
+        );
+        CREATE TABLE IF NOT EXISTS entry_tags (
+            tag TEXT NOT NULL,
+            entry_seq INTEGER NOT NULL REFERENCES entries(seq) ON DELETE CASCADE,
+            PRIMARY KEY (tag, entry_seq)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_entries_task_type ON entries(task_type);
+        CREATE INDEX IF NOT EXISTS idx_entries_agent_id ON entries(agent_id);
+        CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(timestamp);
+        CREATE INDEX IF NOT EXISTS idx_entry_tags_entry ON entry_tags(entry_seq);
+        CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+            title, detail, content='entries', content_rowid='seq'
+        );
+    """
+
+    _COLUMNS = (
+        "seq, id, agent_id, task_type, category, title, detail, "
+        "confidence, timestamp, harness, parent_tips_used, tags, supporters"
+    )
+
+    _SYNCHRONOUS = {
+        Durability.NONE: "OFF",
+        Durability.FLUSH: "NORMAL",
+        Durability.FSYNC: "FULL",
+    }
+
+    def __init__(self, path: Path, durability: Durability | str = Durability.FLUSH) -> None:
         self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.durability = Durability(durability)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={self._SYNCHRONOUS[self.durability]}")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        has_fts = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'"
+        ).fetchone()
+        self._conn.executescript(self._SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+        if "supporters" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN supporters TEXT NOT NULL DEFAULT '[]'")
+        if not has_fts:
+            # Databases created before the text index existed: index what is there.
+            with self._conn:
+                self._conn.execute("INSERT INTO entries_fts(entries_fts) VALUES ('rebuild')")
+
+    def save(self, entry: FeedbackLike) -> None:
+        self.save_many([entry])
 
-    def save(self, entry: FeedbackEntry) -> None:
-        with self.path.open("a") as f:
-            f.write(entry.model_dump_json() + "\n")
+    def save_many(self, entries: Iterable[FeedbackLike]) -> None:
+        with self._conn:
+            for entry in entries:
+                self._insert(entry)
+
+    def update(self, entry: FeedbackLike) -> None:
+        """Replace the entry with the same id; it gets a new ``seq``, so it counts as a change."""
+        with self._conn:
+            self._remove(entry.id)
+            self._insert(entry)
+
+    def delete(self, entry_id: str) -> None:
+        with self._conn:
+            self._remove(entry_id)
+
+    def delete_many(self, entry_ids: Iterable[str]) -> None:
+        with self._conn:
+            for entry_id in entry_ids:
+                self._remove(entry_id)
+
+    def get(self, entry_id: str) -> FeedbackRecord | None:
+        row = self._conn.execute(
+            f"SELECT {self._COLUMNS} FROM entries WHERE id = ?", (entry_id,)
+        ).fetchone()
+        return self._row_to_entry(row) if row is not None else None
 
     def query(
         self,
         task_type: str | None = None,
         tags: list[str] | None = None,
         exclude_agent: str | None = None,
-    ) -> list[FeedbackEntry]:
-        entries = self.get_all()
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> list[FeedbackRecord]:
+        return list(
+            self.iter_entries(task_type, tags, exclude_agent, tags_mode=tags_mode, exclude_tags=exclude_tags)
+        )
+
+    def iter_entries(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        since: datetime | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> Iterator[FeedbackRecord]:
+        clauses: list[str] = []
+        params: list[object] = []
         if task_type is not None:
-            entries = [e for e in entries if e.task_type == task_type]
+            clauses.append("task_type = ?")
+            params.append(task_type)
         if tags is not None:
-            tag_set = set(tags)
-            entries = [e for e in entries if tag_set & set(e.tags)]
+            wanted = list(dict.fromkeys(tags))
+            placeholders = ", ".join("?" for _ in wanted)
+            if TagMatch(tags_mode) is TagMatch.ALL:
+                if wanted:
+                    clauses.append(
+                        f"seq IN (SELECT entry_seq FROM entry_tags WHERE tag IN ({placeholders}) "
+                        "GROUP BY entry_seq HAVING COUNT(*) = ?)"
+                    )
+                    params.extend([*wanted, len(wanted)])
+            else:
+                clauses.append(f"seq IN (SELECT entry_seq FROM entry_tags WHERE tag IN ({placeholders}))")
+                params.extend(wanted)
+        if exclude_tags:
+            placeholders = ", ".join("?" for _ in exclude_tags)
+            clauses.append(f"seq NOT IN (SELECT entry_seq FROM entry_tags WHERE tag IN ({placeholders}))")
+            params.extend(exclude_tags)
         if exclude_agent is not None:
-            entries = [e for e in entries if e.agent_id != exclude_agent]
-        return entries
+            clauses.append("agent_id != ?")
+            params.append(exclude_agent)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_iso_utc(since))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self._conn.execute(
+            f"SELECT {self._COLUMNS} FROM entries{where} ORDER BY seq", params
+        )
+        for row in cursor:
+            yield self._row_to_entry(row)
 
-    def get_all(self) -> list[FeedbackEntry]:
-        if not self.path.exists():
+    def search(self, text: str, limit: int = 10) -> list[tuple[FeedbackRecord, float]]:
+        terms = list(dict.fromkeys(tokenize(text)))
+        if not terms or limit <= 0:
             return []
-        entries: list[FeedbackEntry] = []
-        for line in self.path.read_text().splitlines():
-            line = line.strip()
-            if line:
-                entries.append(FeedbackEntry.model_validate_json(line))
-        return entries
+        # Quoted terms keep FTS5 from reading user input as query syntax.
+        match = " OR ".join(f'"{t}"' for t in terms)
+        rows = self._conn.execute(
+            f"SELECT {self._COLUMNS}, score FROM entries JOIN ("
+            "SELECT rowid AS hit, bm25(entries_fts) AS score FROM entries_fts "
+            "WHERE entries_fts MATCH ? ORDER BY score, rowid LIMIT ?"
+            ") ON seq = hit ORDER BY score, seq",
+            (match, limit),
+        )
+        # bm25() is negated so that, as elsewhere, higher scores rank first.
+        return [(self._row_to_entry(row), -row[13]) for row in rows]
+
+    def get_all(self) -> list[FeedbackRecord]:
+        return list(self.iter_entries())
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def cursor(self) -> Cursor:
+        return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM entries").fetchone()[0]
+
+    def changes_since(self, cursor: Cursor) -> tuple[list[FeedbackRecord], Cursor]:
+        rows = self._conn.execute(
+            f"SELECT {self._COLUMNS} FROM entries WHERE seq > ? ORDER BY seq", (cursor,)
+        ).fetchall()
+        if rows:
+            cursor = rows[-1][0]
+        return [self._row_to_entry(row) for row in rows], cursor
+
+    def watch(self, cursor: Cursor | None = None, poll_interval: float = 0.5) -> AsyncIterator[FeedbackRecord]:
+        """Entries written after ``cursor`` as they arrive (see ``watch.watch_store``)."""
+        # Imported here because the watch module builds on this one.
+        from agent_feedback.watch import watch_store
+
+        return watch_store(self, self.path.parent, cursor, poll_interval)
 
     def clear(self) -> None:
-        if self.path.exists():
-            self.path.write_text("")
+        with self._conn:
+            self._conn.execute("DELETE FROM entry_tags")
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("INSERT INTO entries_fts(entries_fts) VALUES ('delete-all')")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _insert(self, entry: FeedbackLike) -> None:
+        cur = self._conn.execute(
+            "INSERT INTO entries (id, agent_id, task_type, category, title, detail, "
+            "confidence, timestamp, harness, parent_tips_used, tags, supporters) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                entry.id,
+                entry.agent_id,
+                entry.task_type,
+                entry.category.value,
+                entry.title,
+                entry.detail,
+                entry.confidence,
+                _iso_utc(entry.timestamp),
+                entry.harness,
+                json.dumps(entry.parent_tips_used),
+                json.dumps(entry.tags),
+                json.dumps(entry.supporters),
+            ),
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO entry_tags (tag, entry_seq) VALUES (?, ?)",
+            [(tag, cur.lastrowid) for tag in entry.tags],
+        )
+        self._conn.execute(
+            "INSERT INTO entries_fts (rowid, title, detail) VALUES (?, ?, ?)",
+            (cur.lastrowid, entry.title, entry.detail),
+        )
+
+    def _remove(self, entry_id: str) -> None:
+        row = self._conn.execute(
+            "SELECT seq, title, detail FROM entries WHERE id = ?", (entry_id,)
+        ).fetchone()
+        if row is None:
+            return
+        # External-content FTS tables are told exactly what to forget.
+        self._conn.execute(
+            "INSERT INTO entries_fts (entries_fts, rowid, title, detail) VALUES ('delete', ?, ?, ?)", row
+        )
+        self._conn.execute("DELETE FROM entries WHERE seq = ?", (row[0],))
+
+    @staticmethod
+    def _row_to_entry(row: tuple) -> FeedbackRecord:
+        return FeedbackRecord(
+            id=row[1],
+            agent_id=row[2],
+            task_type=row[3],
+            category=FeedbackCategory(row[4]),
+            title=row[5],
+            detail=row[6],
+            confidence=row[7],
+            tags=json.loads(row[11]),
+            timestamp=datetime.fromisoformat(row[8]),
+            harness=row[9],
+            parent_tips_used=json.loads(row[10]),
+            supporters=json.loads(row[12]),
+        )
+
+
+SQLITE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+SHARDED_SUFFIX = ".shards"
+
+
+def open_store(path: Path, durability: Durability | str | None = None) -> FeedbackStore:
+    """Open the store implementation matching ``path``.
+
+    ``.db``/``.sqlite`` files open a SQLiteStore. A ``.shards`` path or a
+    directory holding a shard manifest opens a ShardedStore, any other
+    directory or path without an extension a SegmentedStore, and anything
+    else a JSONLStore. ``durability`` of ``None`` keeps the implementation's
+    default.
+    """
+    # Imported here because both build on this module's helpers.
+    from agent_feedback.segmented_store import SegmentedStore
+    from agent_feedback.sharded_store import MANIFEST_NAME, ShardedStore
+
+    kwargs = {} if durability is None else {"durability": durability}
+    if path.suffix in SQLITE_SUFFIXES:
+        return SQLiteStore(path, **kwargs)
+    if path.suffix == SHARDED_SUFFIX or (path / MANIFEST_NAME).exists():
+        return ShardedStore(path, **kwargs)
+    if is_directory_store(path):
+        return SegmentedStore(path, **kwargs)
+    return JSONLStore(path, **kwargs)
+
+
+def is_directory_store(path: Path) -> bool:
+    """Whether ``path`` names a store that lives in a directory of its own."""
+    return path.suffix not in SQLITE_SUFFIXES and (path.is_dir() or not path.suffix or path.suffix == SHARDED_SUFFIX)
+
+
+@contextmanager
+def locked_fd(path: Path, flags: int) -> Iterator[int]:
+    """Open ``path`` and hold an exclusive advisory lock for the block's duration."""
+    while True:
+        fd = os.open(path, flags, 0o644)
+        if fcntl is None:
+            break
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        # A compaction may have replaced the file while we waited for the lock.
+        try:
+            if os.fstat(fd).st_ino == os.stat(path).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+    try:
+        yield fd
+    finally:
+        # Closing the descriptor releases the flock.
+        os.close(fd)
+
+
+def _write_all(fd: int, payload: bytes) -> None:
+    view = memoryview(payload)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _find_line(fd: int, entry_id: str) -> tuple[int, int] | None:
+    """Start and end (before the newline) of the newest line holding ``entry_id``."""
+    size = os.fstat(fd).st_size
+    if not size:
+        return None
+    # Lines are written compactly with the id first, so this prefix can only
+    # occur at the start of a row: inside a string its quotes would be escaped.
+    needle = b'{"id":' + _quoted(entry_id) + b","
+    with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as data:
+        end = size
+        while (start := data.rfind(needle, 0, end)) != -1:
+            if start == 0 or data[start - 1] == ord("\n"):
+                line_end = data.find(b"\n", start)
+                return start, line_end if line_end != -1 else size
+            end = start
+    return None
+
+
+def _find_lines(fd: int, entry_ids: set[str]) -> list[tuple[int, int]]:
+    """Like ``_find_line`` for many ids at once, in one scan of the file."""
+    size = os.fstat(fd).st_size
+    if not size:
+        return []
+    found: dict[str, tuple[int, int]] = {}
+    with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as data:
+        for match in _LINE_ID.finditer(data):
+            entry_id = json.loads(match[1])
+            if entry_id in entry_ids:
+                end = data.find(b"\n", match.start())
+                # Later lines win, as with _find_line.
+                found[entry_id] = (match.start(), end if end != -1 else size)
+    return list(found.values())
+
+
+def _is_blank_line(line: bytes) -> bool:
+    # What a retired row looks like: its bytes overwritten with spaces.
+    return line.endswith(b"\n") and not line.strip()
+
+
+class EntryFilter:
+    """Query criteria, checked against raw JSONL rows and parsed entries.
+
+    ``accepts_line`` is a cheap byte-level screen that only ever rejects rows
+    which cannot match; survivors are still checked with ``matches`` once
+    decoded. ``ordinals`` answers the task type and tag parts from an index.
+    """
+
+    def __init__(
+        self,
+        task_type: str | None = None,
+        tags: list[str] | None = None,
+        exclude_agent: str | None = None,
+        since: datetime | None = None,
+        tags_mode: TagMatch | str = TagMatch.ANY,
+        exclude_tags: list[str] | None = None,
+    ) -> None:
+        self.task_type = task_type
+        self.tags = set(tags) if tags is not None else None
+        self.tags_mode = TagMatch(tags_mode)
+        self.exclude_agent = exclude_agent
+        self.exclude_tags = set(exclude_tags) if exclude_tags else None
+        self.since = as_utc(since) if since is not None else None
+        self._quoted_task_type = _quoted(task_type) if task_type is not None else None
+        self._quoted_tags = [_quoted(t) for t in self.tags] if self.tags is not None else None
+        self._exclude_agent_field = (
+            b'"agent_id":' + _quoted(exclude_agent) if exclude_agent is not None else None
+        )
+
+    @property
+    def indexable(self) -> bool:
+        """Whether a positive task type or tag filter narrows the candidates."""
+        return self.task_type is not None or bool(self.tags)
+
+    def ordinals(self, index: InvertedIndex | IndexReader) -> list[int]:
+        """Ordinals of entries satisfying the task type, tag and exclusion filters."""
+        required = [index.lookup("task_type", self.task_type)] if self.task_type is not None else []
+        tag_lists = [index.lookup("tags", t) for t in self.tags or ()]
+        any_of: list = []
+        if self.tags_mode is TagMatch.ALL:
+            required += tag_lists
+        else:
+            any_of = tag_lists
+        excluded = [index.lookup("tags", t) for t in self.exclude_tags or ()]
+        if self.exclude_agent is not None:
+            excluded.append(index.lookup("agent_id", self.exclude_agent))
+        return select(required, any_of, excluded)
+
+    def accepts_line(self, line: bytes) -> bool:
+        # A value we filter on for equality must appear somewhere in the row
+        # as a JSON string, whatever the formatting.
+        if self._quoted_task_type is not None and self._quoted_task_type not in line:
+            return False
+        if self._quoted_tags is not None:
+            present = (t in line for t in self._quoted_tags)
+            if not (all(present) if self.tags_mode is TagMatch.ALL else any(present)):
+                return False
+        # The compact form written by ``save`` is an exact structural match:
+        # inside a JSON string the quotes would have been escaped.
+        if self._exclude_agent_field is not None and self._exclude_agent_field in line:
+            return False
+        if self.since is not None:
+            timestamp = _peek_timestamp(line)
+            if timestamp is not None and as_utc(timestamp) < self.since:
+                return False
+        return True
+
+    def matches(self, entry: FeedbackLike) -> bool:
+        if self.task_type is not None and entry.task_type != self.task_type:
+            return False
+        if self.tags is not None:
+            if self.tags_mode is TagMatch.ALL:
+                if not self.tags.issubset(entry.tags):
+                    return False
+            elif self.tags.isdisjoint(entry.tags):
+                return False
+        if self.exclude_tags is not None and not self.exclude_tags.isdisjoint(entry.tags):
+            return False
+        if self.exclude_agent is not None and entry.agent_id == self.exclude_agent:
+            return False
+        if self.since is not None and as_utc(entry.timestamp) < self.since:
+            return False
+        return True
+
+
+def _quoted(value: str) -> bytes:
+    return json.dumps(value, ensure_ascii=False).encode()
+
+
+def _peek_timestamp(line: bytes) -> datetime | None:
+    start = line.find(b'"timestamp":"')
+    if start == -1:
+        return None
+    start += len(b'"timestamp":"')
+    end = line.find(b'"', start)
+    try:
+        return datetime.fromisoformat(line[start:end].decode())
+    except ValueError:
+        return None
+
+
+def as_utc(value: datetime) -> datetime:
+    """``value`` as an aware UTC datetime."""
+    # Naive timestamps are taken to be UTC, matching FeedbackEntry's default.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def _iso_utc(value: datetime) -> str:
+    # A fixed-width UTC form keeps string comparison in SQL chronological.
+    return as_utc(value).isoformat(timespec="microseconds")
+
+
+def fdatasync(fd: int) -> None:
+    """Flush ``fd``'s data to disk."""
+    # macOS has no fdatasync; fall back to a full fsync there.
+    getattr(os, "fdatasync", os.fsync)(fd)
+
+
+_PARSE_BATCH = 1024
+# Roughly what one entry takes in a JSONL file, for judging entry counts by size.
+_ENTRY_BYTES = 512
+_OFFSET_SIZE = array("q").itemsize
+# The id that starts every (non-blank) line, as a JSON string literal.
+_LINE_ID = re.compile(rb'^\{"id":("(?:[^"\\]|\\.)*"),', re.MULTILINE)
+
+
+def _parse_lines(lines: list[bytes]) -> list[FeedbackRecord]:
+    """Decode JSONL rows with a single ``json.loads`` over the whole batch.
+
+    Rows were validated as FeedbackEntry when saved, so reads take the trusted
+    FeedbackRecord path instead of re-running pydantic validation.
+    """
+    if not lines:
+        return []
+    with gc_paused():
+        return [FeedbackRecord.from_dict(d) for d in json.loads(b"[" + b",".join(lines) + b"]")]
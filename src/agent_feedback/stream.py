@@ -7,6 +7,10 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 
+from agent_feedback.adapters.base import AgentResult
+from agent_feedback.models import FeedbackLike
+from agent_feedback.prompt_builder import TipSelection
+
 TIP_REFERENCE_PATTERNS = [
     re.compile(r"agent[-\s]?\d+\s+(mentioned|recommended|suggested|warned|said)", re.IGNORECASE),
     re.compile(r"previous agent", re.IGNORECASE),
@@ -42,9 +46,18 @@ def _is_tty(console: Console) -> bool:
 
 
 class StreamDisplay:
-    def __init__(self, console: Console | None = None) -> None:
+    """Live view of one agent's run.
+
+    Agents running side by side each get a display with a ``label``; their
+    lines are prefixed with it and, as they share the terminal, none of
+    them redraws a status line in place.
+    """
+
+    def __init__(self, console: Console | None = None, label: str | None = None) -> None:
         self.console = console or Console()
-        self._is_tty = _is_tty(self.console)
+        self.label = label
+        self._prefix = f"{label} │ " if label else ""
+        self._is_tty = _is_tty(self.console) and label is None
         self.tip_references: int = 0
         self.feedback_submitted: int = 0
         self._start_time: float = 0.0
@@ -52,6 +65,8 @@ class StreamDisplay:
         self._line_buffer: str = ""
         self._current_chunk_type: str = ""
         self._last_activity: float = 0.0
+        # The adapter's idle limit, shown while the agent is quiet.
+        self.idle_timeout: float | None = None
         self._heartbeat_task: asyncio.Task[None] | None = None
         self._active: bool = False
 
@@ -69,6 +84,22 @@ class StreamDisplay:
             style="bold cyan",
         )
 
+    def show_tip_selection(self, selection: TipSelection) -> None:
+        """Say which tips made it into the prompt and which the token budget left out."""
+        budget = f"/{selection.budget}" if selection.budget is not None else ""
+        total = len(selection.selected) + len(selection.dropped)
+        self.console.print(
+            Text(f"  Tips in prompt: {len(selection.selected)} of {total} (~{selection.tokens}{budget} tokens)", style="dim")
+        )
+        for tip in selection.dropped:
+            self.console.print(
+                Text(
+                    f"  dropped [{tip.entry.category.value}] {tip.entry.title} "
+                    f"(score {tip.score:.2f}, ~{tip.tokens} tokens)",
+                    style="dim",
+                )
+            )
+
     def start_heartbeat(self) -> None:
         self._active = True
         self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
@@ -116,7 +147,8 @@ class StreamDisplay:
                 f"feedback: {self.feedback_submitted}",
             ]
             if idle > 5:
-                status_parts.append(f"working... ({idle:.0f}s since last output)")
+                limit = f", stopped at {self.idle_timeout:g}s" if self.idle_timeout is not None else ""
+                status_parts.append(f"working... ({idle:.0f}s since last output{limit})")
 
             status_line = "  |  ".join(status_parts)
             f.write("\r" + " " * 120 + "\r")
@@ -124,20 +156,30 @@ class StreamDisplay:
             f.flush()
             await asyncio.sleep(0.5)
 
-    def show_agent_footer(self, agent_num: int, tips_consumed: int, tips_submitted: int) -> None:
+    def show_agent_footer(
+        self, agent_num: int, tips_consumed: int, tips_submitted: int, result: AgentResult | None = None
+    ) -> None:
         self._flush_buffer()
         elapsed = time.time() - self._start_time
         self.console.print()
+        if result is not None and result.timed_out:
+            status, style = f"Timed out ({result.timed_out})", "bold red"
+        elif result is not None and not result.success:
+            status, style = "Failed", "bold red"
+        else:
+            status, style = "Complete", "bold green"
         self.console.rule(
-            f"[bold] AGENT {agent_num} — Complete ({tips_submitted} tips submitted) [/bold]",
+            f"[bold] AGENT {agent_num} — {status} ({tips_submitted} tips submitted) [/bold]",
             characters="═",
-            style="bold green",
+            style=style,
         )
         summary = Text()
         summary.append(f"  Duration: {elapsed:.1f}s", style="dim")
         summary.append(f"  |  Tips consumed: {tips_consumed}", style="dim")
         summary.append(f"  |  Tips submitted: {tips_submitted}", style="dim")
         summary.append(f"  |  Tip references: {self.tip_references}", style="dim")
+        if result is not None and result.attempts > 1:
+            summary.append(f"  |  Attempts: {result.attempts}", style="dim")
         self.console.print(summary)
         self.console.print()
 
@@ -147,9 +189,6 @@ class StreamDisplay:
 
         self._last_activity = time.time()
 
-        if chunk_type == "feedback":
-            self.feedback_submitted += 1
-
         if chunk_type != self._current_chunk_type:
             self._flush_buffer()
             self._current_chunk_type = chunk_type
@@ -160,6 +199,18 @@ class StreamDisplay:
             line, self._line_buffer = self._line_buffer.split("\n", 1)
             self._emit_line(line, chunk_type)
 
+    def on_feedback(self, entry: FeedbackLike) -> None:
+        """Show a submission the store has confirmed."""
+        self._flush_buffer()
+        self._clear_status_line()
+        self.feedback_submitted += 1
+        self.console.print(
+            Text(
+                f"{self._prefix}✓ FEEDBACK SAVED: [{entry.category.value}] {entry.title}",
+                style=STYLE_MAP["feedback"] + " bold",
+            )
+        )
+
     def _flush_buffer(self) -> None:
         if self._line_buffer.strip():
             self._emit_line(self._line_buffer, self._current_chunk_type)
@@ -175,11 +226,11 @@ class StreamDisplay:
 
         if _is_tip_reference(line):
             self.tip_references += 1
-            self.console.print(f"★ TIP REFERENCE: {line}", style="bold yellow")
+            self.console.print(Text(f"{self._prefix}★ TIP REFERENCE: {line}", style="bold yellow"))
         else:
             style = STYLE_MAP.get(chunk_type, "white")
             prefix = PREFIX_MAP.get(chunk_type, "")
-            self.console.print(Text(prefix + line, style=style))
+            self.console.print(Text(self._prefix + prefix + line, style=style))
 
     def show_demo_summary(
         self,
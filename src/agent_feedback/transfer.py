@@ -0,0 +1,179 @@
+"""Streaming bulk export and import of feedback entries.
+
+Three formats are supported:
+
+- ``ndjson``: one JSON object per line, exactly as a JSONL store holds them.
+- ``csv``: a header row of ``FeedbackEntry`` fields; list fields (tags,
+  parent tips, supporters) are JSON-encoded arrays within their cell.
+- ``columnar``: the binary row-group format of store snapshots (see
+  ``snapshot``), the most compact and the quickest to load.
+
+Both directions work in batches of ``batch_size`` entries, so memory stays
+flat however many entries pass through. Imports validate each batch as
+``FeedbackEntry`` in one pydantic call and hand it to the store's
+``save_many``, its bulk append path. Entries whose id the store already
+holds are left out, so importing the same export twice adds nothing.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, BinaryIO
+
+from pydantic import TypeAdapter, ValidationError
+
+from agent_feedback.models import FeedbackEntry, FeedbackLike
+from agent_feedback.snapshot import SnapshotHeader, read_row_groups, write_header, write_row_group
+from agent_feedback.store import FeedbackStore
+
+FORMATS = ("ndjson", "csv", "columnar")
+BATCH_SIZE = 10_000
+
+# File extensions the format is inferred from when none is given.
+EXTENSIONS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv", ".snap": "columnar"}
+
+_FIELDS = list(FeedbackEntry.model_fields)
+_LIST_FIELDS = {"tags", "parent_tips_used", "supporters"}
+_ENTRIES = TypeAdapter(list[FeedbackEntry])
+
+
+class TransferError(ValueError):
+    """An import found records that aren't valid feedback entries."""
+
+
+@dataclass
+class ImportStats:
+    imported: int = 0
+    skipped: int = 0
+    # Entries left out because their id was already stored, or came earlier in the source.
+    duplicates: int = 0
+
+
+def export_entries(
+    entries: Iterable[FeedbackLike], out: BinaryIO, fmt: str = "ndjson", batch_size: int = BATCH_SIZE
+) -> int:
+    """Write ``entries`` to the binary stream ``out``; returns how many were written."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    written = 0
+    if fmt == "csv":
+        # The wrapper is detached, not closed, so ``out`` stays open for the caller.
+        text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+        writer = csv.writer(text)
+        writer.writerow(_FIELDS)
+        for batch in _batched(entries, batch_size):
+            writer.writerows([_csv_row(e) for e in batch])
+            written += len(batch)
+        text.flush()
+        text.detach()
+        return written
+    if fmt == "columnar":
+        write_header(out, SnapshotHeader())
+    for batch in _batched(entries, batch_size):
+        if fmt == "columnar":
+            write_row_group(out, batch)
+        else:
+            out.write("".join(e.model_dump_json() + "\n" for e in batch).encode())
+        written += len(batch)
+    return written
+
+
+def import_entries(
+    store: FeedbackStore,
+    source: BinaryIO,
+    fmt: str = "ndjson",
+    batch_size: int = BATCH_SIZE,
+    skip_invalid: bool = False,
+) -> ImportStats:
+    """Validate the records in ``source`` batch by batch and append them to ``store``.
+
+    An invalid record raises ``TransferError`` naming it, after the batches
+    before it have been written; with ``skip_invalid`` it is counted and
+    left out instead. Entries with an id already in the store, or seen
+    earlier in ``source``, are counted as duplicates and left out.
+    """
+    stats = ImportStats()
+    number = 0
+    # Ids only, read in one pass: a lookup per entry would re-scan a JSONL store each time.
+    seen = {e.id for e in store.iter_entries()}
+    for batch in _batched(read_records(source, fmt), batch_size):
+        try:
+            entries = _ENTRIES.validate_python(batch)
+        except ValidationError as exc:
+            bad = {err["loc"][0] for err in exc.errors()}
+            if not skip_invalid:
+                raise TransferError(_describe(exc, number)) from exc
+            entries = _ENTRIES.validate_python([r for i, r in enumerate(batch) if i not in bad])
+            stats.skipped += len(bad)
+        fresh = []
+        for entry in entries:
+            if entry.id not in seen:
+                seen.add(entry.id)
+                fresh.append(entry)
+        stats.duplicates += len(entries) - len(fresh)
+        store.save_many(fresh)
+        stats.imported += len(fresh)
+        number += len(batch)
+    return stats
+
+
+def read_records(source: BinaryIO, fmt: str = "ndjson") -> Iterator[Any]:
+    """Raw records from ``source``, one per entry, ready for validation.
+
+    NDJSON lines that aren't JSON come through as their text, so validation
+    rejects them along with the other invalid records.
+    """
+    if fmt == "ndjson":
+        for line in source:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    yield line.decode("utf-8", "replace").rstrip("\n")
+    elif fmt == "csv":
+        text = io.TextIOWrapper(source, encoding="utf-8", newline="")
+        try:
+            for row in csv.DictReader(text):
+                yield _from_csv_row(row)
+        finally:
+            text.detach()
+    elif fmt == "columnar":
+        for group in read_row_groups(source):
+            yield from (record._asdict() for record in group.entries())
+    else:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+
+
+def _csv_row(entry: FeedbackLike) -> list[Any]:
+    data = entry.model_dump(mode="json")
+    return [json.dumps(data[f]) if f in _LIST_FIELDS else data[f] for f in _FIELDS]
+
+
+def _from_csv_row(row: dict[str, str | None]) -> dict[str, Any]:
+    data: dict[str, Any] = {k: v for k, v in row.items() if k is not None and v is not None}
+    for field in _LIST_FIELDS & data.keys():
+        try:
+            data[field] = json.loads(data[field]) if data[field] else []
+        except json.JSONDecodeError:
+            pass  # Left as text for validation to reject.
+    return data
+
+
+def _describe(exc: ValidationError, first: int, limit: int = 5) -> str:
+    errors = exc.errors()
+    lines = [
+        f"record {first + err['loc'][0] + 1}: {'.'.join(map(str, err['loc'][1:])) or 'entry'}: {err['msg']}"
+        for err in errors[:limit]
+    ]
+    if len(errors) > limit:
+        lines.append(f"... and {len(errors) - limit} more")
+    return "Invalid records:\n" + "\n".join(lines)
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
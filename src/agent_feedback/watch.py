@@ -0,0 +1,112 @@
+"""Live change feed over a feedback store.
+
+``watch_store`` turns a store's ``changes_since`` tail reader into an async
+iterator of newly written entries. On Linux it sleeps on an inotify watch of
+the directory holding the store's files and only reads once something there
+changed; elsewhere, or if inotify can't be set up, it polls every
+``poll_interval`` seconds. Either way each wake-up reads just the data
+appended since the previous one.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import inspect
+import os
+import sys
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+from typing import Any
+
+from agent_feedback.models import FeedbackRecord
+from agent_feedback.store import AsyncFeedbackStore, Cursor, FeedbackStore
+
+DEFAULT_POLL_INTERVAL = 0.5
+
+# From <sys/inotify.h>: any write, or a file appearing by create or rename.
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+
+
+class _Inotify:
+    """A non-blocking inotify descriptor watching one directory."""
+
+    def __init__(self, directory: Path) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"cannot watch {directory}")
+
+    def drain(self) -> None:
+        # Which file changed doesn't matter: the store's tail reader decides.
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _open_inotify(directory: Path) -> _Inotify | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return _Inotify(directory)
+    except (OSError, AttributeError):
+        # No libc inotify symbols, watch limit reached, unsupported filesystem...
+        return None
+
+
+async def _call(fn: Callable[..., Any], *args: object) -> Any:
+    result = fn(*args)
+    return await result if inspect.isawaitable(result) else result
+
+
+async def watch_store(
+    store: FeedbackStore | AsyncFeedbackStore,
+    directory: Path,
+    cursor: Cursor | None = None,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    use_inotify: bool = True,
+) -> AsyncIterator[FeedbackRecord]:
+    """Yield entries written to ``store`` after ``cursor`` (default: from now on).
+
+    ``directory`` is where the store keeps the files its writers touch. The
+    store may be synchronous or an ``AsyncFeedbackStore``, whose reads then
+    stay off the loop. An updated entry is yielded again in its new version.
+    The iterator never ends by itself; stop it by breaking out or cancelling
+    the consuming task.
+    """
+    loop = asyncio.get_running_loop()
+    notifier = _open_inotify(directory) if use_inotify else None
+    woken = asyncio.Event()
+    if notifier is not None:
+        loop.add_reader(notifier.fd, woken.set)
+    try:
+        # Armed before the first read, so nothing written in between is missed.
+        if cursor is None:
+            cursor = await _call(store.cursor)
+        while True:
+            woken.clear()
+            if notifier is not None:
+                notifier.drain()
+            entries, cursor = await _call(store.changes_since, cursor)
+            for entry in entries:
+                yield entry
+            if notifier is None:
+                await asyncio.sleep(poll_interval)
+            else:
+                await woken.wait()
+    finally:
+        if notifier is not None:
+            loop.remove_reader(notifier.fd)
+            notifier.close()
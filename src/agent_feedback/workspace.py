@@ -0,0 +1,130 @@
+"""Provisioning and tearing down agent workspaces.
+
+An agent's directory can be seeded from a template tree (a checked-out
+repo, a prepared venv) without copying its bytes. ``reflink`` clones each
+file copy-on-write where the filesystem supports it (Btrfs, XFS, bcachefs),
+so an agent's edits stay its own. ``hardlink`` links each file to the
+template's inode. That is just as fast on any filesystem, but a file an
+agent rewrites in place changes for everyone, so it suits templates the
+agents only read. ``auto`` tries reflinks and copies what can't be
+cloned. Every mode falls back to a plain copy file by file, e.g. across
+filesystems.
+
+Tearing down is a rename: the old tree moves aside to a hidden sibling
+and a background thread deletes it, so a reset costs the same however
+much the previous run left behind.
+"""
+
+import errno
+import os
+import shutil
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+
+# Linux's FICLONE ioctl, _IOW(0x94, 9, int).
+_FICLONE = 0x40049409
+# Errors meaning "this filesystem (pair) can't share blocks", not "this file failed".
+_UNSUPPORTED = {errno.EOPNOTSUPP, errno.ENOTSUP, errno.EXDEV, errno.EINVAL, errno.ENOTTY, errno.ENOSYS, errno.EPERM}
+
+
+@dataclass
+class SeedStats:
+    reflinked: int = 0
+    hardlinked: int = 0
+    copied: int = 0
+    # Files already in the destination, left as they were.
+    kept: int = 0
+
+    @property
+    def files(self) -> int:
+        return self.reflinked + self.hardlinked + self.copied
+
+
+def seed_workspace(template: Path, dest: Path, mode: str = "auto") -> SeedStats:
+    """Fill ``dest`` with the tree of ``template``; files already in ``dest`` are kept."""
+    if mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode {mode!r}; expected one of {', '.join(LINK_MODES)}")
+    stats = SeedStats()
+    # Once a link kind fails for the filesystem, the rest of the tree is copied.
+    state = {"reflink": mode in ("auto", "reflink") and fcntl is not None, "hardlink": mode == "hardlink"}
+    for root, dirs, files in os.walk(template):
+        target_dir = dest / Path(root).relative_to(template)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        # os.walk lists symlinks to directories among ``dirs`` without entering them.
+        for name in [d for d in dirs if os.path.islink(os.path.join(root, d))] + files:
+            src, dst = Path(root) / name, target_dir / name
+            if dst.is_symlink() or dst.exists():
+                stats.kept += 1
+            elif src.is_symlink():
+                os.symlink(os.readlink(src), dst)
+            else:
+                _provision(src, dst, state, stats)
+    return stats
+
+
+def retire_workspace(path: Path) -> threading.Thread | None:
+    """Move ``path`` aside and delete it on a background thread, which is returned.
+
+    Leftovers of earlier retirements that never finished (the process
+    exited first) are deleted along with it. Returns None if there was
+    nothing to delete.
+    """
+    trash = [p for p in path.parent.glob(f".{path.name}.trash-*") if p.is_dir()] if path.parent.exists() else []
+    if path.exists():
+        retired = path.with_name(f".{path.name}.trash-{uuid.uuid4().hex[:8]}")
+        os.replace(path, retired)
+        trash.append(retired)
+    if not trash:
+        return None
+
+    def delete() -> None:
+        for tree in trash:
+            shutil.rmtree(tree, ignore_errors=True)
+
+    # A daemon thread never holds up exit; whatever it leaves is retired next time.
+    thread = threading.Thread(target=delete, name="workspace-teardown", daemon=True)
+    thread.start()
+    return thread
+
+
+def _provision(src: Path, dst: Path, state: dict[str, bool], stats: SeedStats) -> None:
+    if state["reflink"]:
+        try:
+            _reflink(src, dst)
+            shutil.copystat(src, dst)
+            stats.reflinked += 1
+            return
+        except OSError as exc:
+            if exc.errno not in _UNSUPPORTED:
+                raise
+            state["reflink"] = False
+    if state["hardlink"]:
+        try:
+            os.link(src, dst)
+            stats.hardlinked += 1
+            return
+        except OSError as exc:
+            if exc.errno not in _UNSUPPORTED | {errno.EMLINK}:
+                raise
+            state["hardlink"] = False
+    shutil.copy2(src, dst)
+    stats.copied += 1
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    with open(src, "rb") as fsrc, open(dst, "xb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            dst.unlink()
+            raise
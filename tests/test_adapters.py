@@ -0,0 +1,163 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from agent_feedback.adapters import AgentAdapter, AgentResult, RunPolicy
+from agent_feedback.adapters.base import ProcessOutcome, run_process
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "killpg"), reason="process groups are POSIX-only")
+
+# Starts a grandchild that ignores SIGTERM, prints its pid, then hangs.
+_STUBBORN_TREE = """
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c",
+    "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); print('ready', flush=True); time.sleep(60)"],
+    stdout=subprocess.PIPE)
+child.stdout.readline()
+print(child.pid, flush=True)
+time.sleep(60)
+"""
+
+
+def _run(script: str, policy: RunPolicy, tmp_path: Path) -> tuple[ProcessOutcome, list[str], float]:
+    lines: list[str] = []
+
+    async def on_line(line: str) -> None:
+        lines.append(line)
+
+    start = time.monotonic()
+    outcome = asyncio.run(run_process([sys.executable, "-c", script], tmp_path, dict(os.environ), policy, on_line))
+    return outcome, lines, time.monotonic() - start
+
+
+def _alive(pid: int) -> bool:
+    # A killed orphan may linger as a zombie where nothing reaps it.
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+    except OSError:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        return True
+
+
+def _wait_dead(pid: int, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while _alive(pid):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+class TestRunProcess:
+    def test_streams_lines(self, tmp_path: Path):
+        outcome, lines, _ = _run("print('one'); print(); print('two')", RunPolicy(idle_timeout=5), tmp_path)
+        assert lines == ["one", "two"]
+        assert outcome.success and outcome.error is None
+
+    def test_failure_reports_stderr(self, tmp_path: Path):
+        outcome, _, _ = _run("import sys; sys.exit('boom')", RunPolicy(), tmp_path)
+        assert not outcome.success
+        assert outcome.returncode == 1
+        assert outcome.error == "boom\n"
+
+    def test_idle_timeout(self, tmp_path: Path):
+        policy = RunPolicy(idle_timeout=0.3, kill_grace=0.2)
+        outcome, lines, elapsed = _run("import time; print('hi', flush=True); time.sleep(60)", policy, tmp_path)
+        assert lines == ["hi"]
+        assert outcome.timed_out == "idle"
+        assert not outcome.success
+        assert "no output for 0.3s" in outcome.error
+        assert elapsed < 5
+
+    def test_wall_timeout_despite_output(self, tmp_path: Path):
+        policy = RunPolicy(wall_timeout=0.5, idle_timeout=0.3, kill_grace=0.2)
+        script = "import time\nwhile True:\n    print('tick', flush=True)\n    time.sleep(0.05)"
+        outcome, lines, elapsed = _run(script, policy, tmp_path)
+        assert outcome.timed_out == "wall"
+        assert len(lines) > 1
+        assert elapsed < 5
+
+    def test_wall_timeout_after_output_closes(self, tmp_path: Path):
+        script = "import os, time; os.close(1); time.sleep(60)"
+        outcome, _, elapsed = _run(script, RunPolicy(wall_timeout=0.5, kill_grace=0.2), tmp_path)
+        assert outcome.timed_out == "wall"
+        assert elapsed < 5
+
+    def test_timeout_kills_process_tree(self, tmp_path: Path):
+        outcome, lines, elapsed = _run(_STUBBORN_TREE, RunPolicy(idle_timeout=0.5, kill_grace=0.3), tmp_path)
+        assert outcome.timed_out == "idle"
+        # The grandchild ignored SIGTERM, so it took the SIGKILL.
+        assert _wait_dead(int(lines[0]))
+        assert elapsed < 5
+
+    def test_cancellation_kills_process_tree(self, tmp_path: Path):
+        pids: list[int] = []
+
+        async def main() -> None:
+            async def on_line(line: str) -> None:
+                pids.append(int(line))
+
+            task = asyncio.create_task(
+                run_process([sys.executable, "-c", _STUBBORN_TREE], tmp_path, dict(os.environ), RunPolicy(kill_grace=0.2), on_line)
+            )
+            while not pids:
+                await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(asyncio.wait_for(main(), 10))
+        assert _wait_dead(pids[0])
+
+
+class FlakyAdapter(AgentAdapter):
+    def __init__(self, failures: int, policy: RunPolicy | None = None) -> None:
+        super().__init__(policy)
+        self.failures = failures
+        self.calls = 0
+
+    async def run(self, prompt, work_dir, on_stream, env=None) -> AgentResult:
+        self.calls += 1
+        if self.calls <= self.failures:
+            return AgentResult(success=False, output="", error="Timed out", timed_out="idle")
+        return AgentResult(success=True, output="done")
+
+
+class TestRetries:
+    def _run(self, adapter: AgentAdapter) -> tuple[AgentResult, list[tuple[str, str]]]:
+        chunks: list[tuple[str, str]] = []
+        result = asyncio.run(adapter.run_with_retries("p", Path("."), lambda t, x: chunks.append((t, x))))
+        return result, chunks
+
+    def test_retries_until_success(self):
+        adapter = FlakyAdapter(failures=2, policy=RunPolicy(retries=3, backoff=0.01))
+        result, chunks = self._run(adapter)
+        assert result.success
+        assert result.attempts == 3
+        assert [text for _, text in chunks] == ["Attempt 1 failed; retrying in 0.01s", "Attempt 2 failed; retrying in 0.02s"]
+
+    def test_gives_up_after_retries(self):
+        adapter = FlakyAdapter(failures=5, policy=RunPolicy(retries=1, backoff=0.01))
+        result, _ = self._run(adapter)
+        assert not result.success and result.timed_out == "idle"
+        assert result.attempts == adapter.calls == 2
+
+    def test_no_retries_by_default(self):
+        adapter = FlakyAdapter(failures=1)
+        result, chunks = self._run(adapter)
+        assert not result.success and result.attempts == 1
+        assert chunks == []
+
+    def test_backoff_doubles_up_to_cap(self):
+        policy = RunPolicy(backoff=5, max_backoff=30)
+        assert [policy.delay(n) for n in range(1, 6)] == [5, 10, 20, 30, 30]
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+from agent_feedback import async_store
+from agent_feedback.async_store import ThreadedStore
+from agent_feedback.models import FeedbackCategory, FeedbackEntry, FeedbackRecord
+from agent_feedback.store import AsyncFeedbackStore
+
+
+@pytest.fixture(params=["feedback.jsonl", "feedback.db", "segments", "feedback.shards"])
+def store_path(request: pytest.FixtureRequest, tmp_path: Path) -> Path:
+    return tmp_path / request.param
+
+
+def _make_entry(**kwargs: object) -> FeedbackEntry:
+    defaults: dict[str, object] = {
+        "agent_id": "agent-1",
+        "task_type": "build-todo-app",
+        "category": FeedbackCategory.TIP,
+        "title": "A tip",
+        "detail": "Some detail",
+    }
+    defaults.update(kwargs)
+    return FeedbackEntry(**defaults)  # type: ignore[arg-type]
+
+
+class TestThreadedStore:
+    def test_implements_protocol(self, store_path: Path):
+        async def run() -> None:
+            store = ThreadedStore(store_path)
+            assert isinstance(store, AsyncFeedbackStore)
+            await store.aclose()
+
+        asyncio.run(run())
+
+    def test_round_trip(self, store_path: Path):
+        async def run() -> None:
+            store = ThreadedStore(store_path)
+            await store.save(_make_entry(agent_id="agent-1", tags=["python"]))
+            await store.save_many([_make_entry(agent_id="agent-2"), _make_entry(agent_id="agent-3")])
+            assert await store.count() == 3
+            assert [e.agent_id for e in await store.query(tags=["python"])] == ["agent-1"]
+            assert [e.agent_id async for e in store.iter_entries(exclude_agent="agent-1")] == ["agent-2", "agent-3"]
+            cursor = await store.cursor()
+            await store.save(_make_entry(title="Later"))
+            changes, _ = await store.changes_since(cursor)
+            assert [e.title for e in changes] == ["Later"]
+            await store.clear()
+            assert await store.count() == 0
+            await store.aclose()
+
+        asyncio.run(run())
+
+    def test_calls_run_off_the_event_loop_thread(self, tmp_path: Path):
+        async def run() -> None:
+            store = ThreadedStore(tmp_path / "feedback.jsonl")
+            seen: list[threading.Thread] = []
+            original = store._store.count
+            store._store.count = lambda: seen.append(threading.current_thread()) or original()  # type: ignore[method-assign]
+            await store.count()
+            assert seen and seen[0] is not threading.current_thread()
+            await store.aclose()
+
+        asyncio.run(run())
+
+    def test_iteration_streams_in_batches(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(async_store, "BATCH_SIZE", 3)
+
+        async def run() -> list[FeedbackRecord]:
+            store = ThreadedStore(tmp_path / "feedback.jsonl", queue_batches=1)
+            await store.save_many([_make_entry(title=f"Tip {i}") for i in range(20)])
+            entries = [e async for e in store.iter_entries()]
+            await store.aclose()
+            return entries
+
+        assert [e.title for e in asyncio.run(run())] == [f"Tip {i}" for i in range(20)]
+
+    def test_abandoned_iteration_frees_the_worker(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(async_store, "BATCH_SIZE", 2)
+
+        async def run() -> int:
+            store = ThreadedStore(tmp_path / "feedback.jsonl", queue_batches=1)
+            await store.save_many([_make_entry() for _ in range(50)])
+            feed = store.iter_entries()
+            async for _ in feed:
+                break
+            await feed.aclose()  # type: ignore[attr-defined]
+            async with asyncio.timeout(5):
+                count = await store.count()
+            await store.aclose()
+            return count
+
+        assert asyncio.run(run()) == 50
+
+    def test_watch_reads_on_the_worker(self, tmp_path: Path):
+        # SQLite connections refuse use from other threads, so this only
+        # works if watch goes through the worker too.
+        async def run() -> list[FeedbackRecord]:
+            store = ThreadedStore(tmp_path / "feedback.db")
+            feed = store.watch(poll_interval=0.01)
+            asyncio.get_running_loop().call_later(0.05, asyncio.ensure_future, store.save(_make_entry(title="Live")))
+            try:
+                async with asyncio.timeout(5):
+                    entry = await anext(feed)  # type: ignore[arg-type]
+            finally:
+                await feed.aclose()  # type: ignore[attr-defined]
+                await store.aclose()
+            return [entry]
+
+        assert [e.title for e in asyncio.run(run())] == ["Live"]
@@ -0,0 +1,201 @@
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from agent_feedback import adapters
+from agent_feedback.__main__ import cli
+from agent_feedback.adapters import AgentAdapter, AgentResult
+from agent_feedback.batch import LEDGER_NAME, Ledger, Manifest, pending_runs, run_batch
+from agent_feedback.checkpoint import STATE_NAME
+from agent_feedback.models import FeedbackCategory, FeedbackEntry
+from agent_feedback.store import open_store
+
+
+class TipAdapter(AgentAdapter):
+    """Submits one tip per run, counting how many runs overlap."""
+
+    running = 0
+    max_running = 0
+
+    async def run(
+        self,
+        prompt: str,
+        work_dir: Path,
+        on_stream: Callable[[str, str], Awaitable[None] | None],
+        env: dict[str, str] | None = None,
+    ) -> AgentResult:
+        cls = type(self)
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        try:
+            await asyncio.sleep(0.1)
+            open_store(Path(env["AGENT_FEEDBACK_STORE"])).save(
+                FeedbackEntry(
+                    agent_id=work_dir.name,
+                    task_type="demo",
+                    category=FeedbackCategory.TIP,
+                    title=f"Lesson from {work_dir.name}",
+                    detail="Detail",
+                )
+            )
+        finally:
+            cls.running -= 1
+        return AgentResult(success=True, output="")
+
+
+class BrokenAdapter(AgentAdapter):
+    async def run(self, prompt, work_dir, on_stream, env=None) -> AgentResult:
+        raise RuntimeError("CLI not found")
+
+
+class CrashOnceAdapter(TipAdapter):
+    """Crashes agent-2's first run, as a killed machine would."""
+
+    runs: list[str] = []
+
+    async def run(self, prompt, work_dir, on_stream, env=None) -> AgentResult:
+        type(self).runs.append(work_dir.name)
+        if type(self).runs == ["agent-1", "agent-2"]:
+            raise RuntimeError("power cut")
+        return await super().run(prompt, work_dir, on_stream, env)
+
+
+@pytest.fixture(autouse=True)
+def fake_adapters(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(adapters.ADAPTERS, "tips", TipAdapter)
+    monkeypatch.setitem(adapters.ADAPTERS, "broken", BrokenAdapter)
+    monkeypatch.setitem(adapters.ADAPTERS, "crash-once", CrashOnceAdapter)
+    monkeypatch.setattr(CrashOnceAdapter, "runs", [])
+    monkeypatch.setattr(TipAdapter, "max_running", 0)
+
+
+@pytest.fixture
+def manifest_path(tmp_path: Path) -> Path:
+    (tmp_path / "tasks").mkdir()
+    (tmp_path / "tasks" / "alpha.md").write_text("Build alpha")
+    (tmp_path / "tasks" / "beta.md").write_text("Build beta")
+    path = tmp_path / "sweep.toml"
+    path.write_text('tasks = ["tasks/*.md"]\nadapters = ["tips"]\nagents = [1, 2]\nconcurrency = 2\n')
+    return path
+
+
+class TestManifest:
+    def test_expands_matrix(self, manifest_path: Path):
+        manifest = Manifest.load(manifest_path)
+        assert manifest.output == manifest_path.parent / "sweep-runs"
+        assert [r.run_id for r in manifest.runs()] == [
+            "alpha--tips--1", "alpha--tips--2", "beta--tips--1", "beta--tips--2",
+        ]
+
+    def test_repeats(self, tmp_path: Path, manifest_path: Path):
+        manifest = Manifest.from_dict({"tasks": "tasks/alpha.md", "adapters": "tips", "agents": 3, "repeats": 2}, tmp_path)
+        assert [r.run_id for r in manifest.runs()] == ["alpha--tips--3", "alpha--tips--3--2"]
+
+    @pytest.mark.parametrize(
+        ("data", "message"),
+        [
+            ({"tasks": "tasks/*.md", "adapters": "tips", "agents": 1, "colour": "red"}, "Unknown manifest settings: colour"),
+            ({"tasks": "tasks/*.md", "adapters": "nope", "agents": 1}, "Unknown adapters: nope"),
+            ({"tasks": "tasks/*.txt", "adapters": "tips", "agents": 1}, "No task files match"),
+            ({"tasks": "tasks/*.md", "adapters": "tips"}, "Manifest needs 'agents'"),
+            ({"tasks": "tasks/*.md", "adapters": "tips", "agents": 1, "demo": {"timeout": "soon"}}, "Invalid duration"),
+            ({"tasks": "tasks/*.md", "adapters": "tips", "agents": 1, "demo": {"turbo": True}}, "Unknown demo settings"),
+        ],
+    )
+    def test_rejects(self, tmp_path: Path, manifest_path: Path, data: dict, message: str):
+        with pytest.raises(ValueError, match=message):
+            Manifest.from_dict(data, tmp_path)
+
+    def test_rejects_clashing_task_names(self, tmp_path: Path, manifest_path: Path):
+        (tmp_path / "more").mkdir()
+        (tmp_path / "more" / "alpha.md").write_text("Other alpha")
+        with pytest.raises(ValueError, match="share a name"):
+            Manifest.from_dict({"tasks": ["tasks/*.md", "more/*.md"], "adapters": "tips", "agents": 1}, tmp_path)
+
+
+class TestRunBatch:
+    def test_runs_isolated_and_records_ledger(self, manifest_path: Path):
+        manifest = Manifest.load(manifest_path)
+        events: list[str] = []
+        records = asyncio.run(run_batch(manifest, on_event=lambda kind, spec, _: events.append(kind)))
+        assert len(records) == 4 and events.count("finish") == 4
+        assert TipAdapter.max_running == 2
+        by_id = {r["run_id"]: r for r in Ledger(manifest.output / LEDGER_NAME).records()}
+        assert by_id["beta--tips--2"]["status"] == "ok"
+        assert by_id["beta--tips--2"]["agent_tips"] == [1, 1]
+        assert by_id["beta--tips--2"]["total_tips"] == 2
+        assert by_id["alpha--tips--1"]["total_tips"] == 1
+        run_dir = manifest.output / "runs" / "beta--tips--2"
+        assert open_store(run_dir / "feedback.jsonl").count() == 2
+        assert sorted(p.name for p in (run_dir / "workspace").iterdir()) == ["agent-1", "agent-2", STATE_NAME]
+        assert "DEMO COMPLETE" in (run_dir / "demo.log").read_text()
+
+    def test_skips_completed_runs(self, manifest_path: Path):
+        manifest = Manifest.load(manifest_path)
+        asyncio.run(run_batch(manifest))
+        assert asyncio.run(run_batch(manifest)) == []
+        # Editing a task makes its runs stale.
+        (manifest_path.parent / "tasks" / "beta.md").write_text("Build beta, faster")
+        todo, done = pending_runs(manifest)
+        assert [r.run_id for r in todo] == ["beta--tips--1", "beta--tips--2"]
+        assert len(done) == 2
+
+    def test_errors_are_recorded_and_retried(self, tmp_path: Path, manifest_path: Path):
+        manifest = Manifest.from_dict({"tasks": "tasks/alpha.md", "adapters": ["broken"], "agents": 1}, tmp_path)
+        [record] = asyncio.run(run_batch(manifest))
+        assert record["status"] == "error"
+        assert record["error"] == "RuntimeError: CLI not found"
+        assert "CLI not found" in (manifest.output / "runs" / "alpha--broken--1" / "demo.log").read_text()
+        todo, _ = pending_runs(manifest)
+        assert [r.run_id for r in todo] == ["alpha--broken--1"]
+
+    def test_failed_run_resumes_from_checkpoint(self, tmp_path: Path, manifest_path: Path):
+        manifest = Manifest.from_dict({"tasks": "tasks/alpha.md", "adapters": "crash-once", "agents": 3}, tmp_path)
+        [record] = asyncio.run(run_batch(manifest))
+        assert record["error"] == "RuntimeError: power cut"
+        [record] = asyncio.run(run_batch(manifest))
+        assert record["status"] == "ok"
+        assert record["agent_tips"] == [1, 1, 1]
+        # agent-1 finished before the crash, so only the rest ran again.
+        assert CrashOnceAdapter.runs == ["agent-1", "agent-2", "agent-2", "agent-3"]
+
+    def test_ledger_ignores_truncated_line(self, tmp_path: Path):
+        ledger = Ledger(tmp_path / LEDGER_NAME)
+        ledger.append({"run_id": "a", "fingerprint": "f1", "status": "ok"})
+        ledger.append({"run_id": "b", "fingerprint": "f2", "status": "error"})
+        with ledger.path.open("a") as f:
+            f.write('{"run_id": "c", "fing')
+        assert ledger.completed() == {"a": "f1"}
+
+
+class TestBatchCommand:
+    def test_dry_run_and_run(self, manifest_path: Path):
+        runner = CliRunner()
+        result = runner.invoke(cli, ["batch", str(manifest_path), "--dry-run"])
+        assert result.exit_code == 0, result.output
+        assert "todo  alpha--tips--1" in result.output
+        assert "4 to run, 0 done" in result.output
+
+        result = runner.invoke(cli, ["batch", str(manifest_path), "--concurrency", "4"])
+        assert result.exit_code == 0, result.output
+        assert "✓ beta--tips--2" in result.output
+        assert "Finished 4 runs, 0 with errors." in result.output
+        assert "0 to run, 4 done" in runner.invoke(cli, ["batch", str(manifest_path), "--dry-run"]).output
+
+    def test_bad_manifest(self, tmp_path: Path):
+        path = tmp_path / "bad.toml"
+        path.write_text('tasks = ["missing.md"]\nadapters = ["tips"]\nagents = [1]\n')
+        result = CliRunner().invoke(cli, ["batch", str(path)])
+        assert result.exit_code == 2
+        assert "No task files match" in result.output
+
+    def test_errors_exit_nonzero(self, tmp_path: Path, manifest_path: Path):
+        path = tmp_path / "broken.toml"
+        path.write_text('tasks = ["tasks/alpha.md"]\nadapters = ["broken"]\nagents = [1]\n')
+        result = CliRunner().invoke(cli, ["batch", str(path)])
+        assert result.exit_code == 1
+        assert json.loads((tmp_path / "broken-runs" / LEDGER_NAME).read_text())["status"] == "error"
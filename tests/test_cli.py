@@ -0,0 +1,122 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from agent_feedback import store as store_module
+from agent_feedback.cli import CATEGORIES, TAG_MODES, TRANSFER_FORMATS, main
+from agent_feedback.models import FeedbackCategory, FeedbackEntry
+from agent_feedback.store import TagMatch
+from agent_feedback.transfer import FORMATS
+
+
+@pytest.fixture
+def runner(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> CliRunner:
+    monkeypatch.setenv("AGENT_FEEDBACK_STORE", str(tmp_path / "feedback.jsonl"))
+    return CliRunner()
+
+
+def _submit(runner: CliRunner, **overrides: str) -> None:
+    args = {
+        "--agent-id": "agent-1",
+        "--task-type": "build",
+        "--category": "tip",
+        "--title": "A tip",
+        "--detail": "Some detail",
+    }
+    args.update(overrides)
+    result = runner.invoke(main, ["submit", *[x for kv in args.items() for x in kv]])
+    assert result.exit_code == 0, result.output
+
+
+class TestQueryCommand:
+    def test_empty_store_prints_empty_array(self, runner: CliRunner):
+        result = runner.invoke(main, ["query"])
+        assert result.exit_code == 0
+        assert json.loads(result.output) == []
+
+    def test_json_output_matches_dumps(self, runner: CliRunner):
+        _submit(runner, **{"--title": "First", "--tags": "a,b"})
+        _submit(runner, **{"--agent-id": "agent-2", "--title": "Second"})
+        result = runner.invoke(main, ["query", "--exclude-agent", "agent-2"])
+        entries = json.loads(result.output)
+        assert [e["title"] for e in entries] == ["First"]
+        assert result.output == json.dumps(entries, indent=2) + "\n"
+
+    def test_list_all(self, runner: CliRunner):
+        _submit(runner)
+        _submit(runner, **{"--title": "Another tip", "--detail": "Unrelated"})
+        result = runner.invoke(main, ["list"])
+        assert len(json.loads(result.output)) == 2
+
+    def test_pretty_empty(self, runner: CliRunner):
+        result = runner.invoke(main, ["list", "--format", "pretty"])
+        assert "No feedback entries found" in result.output
+
+    def test_tags_mode_and_exclude_tags(self, runner: CliRunner):
+        _submit(runner, **{"--title": "Both", "--tags": "a,b"})
+        _submit(runner, **{"--title": "Only a", "--tags": "a"})
+        _submit(runner, **{"--title": "a and c", "--tags": "a,c"})
+        result = runner.invoke(main, ["query", "--tags", "a,b", "--tags-mode", "all"])
+        assert [e["title"] for e in json.loads(result.output)] == ["Both"]
+        result = runner.invoke(main, ["query", "--tags", "a", "--exclude-tags", "b,c"])
+        assert [e["title"] for e in json.loads(result.output)] == ["Only a"]
+
+    def test_search(self, runner: CliRunner):
+        _submit(runner, **{"--title": "Use pytest fixtures"})
+        _submit(runner, **{"--title": "Pin dependencies"})
+        _submit(runner, **{"--title": "pytest -x stops early", "--detail": "pytest pytest"})
+        result = runner.invoke(main, ["search", "pytest", "--limit", "1"])
+        assert result.exit_code == 0
+        assert [e["title"] for e in json.loads(result.output)] == ["pytest -x stops early"]
+
+
+class TestSnapshots:
+    def test_submit_persists_snapshot_and_indexes(self, runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        # Shrink the mark to 10k bytes rather than write megabytes of tips.
+        monkeypatch.setattr(store_module, "_ENTRY_BYTES", 1)
+        path = tmp_path / "feedback.jsonl"
+        entries = [
+            FeedbackEntry(agent_id="agent-1", task_type="build", category=FeedbackCategory.TIP, title=f"Tip {i}", detail="x" * 100)
+            for i in range(100)
+        ]
+        path.write_text("".join(e.model_dump_json() + "\n" for e in entries))
+        sidecars = [path.with_name(path.name + ext) for ext in (".snap", ".idx", ".fts")]
+
+        assert len(json.loads(runner.invoke(main, ["query", "--task-type", "build"]).output)) == 100
+        assert not any(p.exists() for p in sidecars)
+        _submit(runner, **{"--title": "Fresh", "--detail": "Unrelated"})
+        assert all(p.exists() for p in sidecars)
+        assert len(json.loads(runner.invoke(main, ["query", "--task-type", "build"]).output)) == 101
+
+
+class TestStartup:
+    def test_choices_mirror_enums(self):
+        assert CATEGORIES == tuple(c.value for c in FeedbackCategory)
+        assert TAG_MODES == tuple(m.value for m in TagMatch)
+        assert TRANSFER_FORMATS == FORMATS
+
+    def test_importing_cli_skips_heavy_modules(self):
+        # Every agent tool call pays for these; they must load only on demand.
+        code = (
+            "import sys, agent_feedback.cli; "
+            "print([m for m in ('rich', 'pydantic', 'agent_feedback.store') if m in sys.modules])"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "[]"
+
+    def test_json_query_does_not_import_rich(self, tmp_path: Path):
+        code = (
+            "import sys; from agent_feedback.cli import main\n"
+            "try:\n    main(['query'])\nexcept SystemExit:\n    pass\n"
+            "sys.stderr.write(str('rich' in sys.modules))"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "AGENT_FEEDBACK_SOCKET"}
+        env["AGENT_FEEDBACK_STORE"] = str(tmp_path / "feedback.jsonl")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+        assert json.loads(result.stdout) == []
+        assert result.stderr == "False"
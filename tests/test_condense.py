@@ -0,0 +1,94 @@
+from datetime import UTC, datetime, timedelta
+
+from agent_feedback.condense import TipClusterer, format_cluster
+from agent_feedback.models import FeedbackCategory, FeedbackEntry
+from agent_feedback.prompt_builder import build_agent_prompt, estimate_tokens, format_tip, select_tips
+
+NOW = datetime(2025, 6, 1, tzinfo=UTC)
+
+
+def _make_entry(**kwargs: object) -> FeedbackEntry:
+    defaults: dict[str, object] = {
+        "agent_id": "agent-1",
+        "task_type": "build-todo-app",
+        "category": FeedbackCategory.TIP,
+        "title": "A tip",
+        "detail": "Some detail",
+        "timestamp": NOW,
+    }
+    defaults.update(kwargs)
+    return FeedbackEntry(**defaults)  # type: ignore[arg-type]
+
+
+WAL = _make_entry(title="Use WAL mode for SQLite", detail="Avoids database locks when two processes write", tags=["sqlite"])
+WAL_AGAIN = _make_entry(
+    agent_id="agent-2",
+    title="Enable SQLite WAL journal mode",
+    detail="Database is locked errors go away with concurrent writers",
+    tags=["sqlite", "db"],
+    confidence=0.6,
+)
+CLICK = _make_entry(agent_id="agent-3", title="Pin the click version", detail="Click 8.2 changed CliRunner stderr handling")
+
+
+class TestClusterer:
+    def test_groups_related_tips(self):
+        clusters = TipClusterer().cluster([WAL, CLICK, WAL_AGAIN])
+        assert [[e.id for e in c.members] for c in clusters] == [[WAL.id, WAL_AGAIN.id], [CLICK.id]]
+
+    def test_category_must_match(self):
+        gotcha = WAL_AGAIN.model_copy(update={"category": FeedbackCategory.GOTCHA})
+        assert len(TipClusterer().cluster([WAL, gotcha])) == 2
+
+    def test_assignments_are_cached(self):
+        clusterer = TipClusterer()
+        first = clusterer.assign([WAL, CLICK])
+        # Once assigned, an id keeps its cluster without being compared again.
+        clusterer.threshold = 1.0
+        again = clusterer.assign([WAL, CLICK, WAL_AGAIN])
+        assert {k: again[k] for k in first} == first
+        assert again[WAL_AGAIN.id] not in first.values()
+
+    def test_cluster_summary(self):
+        supported = WAL.model_copy(update={"supporters": ["agent-4"]})
+        (cluster,) = TipClusterer().cluster([WAL_AGAIN, supported])
+        assert cluster.best is supported
+        assert cluster.agents == ["agent-2", "agent-1", "agent-4"]
+        assert cluster.confidence_range == (0.6, 1.0)
+        block = format_cluster(cluster)
+        assert block.startswith("### [tip] from agent-2, agent-1, agent-4 (confidence: 0.6–1.0, 2 related tips)")
+        assert WAL.detail in block and WAL_AGAIN.detail not in block
+        assert f'Also: "{WAL_AGAIN.title}"' in block
+        assert "Tags: sqlite, db" in block
+
+
+class TestCondensedPrompt:
+    def test_prompt_is_smaller_and_keeps_every_tip(self):
+        entries = [WAL, WAL_AGAIN, CLICK]
+        plain = build_agent_prompt(task="Task", agent_id="agent-5", feedback_entries=entries)
+        condensed = build_agent_prompt(task="Task", agent_id="agent-5", feedback_entries=entries, clusterer=TipClusterer())
+        assert len(condensed) < len(plain)
+        assert all(e.title in condensed for e in entries)
+        assert condensed.count("### [") == 2
+
+    def test_selection_charges_cluster_members_less(self):
+        entries = [WAL, WAL_AGAIN, CLICK.model_copy(update={"timestamp": NOW - timedelta(days=60)})]
+        budget = estimate_tokens(format_tip(WAL)) + 30
+        plain = select_tips("sqlite", entries, budget, now=NOW)
+        condensed = select_tips("sqlite", entries, budget, now=NOW, clusterer=TipClusterer())
+        assert plain.entries == [WAL]
+        assert condensed.entries == [WAL, WAL_AGAIN]
+        assert condensed.tokens <= budget
+
+    def test_rendered_tips_fit_the_budget(self):
+        restatements = [
+            WAL_AGAIN.model_copy(update={"id": f"wal-{i}", "agent_id": f"agent-{i}", "confidence": 0.5 + i / 20})
+            for i in range(8)
+        ]
+        budget = 120
+        prompt = build_agent_prompt(
+            task="sqlite", agent_id="agent-9", feedback_entries=restatements, token_budget=budget, clusterer=TipClusterer()
+        )
+        section = prompt.split("## Tips & Experiences from Previous Agents\n\n")[1].split("\n\n## Your Feedback")[0]
+        assert section.count('Also: "') >= 1
+        assert estimate_tokens(section) <= budget
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from agent_feedback import cli, client
+from agent_feedback.cli import main
+from agent_feedback.client import DaemonError, request, socket_path
+from agent_feedback.daemon import FeedbackDaemon, running_daemon
+from agent_feedback.store import JSONLStore
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def store_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "feedback.jsonl"
+    monkeypatch.setenv("AGENT_FEEDBACK_STORE", str(path))
+    monkeypatch.delenv("AGENT_FEEDBACK_SOCKET", raising=False)
+    return path
+
+
+@pytest.fixture
+def daemon(store_path: Path) -> Iterator[FeedbackDaemon]:
+    server = FeedbackDaemon(store_path, socket_path(str(store_path)))
+
+    def serve() -> None:
+        with server:
+            server.serve_forever()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+
+
+def _fields(**overrides: object) -> dict[str, object]:
+    fields: dict[str, object] = {
+        "agent_id": "agent-1",
+        "task_type": "build",
+        "category": "tip",
+        "title": "A tip",
+        "detail": "Some detail",
+    }
+    fields.update(overrides)
+    return fields
+
+
+class TestProtocol:
+    def test_no_daemon_means_none(self, store_path: Path):
+        assert request(socket_path(str(store_path)), "ping") is None
+
+    def test_stale_socket_means_none(self, store_path: Path):
+        path = socket_path(str(store_path))
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        assert request(path, "ping") is None
+        # A new daemon takes the stale socket over.
+        FeedbackDaemon(store_path, path).server_close()
+
+    def test_unresponsive_daemon_means_none(self, store_path: Path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(client, "TIMEOUT", 0.2)
+        path = socket_path(str(store_path))
+        hung = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        hung.bind(path)
+        hung.listen()
+        try:
+            assert request(path, "ping") is None
+        finally:
+            hung.close()
+
+    def test_deep_store_gets_short_socket(self, tmp_path: Path, store_path: Path):
+        deep = tmp_path / ("d" * 60) / ("e" * 60) / "feedback.jsonl"
+        path = socket_path(str(deep))
+        assert len(path) <= 100 and path == socket_path(str(deep))
+        assert path != socket_path(str(deep.with_name("other.jsonl")))
+        assert request(path, "ping") is None
+
+    def test_submit_and_query(self, daemon: FeedbackDaemon, store_path: Path):
+        path = socket_path(str(store_path))
+        reply = request(path, "submit", entry=_fields(tags=["a"]), merge=True)
+        assert reply is not None and reply["merged"] is False
+        request(path, "submit", entry=_fields(agent_id="agent-2", title="Other", detail="Different"))
+        reply = request(path, "query", tags=["a"])
+        assert [e["title"] for e in reply["entries"]] == ["A tip"]
+        # The daemon writes to the store itself, where everyone else can read it.
+        assert JSONLStore(store_path).count() == 2
+
+    def test_query_uses_warm_cache(self, daemon: FeedbackDaemon, store_path: Path, monkeypatch: pytest.MonkeyPatch):
+        path = socket_path(str(store_path))
+        request(path, "submit", entry=_fields(task_type="t1"))
+        request(path, "submit", entry=_fields(task_type="t2", title="Other", detail="Different"))
+
+        def from_disk(*args: object, **kwargs: object) -> None:
+            raise AssertionError("query re-read the store from disk")
+
+        monkeypatch.setattr(daemon.store, "iter_entries", from_disk)
+        reply = request(path, "query", task_type="t2")
+        assert [e["title"] for e in reply["entries"]] == ["Other"]
+
+    def test_submit_merges_duplicates(self, daemon: FeedbackDaemon, store_path: Path):
+        path = socket_path(str(store_path))
+        request(path, "submit", entry=_fields())
+        reply = request(path, "submit", entry=_fields(agent_id="agent-2"))
+        assert reply["merged"] is True
+        assert reply["entry"]["supporters"] == ["agent-2"]
+
+    def test_invalid_entry_is_refused(self, daemon: FeedbackDaemon, store_path: Path):
+        with pytest.raises(DaemonError, match="confidence"):
+            request(socket_path(str(store_path)), "submit", entry=_fields(confidence=2.0))
+
+    def test_unknown_op_is_refused(self, daemon: FeedbackDaemon, store_path: Path):
+        with pytest.raises(DaemonError, match="unknown op"):
+            request(socket_path(str(store_path)), "explode")
+
+    def test_second_daemon_refuses_to_start(self, daemon: FeedbackDaemon, store_path: Path):
+        with pytest.raises(RuntimeError, match="already listening"):
+            FeedbackDaemon(store_path, socket_path(str(store_path)))
+
+
+class TestCliThroughDaemon:
+    @pytest.fixture(autouse=True)
+    def _no_direct_access(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        def fail() -> None:
+            raise AssertionError("store opened directly although a daemon is running")
+
+        monkeypatch.setattr(cli, "_get_store", fail)
+
+    def test_submit_query_search(self, daemon: FeedbackDaemon):
+        runner = CliRunner()
+        args = ["--agent-id", "agent-1", "--task-type", "build", "--category", "tip"]
+        result = runner.invoke(main, ["submit", *args, "--title", "Pin numpy", "--detail", "Avoid ABI breaks"])
+        assert result.exit_code == 0, result.output
+        assert "Feedback saved" in result.output
+
+        result = runner.invoke(main, ["query", "--task-type", "build"])
+        entries = json.loads(result.output)
+        assert [e["title"] for e in entries] == ["Pin numpy"]
+        assert result.output == json.dumps(entries, indent=2) + "\n"
+
+        result = runner.invoke(main, ["search", "numpy", "--format", "pretty"])
+        assert "Pin numpy" in result.output
+
+    def test_daemon_errors_become_cli_errors(self, daemon: FeedbackDaemon):
+        args = ["--agent-id", "a", "--task-type", "t", "--category", "tip", "--title", "x", "--detail", "y"]
+        result = CliRunner().invoke(main, ["submit", *args, "--confidence", "5"])
+        assert result.exit_code != 0
+        assert "confidence" in result.output
+
+
+class TestConcurrentClients:
+    def test_many_cli_processes_at_once(self, daemon: FeedbackDaemon, store_path: Path):
+        # More clients than the listen backlog holds, all connecting at the same moment.
+        procs = [
+            subprocess.Popen(
+                [
+                    sys.executable, "-m", "agent_feedback.cli", "submit", "--no-merge",
+                    "--agent-id", f"agent-{i}", "--task-type", "build", "--category", "tip",
+                    "--title", f"Tip {i}", "--detail", f"Detail {i}",
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            for i in range(60)
+        ]
+        errors = [p.communicate(timeout=60)[1].decode() for p in procs]
+        assert [p.returncode for p in procs] == [0] * 60, next(e for e in errors if e)
+        assert JSONLStore(store_path).count() == 60
+
+
+class TestRunningDaemon:
+    def test_serves_for_the_block(self, store_path: Path):
+        async def run() -> None:
+            async with running_daemon(store_path) as path:
+                assert path is not None
+                reply = await asyncio.to_thread(request, path, "ping")
+                assert reply["store"] == str(store_path)
+            assert request(path, "ping") is None
+
+        asyncio.run(run())
@@ -0,0 +1,205 @@
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from agent_feedback.cli import main
+from agent_feedback.dedupe import (
+    DuplicateIndex,
+    content_hash,
+    dedupe_index_path,
+    dedupe_store,
+    merge,
+    save_or_merge,
+    signature,
+    similarity,
+)
+from agent_feedback.models import FeedbackCategory, FeedbackEntry, FeedbackRecord
+from agent_feedback.store import JSONLStore, open_store
+
+TITLE = "Run the test suite before committing"
+DETAIL = "Always run pytest locally before you commit so broken tests never reach the shared branch."
+
+
+def _make_entry(**kwargs: object) -> FeedbackEntry:
+    defaults: dict[str, object] = {
+        "agent_id": "agent-1",
+        "task_type": "build-todo-app",
+        "category": FeedbackCategory.TIP,
+        "title": TITLE,
+        "detail": DETAIL,
+    }
+    defaults.update(kwargs)
+    return FeedbackEntry(**defaults)  # type: ignore[arg-type]
+
+
+class TestFingerprints:
+    def test_content_hash_ignores_case_and_punctuation(self):
+        assert content_hash("Run tests!", "Always.") == content_hash("run  TESTS", "always")
+        assert content_hash("Run tests", "Always") != content_hash("Run tests", "Never")
+
+    def test_similarity_tracks_overlap(self):
+        base = signature(TITLE, DETAIL)
+        near = signature(TITLE, DETAIL + " It saves time.")
+        far = signature("Prefer pathlib", "Path objects beat string juggling.")
+        assert similarity(base, base) == 1.0
+        assert similarity(base, near) > 0.7
+        assert similarity(base, far) < 0.2
+
+
+class TestDuplicateIndex:
+    def test_finds_near_duplicates_only(self):
+        index = DuplicateIndex()
+        original = _make_entry()
+        other = _make_entry(title="Prefer pathlib", detail="Path objects beat string juggling.")
+        index.add(original)
+        index.add(other)
+        restated = _make_entry(agent_id="agent-2", detail=DETAIL + " It saves time.")
+        assert [entry_id for entry_id, _ in index.find(restated)] == [original.id]
+        assert index.find(_make_entry(title="Cache docker layers", detail="Order the Dockerfile well.")) == []
+
+    def test_exact_match_and_self_exclusion(self):
+        index = DuplicateIndex()
+        original = _make_entry()
+        index.add(original)
+        assert index.find(original) == []
+        assert index.find(_make_entry(title=TITLE.upper())) == [(original.id, 1.0)]
+
+    def test_sync_follows_store_cursor(self, tmp_path: Path):
+        store = JSONLStore(tmp_path / "f.jsonl")
+        index = DuplicateIndex(tmp_path / "f.jsonl.dedupe")
+        store.save(_make_entry())
+        index.sync(store)
+        index.close()
+
+        reopened = DuplicateIndex(tmp_path / "f.jsonl.dedupe")
+        later = _make_entry(title="Prefer pathlib", detail="Path objects beat string juggling.")
+        store.save(later)
+        reopened.sync(store)
+        assert len(reopened.find(_make_entry(agent_id="agent-2"))) == 1
+        assert len(reopened.find(_make_entry(title=later.title, detail=later.detail))) == 1
+
+
+class TestMerge:
+    def test_new_supporter_raises_confidence(self):
+        store_entry = _make_entry(confidence=0.6, tags=["testing"])
+        record = _as_record(store_entry)
+        merged = merge(record, _make_entry(agent_id="agent-2", confidence=0.5, tags=["ci"]))
+        assert merged.id == store_entry.id
+        assert merged.supporters == ["agent-2"]
+        assert merged.confidence == pytest.approx(0.8)
+        assert merged.tags == ["testing", "ci"]
+
+    def test_repeat_supporter_does_not_inflate(self):
+        record = _as_record(_make_entry(confidence=0.6, supporters=["agent-2"]))
+        merged = merge(record, _make_entry(agent_id="agent-2", confidence=0.5))
+        assert merged.supporters == ["agent-2"]
+        assert merged.confidence == 0.6
+
+
+def _as_record(entry: FeedbackEntry) -> FeedbackRecord:
+    return FeedbackRecord.from_json(entry.model_dump_json())
+
+
+@pytest.fixture(params=["f.jsonl", "f.db", "seg", "f.shards"])
+def store_path(request: pytest.FixtureRequest, tmp_path: Path) -> Path:
+    return tmp_path / request.param
+
+
+class TestSaveOrMerge:
+    def test_merges_restated_tip(self, store_path: Path):
+        store = open_store(store_path)
+        index = DuplicateIndex(dedupe_index_path(store_path))
+        original = _make_entry(confidence=0.5)
+        _, merged = save_or_merge(store, index, original)
+        assert not merged
+        stored, merged = save_or_merge(
+            store, index, _make_entry(agent_id="agent-2", confidence=0.5, detail=DETAIL + " Really.")
+        )
+        assert merged
+        assert stored.id == original.id
+        assert store.count() == 1
+        assert store.get(original.id).supporters == ["agent-2"]
+        assert store.get(original.id).confidence == pytest.approx(0.75)
+
+    def test_keeps_distinct_tips(self, store_path: Path):
+        store = open_store(store_path)
+        index = DuplicateIndex(dedupe_index_path(store_path))
+        save_or_merge(store, index, _make_entry())
+        save_or_merge(store, index, _make_entry(title="Prefer pathlib", detail="Path objects beat strings."))
+        assert store.count() == 2
+
+    def test_keeps_tips_of_other_task_types_and_categories(self, store_path: Path):
+        store = open_store(store_path)
+        index = DuplicateIndex(dedupe_index_path(store_path))
+        save_or_merge(store, index, _make_entry())
+        _, merged = save_or_merge(store, index, _make_entry(agent_id="agent-2", task_type="data-pipeline"))
+        assert not merged
+        _, merged = save_or_merge(store, index, _make_entry(agent_id="agent-3", category=FeedbackCategory.GOTCHA))
+        assert not merged
+        assert [e.agent_id for e in store.query(task_type="data-pipeline")] == ["agent-2"]
+        assert store.count() == 3
+
+    def test_skips_deleted_candidates(self, store_path: Path):
+        store = open_store(store_path)
+        index = DuplicateIndex(dedupe_index_path(store_path))
+        original = _make_entry()
+        save_or_merge(store, index, original)
+        index.sync(store)
+        store.delete(original.id)
+        _, merged = save_or_merge(store, index, _make_entry(agent_id="agent-2"))
+        assert not merged
+        assert store.count() == 1
+
+
+class TestDedupeStore:
+    def test_merges_existing_duplicates(self, store_path: Path):
+        store = open_store(store_path)
+        first = _make_entry()
+        store.save_many([
+            first,
+            _make_entry(title="Prefer pathlib", detail="Path objects beat string juggling."),
+            _make_entry(agent_id="agent-2", detail=DETAIL + " Really."),
+            _make_entry(agent_id="agent-3"),
+        ])
+        stats = dedupe_store(store)
+        assert (stats.examined, stats.merged) == (4, 2)
+        assert store.count() == 2
+        assert store.get(first.id).supporters == ["agent-2", "agent-3"]
+
+    def test_leaves_other_task_types_alone(self, store_path: Path):
+        store = open_store(store_path)
+        store.save_many([_make_entry(), _make_entry(agent_id="agent-2", task_type="data-pipeline")])
+        assert dedupe_store(store).merged == 0
+        assert store.count() == 2
+
+
+class TestCli:
+    @pytest.fixture
+    def runner(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> CliRunner:
+        monkeypatch.setenv("AGENT_FEEDBACK_STORE", str(tmp_path / "feedback.jsonl"))
+        return CliRunner()
+
+    def _submit(self, runner: CliRunner, agent_id: str, *extra: str) -> str:
+        result = runner.invoke(main, [
+            "submit", "--agent-id", agent_id, "--task-type", "build", "--category", "tip",
+            "--title", TITLE, "--detail", DETAIL, *extra,
+        ])
+        assert result.exit_code == 0, result.output
+        return result.output
+
+    def test_submit_merges_by_default(self, runner: CliRunner):
+        self._submit(runner, "agent-1")
+        assert "Merged into existing feedback" in self._submit(runner, "agent-2")
+        entries = json.loads(runner.invoke(main, ["list"]).output)
+        assert len(entries) == 1
+        assert entries[0]["supporters"] == ["agent-2"]
+
+    def test_no_merge_and_dedupe_command(self, runner: CliRunner):
+        self._submit(runner, "agent-1")
+        self._submit(runner, "agent-2", "--no-merge")
+        assert len(json.loads(runner.invoke(main, ["list"]).output)) == 2
+        result = runner.invoke(main, ["dedupe"])
+        assert "merged 1 near-duplicates" in result.output
+        assert len(json.loads(runner.invoke(main, ["list"]).output)) == 1
@@ -0,0 +1,151 @@
+from pathlib import Path
+
+import pytest
+
+from agent_feedback.index import InvertedIndex, read_index, select
+from agent_feedback.models import FeedbackCategory, FeedbackEntry
+from agent_feedback.snapshot import SnapshotHeader
+from agent_feedback.store import JSONLStore, SQLiteStore
+
+
+def _make_entry(**kwargs: object) -> FeedbackEntry:
+    defaults: dict[str, object] = {
+        "agent_id": "agent-1",
+        "task_type": "build-todo-app",
+        "category": FeedbackCategory.TIP,
+        "title": "A tip",
+        "detail": "Some detail",
+    }
+    defaults.update(kwargs)
+    return FeedbackEntry(**defaults)  # type: ignore[arg-type]
+
+
+def _tagged_entries() -> list[FeedbackEntry]:
+    return [
+        _make_entry(title="py-click", tags=["python", "click"]),
+        _make_entry(title="rust", tags=["rust"], agent_id="agent-2"),
+        _make_entry(title="py-pydantic", tags=["python", "pydantic"], task_type="api"),
+        _make_entry(title="py-click-2", tags=["click", "python"], agent_id="agent-2"),
+        _make_entry(title="untagged"),
+    ]
+
+
+class TestSelect:
+    def test_intersection(self):
+        assert select([[1, 3, 5, 7], [3, 4, 5]], [], []) == [3, 5]
+
+    def test_union_deduplicates(self):
+        assert select([], [[1, 4], [2, 4, 6]], []) == [1, 2, 4, 6]
+
+    def test_union_within_required_minus_excluded(self):
+        assert select([[1, 2, 3, 4]], [[2, 9], [3, 4]], [[4]]) == [2, 3]
+
+
+class TestInvertedIndex:
+    def test_postings_are_sorted_ordinals(self):
+        index = InvertedIndex()
+        index.extend(_tagged_entries(), [0, 10, 20, 30, 40])
+        assert list(index.lookup("tags", "python")) == [0, 2, 3]
+        assert list(index.lookup("agent_id", "agent-2")) == [1, 3]
+        assert list(index.lookup("task_type", "api")) == [2]
+        assert list(index.lookup("tags", "missing")) == []
+
+    def test_write_and_read_back(self, tmp_path: Path):
+        index = InvertedIndex()
+        index.extend(_tagged_entries(), [0, 10, 20, 30, 40])
+        header = SnapshotHeader(source_ino=1, source_end=50, last_line_len=10, last_line_crc=7)
+        index.write(tmp_path / "f.idx", header)
+
+        reader = read_index(tmp_path / "f.idx")
+        assert reader is not None
+        assert reader.header == header
+        assert list(reader.lookup("tags", "click")) == [0, 3]
+        assert reader.offsets([1, 3, 4]) == [10, 30, 40]
+        loaded = InvertedIndex.load(reader)
+        assert loaded.postings == index.postings
+        assert loaded.offsets == index.offsets
+
+    def test_read_missing_or_foreign_file(self, tmp_path: Path):
+        assert read_index(tmp_path / "missing.idx") is None
+        (tmp_path / "other.idx").write_bytes(b"not an index")
+        assert read_index(tmp_path / "other.idx") is None
+
+
+@pytest.fixture(params=["jsonl", "sqlite"])
+def tagged_store(request: pytest.FixtureRequest, tmp_path: Path) -> JSONLStore | SQLiteStore:
+    store = JSONLStore(tmp_path / "f.jsonl") if request.param == "jsonl" else SQLiteStore(tmp_path / "f.db")
+    store.save_many(_tagged_entries())
+    return store
+
+
+class TestTagQueries:
+    def test_any_mode(self, tagged_store: JSONLStore | SQLiteStore):
+        titles = [e.title for e in tagged_store.query(tags=["click", "rust"])]
+        assert titles == ["py-click", "rust", "py-click-2"]
+
+    def test_all_mode(self, tagged_store: JSONLStore | SQLiteStore):
+        titles = [e.title for e in tagged_store.query(tags=["python", "click"], tags_mode="all")]
+        assert titles == ["py-click", "py-click-2"]
+        assert tagged_store.query(tags=["python", "missing"], tags_mode="all") == []
+
+    def test_exclude_tags(self, tagged_store: JSONLStore | SQLiteStore):
+        titles = [e.title for e in tagged_store.query(tags=["python"], exclude_tags=["pydantic"])]
+        assert titles == ["py-click", "py-click-2"]
+        titles = [e.title for e in tagged_store.query(exclude_tags=["python"])]
+        assert titles == ["rust", "untagged"]
+
+    def test_combined_with_task_type_and_agent(self, tagged_store: JSONLStore | SQLiteStore):
+        results = tagged_store.query(
+            task_type="build-todo-app", tags=["python"], tags_mode="all", exclude_agent="agent-2"
+        )
+        assert [e.title for e in results] == ["py-click"]
+
+    def test_iter_entries_agrees_with_query(self, tagged_store: JSONLStore | SQLiteStore):
+        kwargs = {"tags": ["python", "click"], "tags_mode": "all", "exclude_tags": ["rust"]}
+        assert list(tagged_store.iter_entries(**kwargs)) == tagged_store.query(**kwargs)
+
+
+class TestPersistedIndex:
+    def test_written_with_snapshot(self, tmp_path: Path):
+        store = JSONLStore(tmp_path / "f.jsonl", snapshot_every=3)
+        store.save_many(_tagged_entries())
+        store.count()
+        assert store.index_path.exists()
+
+    def test_cold_query_reads_only_matching_lines(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        import agent_feedback.store as store_mod
+
+        writer = JSONLStore(tmp_path / "f.jsonl", snapshot_every=3)
+        writer.save_many(_tagged_entries())
+        writer.write_snapshot()
+        writer.save(_make_entry(title="tail", tags=["python", "click"]))
+
+        parsed: list[int] = []
+        original = store_mod._parse_lines
+
+        def counting(lines: list[bytes]):
+            parsed.append(len(lines))
+            return original(lines)
+
+        monkeypatch.setattr(store_mod, "_parse_lines", counting)
+        reader = JSONLStore(tmp_path / "f.jsonl", snapshot_every=3)
+        results = list(reader.iter_entries(tags=["python", "click"], tags_mode="all"))
+        assert [e.title for e in results] == ["py-click", "py-click-2", "tail"]
+        # Two indexed hits plus the one-line tail.
+        assert sum(parsed) == 3
+
+    def test_stale_index_is_ignored(self, tmp_path: Path):
+        path = tmp_path / "f.jsonl"
+        store = JSONLStore(path, snapshot_every=3)
+        store.save_many(_tagged_entries())
+        store.write_snapshot()
+        path.write_text(_make_entry(title="rewritten", tags=["python"]).model_dump_json() + "\n")
+        fresh = JSONLStore(path, snapshot_every=3)
+        assert [e.title for e in fresh.iter_entries(tags=["python"])] == ["rewritten"]
+
+    def test_clear_removes_index(self, tmp_path: Path):
+        store = JSONLStore(tmp_path / "f.jsonl")
+        store.save_many(_tagged_entries())
+        store.write_snapshot()
+        store.clear()
+        assert not store.index_path.exists()
@@ -1,7 +1,7 @@
 import pytest
 from pydantic import ValidationError
 
-from agent_feedback.models import FeedbackCategory, FeedbackEntry
+from agent_feedback.models import FeedbackCategory, FeedbackEntry, FeedbackRecord
 
 
 class TestFeedbackCategory:
@@ -91,3 +91,34 @@ class TestFeedbackEntry:
         ]
         ids = {e.id for e in entries}
         assert len(ids) == 100
+
+
+class TestFeedbackRecord:
+    def _entry(self) -> FeedbackEntry:
+        return FeedbackEntry(
+            agent_id="agent-2",
+            task_type="refactor",
+            category=FeedbackCategory.GOTCHA,
+            title="Watch the ✓ encoding",
+            detail="Line1\nLine2",
+            tags=["unicode"],
+            confidence=0.4,
+            harness="pi",
+        )
+
+    def test_from_json_matches_entry(self):
+        entry = self._entry()
+        record = FeedbackRecord.from_json(entry.model_dump_json())
+        assert record.category is FeedbackCategory.GOTCHA
+        assert record.timestamp == entry.timestamp
+        assert record.model_dump() == entry.model_dump()
+
+    def test_json_serialization_matches_pydantic(self):
+        entry = self._entry()
+        record = FeedbackRecord.from_json(entry.model_dump_json())
+        assert record.model_dump(mode="json") == entry.model_dump(mode="json")
+        assert record.model_dump_json() == entry.model_dump_json()
+
+    def test_to_entry(self):
+        entry = self._entry()
+        assert FeedbackRecord.from_json(entry.model_dump_json()).to_entry() == entry
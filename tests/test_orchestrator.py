@@ -0,0 +1,216 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from agent_feedback import adapters
+from agent_feedback.__main__ import cli
+from agent_feedback.adapters import AgentAdapter, AgentResult
+from agent_feedback.checkpoint import STATE_NAME, ResumeError, RunState
+from agent_feedback.dedupe import DuplicateIndex, dedupe_index_path
+from agent_feedback.models import FeedbackCategory, FeedbackEntry
+from agent_feedback.orchestrator import DemoSummary, run_demo
+from agent_feedback.store import open_store
+
+
+class FakeAdapter(AgentAdapter):
+    """Submits one tip per run and records what it saw."""
+
+    prompts: dict[str, str] = {}
+    running = 0
+    max_running = 0
+    # This agent submits its tip after the others, then crashes.
+    crash: str | None = None
+
+    async def run(
+        self,
+        prompt: str,
+        work_dir: Path,
+        on_stream: Callable[[str, str], Awaitable[None] | None],
+        env: dict[str, str] | None = None,
+    ) -> AgentResult:
+        cls = type(self)
+        cls.prompts[work_dir.name] = prompt
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        try:
+            await asyncio.sleep(0.5 if work_dir.name == cls.crash else 0.2)
+            store = open_store(Path(env["AGENT_FEEDBACK_STORE"]))
+            store.save(
+                FeedbackEntry(
+                    agent_id=work_dir.name,
+                    task_type="demo",
+                    category=FeedbackCategory.TIP,
+                    title=f"Lesson from {work_dir.name}",
+                    detail=f"Something {work_dir.name} learned",
+                )
+            )
+        finally:
+            cls.running -= 1
+        if work_dir.name == cls.crash:
+            raise RuntimeError(f"{work_dir.name} crashed")
+        return AgentResult(success=True, output="")
+
+
+@pytest.fixture
+def fake_adapter(monkeypatch: pytest.MonkeyPatch) -> type[FakeAdapter]:
+    monkeypatch.setitem(adapters.ADAPTERS, "fake", FakeAdapter)
+    monkeypatch.setattr(FakeAdapter, "prompts", {})
+    monkeypatch.setattr(FakeAdapter, "max_running", 0)
+    monkeypatch.setattr(FakeAdapter, "crash", None)
+    return FakeAdapter
+
+
+class TestWaves:
+    def test_parallel_waves_learn_from_earlier_waves(self, tmp_path: Path, fake_adapter: type[FakeAdapter]):
+        task = tmp_path / "task.md"
+        task.write_text("Build a thing")
+        store_path = tmp_path / "feedback.jsonl"
+        asyncio.run(
+            run_demo(
+                task_path=task,
+                adapter_name="fake",
+                num_agents=5,
+                store_path=store_path,
+                workspace_dir=tmp_path / "workspace",
+                parallel=2,
+            )
+        )
+        assert fake_adapter.max_running == 2
+        prompts = fake_adapter.prompts
+        assert "Lesson from" not in prompts["agent-1"] + prompts["agent-2"]
+        # The second wave sees the first wave's tips, but not each other's.
+        assert "Lesson from agent-1" in prompts["agent-4"] and "Lesson from agent-2" in prompts["agent-4"]
+        assert "Lesson from agent-3" not in prompts["agent-4"]
+        assert "Lesson from agent-4" in prompts["agent-5"]
+        assert open_store(store_path).count() == 5
+        assert sorted(p.name for p in (tmp_path / "workspace").iterdir()) == [f"agent-{i}" for i in range(1, 6)] + [STATE_NAME]
+
+
+class TestWorkspaces:
+    def test_seeds_from_template_and_retires_old_workspace(self, tmp_path: Path, fake_adapter: type[FakeAdapter]):
+        task = tmp_path / "task.md"
+        task.write_text("Build a thing")
+        template = tmp_path / "template"
+        (template / "src").mkdir(parents=True)
+        (template / "src" / "main.py").write_text("print('hi')\n")
+        workspace = tmp_path / "workspace"
+        (workspace / "agent-1" / "build").mkdir(parents=True)
+        (workspace / "agent-1" / "build" / "artifact.bin").write_bytes(b"old")
+
+        asyncio.run(
+            run_demo(
+                task_path=task,
+                adapter_name="fake",
+                num_agents=2,
+                store_path=tmp_path / "feedback.jsonl",
+                workspace_dir=workspace,
+                template=template,
+            )
+        )
+        for agent in ("agent-1", "agent-2"):
+            assert (workspace / agent / "src" / "main.py").read_text() == "print('hi')\n"
+        assert not (workspace / "agent-1" / "build").exists()
+        # The old workspace was deleted before the demo returned.
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["feedback.jsonl", "task.md", "template", "workspace"]
+
+
+    def test_reset_removes_dedupe_index(self, tmp_path: Path, fake_adapter: type[FakeAdapter]):
+        task = tmp_path / "task.md"
+        task.write_text("Build a thing")
+        store_path = tmp_path / "feedback.jsonl"
+        index = DuplicateIndex(dedupe_index_path(store_path))
+        index.close()
+        asyncio.run(
+            run_demo(
+                task_path=task,
+                adapter_name="fake",
+                num_agents=1,
+                store_path=store_path,
+                workspace_dir=tmp_path / "workspace",
+            )
+        )
+        assert not dedupe_index_path(store_path).exists()
+
+
+class TestResetCommand:
+    def test_clears_store_and_dedupe_index(self, tmp_path: Path):
+        store_path = tmp_path / "feedback.jsonl"
+        open_store(store_path).save(FeedbackEntry(agent_id="a", task_type="t", category="tip", title="x", detail="y"))
+        DuplicateIndex(dedupe_index_path(store_path)).close()
+        result = CliRunner().invoke(cli, ["reset", "--store", str(store_path)])
+        assert result.exit_code == 0, result.output
+        assert open_store(store_path).count() == 0
+        assert not dedupe_index_path(store_path).exists()
+
+
+class TestResume:
+    def _run(self, tmp_path: Path, num_agents: int, **kwargs: object) -> DemoSummary:
+        task = tmp_path / "task.md"
+        if not task.exists():
+            task.write_text("Build a thing")
+        return asyncio.run(
+            run_demo(
+                task_path=task,
+                adapter_name="fake",
+                num_agents=num_agents,
+                store_path=tmp_path / "feedback.jsonl",
+                workspace_dir=tmp_path / "workspace",
+                **kwargs,
+            )
+        )
+
+    def test_resumes_after_crash(self, tmp_path: Path, fake_adapter: type[FakeAdapter], monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(fake_adapter, "crash", "agent-4")
+        with pytest.raises(RuntimeError, match="agent-4 crashed"):
+            self._run(tmp_path, 5, parallel=2)
+        state = RunState.load(tmp_path / "workspace" / STATE_NAME)
+        assert sorted(state.agents) == [1, 2, 3]
+        assert state.wave_start == 3
+        (tmp_path / "workspace" / "agent-4" / "half-done.txt").write_text("partial")
+
+        monkeypatch.setattr(fake_adapter, "crash", None)
+        monkeypatch.setattr(fake_adapter, "prompts", {})
+        summary = self._run(tmp_path, 5, parallel=2, resume=True)
+        assert sorted(fake_adapter.prompts) == ["agent-4", "agent-5"]
+        # agent-4 starts over from its wave's tips: not agent-3's, nor its own from before the crash.
+        prompt = fake_adapter.prompts["agent-4"]
+        assert "Lesson from agent-1" in prompt and "Lesson from agent-2" in prompt
+        assert "Lesson from agent-3" not in prompt
+        assert "Lesson from agent-4" in fake_adapter.prompts["agent-5"]
+        assert not (tmp_path / "workspace" / "agent-4" / "half-done.txt").exists()
+        assert summary.agent_tips == [1, 1, 1, 1, 1]
+        assert [e.agent_id for e in open_store(tmp_path / "feedback.jsonl").get_all()].count("agent-4") == 1
+
+    def test_withdraws_support_of_unfinished_agents(
+        self, tmp_path: Path, fake_adapter: type[FakeAdapter], monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(fake_adapter, "crash", "agent-2")
+        with pytest.raises(RuntimeError, match="agent-2 crashed"):
+            self._run(tmp_path, 2)
+        # As if agent-2 had restated agent-1's tip before crashing.
+        store = open_store(tmp_path / "feedback.jsonl")
+        [first] = [e for e in store.get_all() if e.agent_id == "agent-1"]
+        store.update(first._replace(supporters=["agent-2"]))
+
+        monkeypatch.setattr(fake_adapter, "crash", None)
+        self._run(tmp_path, 2, resume=True)
+        assert "confirmed by agent-2" not in fake_adapter.prompts["agent-2"]
+        assert store.get(first.id).supporters == []
+
+    def test_extends_finished_run(self, tmp_path: Path, fake_adapter: type[FakeAdapter]):
+        self._run(tmp_path, 2)
+        fake_adapter.prompts.clear()
+        summary = self._run(tmp_path, 3, resume=True)
+        assert list(fake_adapter.prompts) == ["agent-3"]
+        assert summary.total_tips == 3
+        assert RunState.load(tmp_path / "workspace" / STATE_NAME).agents[2].prompt_hash
+
+    def test_refuses_mismatched_or_missing_run(self, tmp_path: Path, fake_adapter: type[FakeAdapter]):
+        with pytest.raises(ResumeError, match="No run to resume"):
+            self._run(tmp_path, 1, resume=True)
+        self._run(tmp_path, 1)
+        with pytest.raises(ResumeError, match="other settings"):
+            self._run(tmp_path, 1, resume=True, tip_budget=10)
@@ -1,5 +1,16 @@
+from datetime import UTC, datetime, timedelta
+
 from agent_feedback.models import FeedbackCategory, FeedbackEntry
-from agent_feedback.prompt_builder import build_agent_prompt
+from agent_feedback.prompt_builder import (
+    SelectionWeights,
+    build_agent_prompt,
+    estimate_tokens,
+    format_tip,
+    select_tips,
+)
+
+NOW = datetime(2025, 6, 1, tzinfo=UTC)
+TASK = "Build a todo app with a SQLite database and a click command line"
 
 
 def _make_entry(**kwargs: object) -> FeedbackEntry:
@@ -80,3 +91,49 @@ class TestBuildAgentPrompt:
         assert '"quotes"' in prompt
         assert "<brackets>" in prompt
         assert "```code```" in prompt
+
+
+class TestSelectTips:
+    def test_relevant_tips_rank_first(self):
+        entries = [
+            _make_entry(title="Indent with tabs", detail="Style preference", timestamp=NOW),
+            _make_entry(title="Use SQLite WAL mode", detail="The database locks less", timestamp=NOW),
+            _make_entry(title="Pin versions", detail="Nothing to do with it", tags=["click"], timestamp=NOW),
+        ]
+        selection = select_tips(TASK, entries, budget=None, now=NOW)
+        assert [t.entry.title for t in selection.selected] == ["Use SQLite WAL mode", "Pin versions", "Indent with tabs"]
+        assert selection.dropped == []
+
+    def test_budget_drops_lowest_value_tips(self):
+        entries = [_make_entry(title=f"SQLite tip {i}", confidence=0.1 * (i + 1), timestamp=NOW) for i in range(5)]
+        per_tip = estimate_tokens(format_tip(entries[0]))
+        selection = select_tips(TASK, entries, budget=2 * per_tip, now=NOW)
+        assert [t.entry.title for t in selection.selected] == ["SQLite tip 4", "SQLite tip 3"]
+        assert {t.entry.title for t in selection.dropped} == {"SQLite tip 0", "SQLite tip 1", "SQLite tip 2"}
+        assert selection.tokens <= selection.budget
+
+    def test_smaller_tip_fills_the_remaining_budget(self):
+        big = _make_entry(title="SQLite database", detail="x " * 400, timestamp=NOW)
+        small = _make_entry(title="Other", confidence=0.2, timestamp=NOW)
+        selection = select_tips(TASK, [big, small], budget=estimate_tokens(format_tip(small)) + 10, now=NOW)
+        assert selection.entries == [small]
+        assert [t.entry for t in selection.dropped] == [big]
+
+    def test_diversity_interleaves_categories(self):
+        gotchas = [_make_entry(category=FeedbackCategory.GOTCHA, title=f"Gotcha {i}", timestamp=NOW) for i in range(3)]
+        approach = _make_entry(category=FeedbackCategory.APPROACH, title="Approach", confidence=0.9, timestamp=NOW)
+        selection = select_tips("unrelated", [*gotchas, approach], budget=None, now=NOW)
+        assert [t.entry.title for t in selection.selected][:2] == ["Gotcha 0", "Approach"]
+        flat = select_tips("unrelated", [*gotchas, approach], budget=None, weights=SelectionWeights(diversity=1.0), now=NOW)
+        assert flat.selected[-1].entry.title == "Approach"
+
+    def test_recency(self):
+        old = _make_entry(title="Old", timestamp=NOW - timedelta(days=30))
+        new = _make_entry(title="New", timestamp=NOW - timedelta(hours=1))
+        assert select_tips("unrelated", [old, new], budget=None, now=NOW).entries == [new, old]
+
+    def test_prompt_respects_budget(self):
+        entries = [_make_entry(title=f"SQLite tip {i}", timestamp=NOW) for i in range(10)]
+        budget = 3 * estimate_tokens(format_tip(entries[0]))
+        prompt = build_agent_prompt(task=TASK, agent_id="agent-2", feedback_entries=entries, token_budget=budget)
+        assert prompt.count("SQLite tip") == 3
@@ -0,0 +1,177 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from agent_feedback.cli import main
+from agent_feedback.models import FeedbackCategory, FeedbackEntry
+from agent_feedback.retention import (
+    RetentionConfig,
+    RetentionPolicy,
+    collect_garbage,
+    parse_duration,
+    select_evictions,
+)
+from agent_feedback.segmented_store import SegmentedStore
+from agent_feedback.store import open_store
+
+NOW = datetime(2025, 6, 1, tzinfo=UTC)
+
+
+def _make_entry(**kwargs: object) -> FeedbackEntry:
+    defaults: dict[str, object] = {
+        "agent_id": "agent-1",
+        "task_type": "build-todo-app",
+        "category": FeedbackCategory.TIP,
+        "title": "A tip",
+        "detail": "Some detail",
+        "timestamp": NOW,
+    }
+    defaults.update(kwargs)
+    return FeedbackEntry(**defaults)  # type: ignore[arg-type]
+
+
+def _days_ago(days: float) -> datetime:
+    return NOW - timedelta(days=days)
+
+
+class TestPolicy:
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [("90d", timedelta(days=90)), ("12h", timedelta(hours=12)), ("2w", timedelta(weeks=2)), (30, timedelta(seconds=30))],
+    )
+    def test_parse_duration(self, text, expected):
+        assert parse_duration(text) == expected
+
+    def test_parse_duration_rejects_garbage(self):
+        with pytest.raises(ValueError, match="Invalid duration"):
+            parse_duration("soon")
+
+    def test_score_halves_every_half_life(self):
+        policy = RetentionPolicy(half_life=timedelta(days=7))
+        assert policy.score(_make_entry(confidence=0.8, timestamp=_days_ago(14)), NOW) == pytest.approx(0.2)
+        assert RetentionPolicy().score(_make_entry(confidence=0.8, timestamp=_days_ago(14)), NOW) == 0.8
+
+    def test_task_types_inherit_default(self):
+        config = RetentionConfig.from_dict(
+            {"default": {"max_age": "30d", "max_entries": 10}, "task_types": {"deploy": {"max_entries": 2}}}
+        )
+        assert config.policy("deploy") == RetentionPolicy(max_age=timedelta(days=30), max_entries=2)
+        assert config.policy("other") == RetentionPolicy(max_age=timedelta(days=30), max_entries=10)
+
+    def test_unknown_setting_rejected(self):
+        with pytest.raises(ValueError, match="max_agee"):
+            RetentionConfig.from_dict({"default": {"max_agee": "1d"}})
+
+    def test_load_with_overrides(self, tmp_path: Path):
+        path = tmp_path / "retention.toml"
+        path.write_text('[default]\nmax_age = "90d"\n\n[task_types.deploy]\nmax_entries = 5\n')
+        config = RetentionConfig.load(path, {"max_age": "1d"})
+        assert config.default.max_age == timedelta(days=1)
+        assert config.policy("deploy").max_age == timedelta(days=1)
+        assert config.policy("deploy").max_entries == 5
+
+
+class TestSelectEvictions:
+    def test_max_age(self):
+        old, new = _make_entry(timestamp=_days_ago(40)), _make_entry(timestamp=_days_ago(10))
+        evicted, stats = select_evictions([old, new], RetentionConfig(RetentionPolicy(max_age=timedelta(days=30))), NOW)
+        assert evicted == [old.id]
+        assert stats.expired == 1 and stats.examined == 2
+
+    def test_decayed_below_min_score(self):
+        policy = RetentionPolicy(half_life=timedelta(days=7), min_score=0.3)
+        faded = _make_entry(confidence=1.0, timestamp=_days_ago(21))  # 0.125
+        fresh = _make_entry(confidence=0.5, timestamp=_days_ago(1))
+        evicted, stats = select_evictions([faded, fresh], RetentionConfig(policy), NOW)
+        assert evicted == [faded.id]
+        assert stats.decayed == 1
+
+    def test_max_entries_keeps_best_scores_per_task_type(self):
+        policy = RetentionPolicy(max_entries=2)
+        build = [_make_entry(confidence=c) for c in (0.5, 0.9, 0.1, 0.7)]
+        deploy = [_make_entry(task_type="deploy", confidence=0.1)]
+        evicted, stats = select_evictions([*build, *deploy], RetentionConfig(policy), NOW)
+        assert sorted(evicted) == sorted([build[0].id, build[2].id])
+        assert stats.over_budget == 2
+
+    def test_ties_evict_the_oldest(self):
+        older, newer = _make_entry(timestamp=_days_ago(2)), _make_entry(timestamp=_days_ago(1))
+        evicted, _ = select_evictions([newer, older], RetentionConfig(RetentionPolicy(max_entries=1)), NOW)
+        assert evicted == [older.id]
+
+    def test_zero_budget_evicts_everything(self):
+        entries = [_make_entry(), _make_entry()]
+        evicted, _ = select_evictions(entries, RetentionConfig(RetentionPolicy(max_entries=0)), NOW)
+        assert sorted(evicted) == sorted(e.id for e in entries)
+
+
+class TestCollectGarbage:
+    @pytest.fixture(params=["f.jsonl", "f.db", "seg", "f.shards"])
+    def any_store(self, request: pytest.FixtureRequest, tmp_path: Path):
+        return open_store(tmp_path / request.param)
+
+    def test_deletes_evicted_entries(self, any_store):
+        keep = _make_entry(title="Keep", timestamp=_days_ago(1))
+        drop = _make_entry(title="Drop", timestamp=_days_ago(100))
+        any_store.save_many([keep, drop])
+        config = RetentionConfig(RetentionPolicy(max_age=timedelta(days=30)))
+
+        stats = collect_garbage(any_store, config, now=NOW, dry_run=True)
+        assert stats.evicted == 1
+        assert any_store.count() == 2
+
+        collect_garbage(any_store, config, now=NOW)
+        assert [e.title for e in any_store.get_all()] == ["Keep"]
+
+    def test_compacts_jsonl_store(self, tmp_path: Path):
+        store = open_store(tmp_path / "f.jsonl")
+        store.save_many([_make_entry(title=f"Tip {i}", timestamp=_days_ago(100)) for i in range(9)])
+        store.save(_make_entry(title="Keep", timestamp=_days_ago(1)))
+        size = store.path.stat().st_size
+        collect_garbage(store, RetentionConfig(RetentionPolicy(max_age=timedelta(days=30))), now=NOW)
+        assert store.path.stat().st_size < size / 5
+        assert [e.title for e in open_store(tmp_path / "f.jsonl").get_all()] == ["Keep"]
+
+    def test_applied_during_compaction(self, tmp_path: Path):
+        store = SegmentedStore(tmp_path / "seg", segment_bytes=512)
+        entries = [_make_entry(title=f"Tip {i}", confidence=0.1 * (i + 1)) for i in range(6)]
+        store.save_many(entries)
+        store.delete(entries[5].id)
+        stats = store.compact(retention=RetentionConfig(RetentionPolicy(max_entries=3)))
+        assert stats.records_evicted == 2
+        assert sorted(e.title for e in store.get_all()) == ["Tip 2", "Tip 3", "Tip 4"]
+
+
+class TestCli:
+    @pytest.fixture
+    def runner(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> CliRunner:
+        monkeypatch.setenv("AGENT_FEEDBACK_STORE", str(tmp_path / "feedback.jsonl"))
+        monkeypatch.setenv("AGENT_FEEDBACK_SOCKET", str(tmp_path / "none.sock"))
+        return CliRunner()
+
+    def test_gc(self, runner: CliRunner, tmp_path: Path):
+        store = open_store(tmp_path / "feedback.jsonl")
+        store.save_many([_make_entry(timestamp=datetime.now(UTC) - timedelta(days=d)) for d in (1, 50, 100)])
+
+        result = runner.invoke(main, ["gc", "--max-age", "30d", "--dry-run"])
+        assert result.exit_code == 0, result.output
+        assert "would evict 2: 2 expired" in result.output
+        assert store.count() == 3
+
+        config = tmp_path / "retention.toml"
+        config.write_text('[default]\nmax_age = "30d"\n')
+        result = runner.invoke(main, ["gc", "--config", str(config)])
+        assert "evicted 2" in result.output
+        assert store.count() == 1
+
+    def test_gc_needs_a_policy(self, runner: CliRunner):
+        result = runner.invoke(main, ["gc"])
+        assert result.exit_code != 0
+        assert "No retention policy" in result.output
+
+    def test_gc_reports_bad_config(self, runner: CliRunner):
+        result = runner.invoke(main, ["gc", "--max-age", "forever"])
+        assert result.exit_code != 0
+        assert "Invalid retention policy" in result.output
@@ -0,0 +1,114 @@
+from pathlib import Path
+
+import pytest
+
+from agent_feedback.models import FeedbackCategory, FeedbackEntry
+from agent_feedback.search import TextIndex, read_text_index, tokenize
+from agent_feedback.segmented_store import SegmentedStore
+from agent_feedback.snapshot import SnapshotHeader
+from agent_feedback.store import JSONLStore, SQLiteStore
+
+
+def _make_entry(**kwargs: object) -> FeedbackEntry:
+    defaults: dict[str, object] = {
+        "agent_id": "agent-1",
+        "task_type": "build-todo-app",
+        "category": FeedbackCategory.TIP,
+        "title": "A tip",
+        "detail": "Some detail",
+    }
+    defaults.update(kwargs)
+    return FeedbackEntry(**defaults)  # type: ignore[arg-type]
+
+
+def _corpus() -> list[FeedbackEntry]:
+    return [
+        _make_entry(title="Use pytest fixtures", detail="Fixtures keep tests short."),
+        _make_entry(title="Pin dependencies", detail="Lock files avoid surprise upgrades."),
+        _make_entry(title="Run pytest with -x", detail="Stop at the first pytest failure to save time."),
+        _make_entry(title="Prefer pathlib", detail="Path objects beat string juggling."),
+    ]
+
+
+class TestTextIndex:
+    def test_tokenize(self):
+        assert tokenize("Run `pytest -x`, then PyTest!") == ["run", "pytest", "x", "then", "pytest"]
+
+    def test_ranks_by_term_frequency_and_rarity(self):
+        index = TextIndex()
+        index.extend(_corpus())
+        hits = index.search("pytest fixtures", limit=10)
+        assert [o for o, _ in hits] == [0, 2]
+        assert hits[0][1] > hits[1][1] > 0
+
+    def test_limit_and_no_match(self):
+        index = TextIndex()
+        index.extend(_corpus())
+        assert len(index.search("pytest", limit=1)) == 1
+        assert index.search("haskell", limit=10) == []
+        assert TextIndex().search("pytest", limit=10) == []
+
+    def test_persisted_index_loads_query_terms(self, tmp_path: Path):
+        index = TextIndex()
+        index.extend(_corpus())
+        index.write(tmp_path / "f.fts", SnapshotHeader(source_ino=1, source_end=10))
+        reader = read_text_index(tmp_path / "f.fts")
+        assert reader is not None
+        partial = reader.load("pytest")
+        assert set(partial.postings) == {"pytest"}
+        assert partial.search("pytest", 10) == index.search("pytest", 10)
+        assert reader.load().postings == index.postings
+
+
+@pytest.fixture(params=["jsonl", "sqlite", "segmented"])
+def any_store(request: pytest.FixtureRequest, tmp_path: Path) -> JSONLStore | SQLiteStore | SegmentedStore:
+    if request.param == "jsonl":
+        return JSONLStore(tmp_path / "f.jsonl")
+    if request.param == "sqlite":
+        return SQLiteStore(tmp_path / "f.db")
+    return SegmentedStore(tmp_path / "seg")
+
+
+class TestStoreSearch:
+    def test_best_match_first(self, any_store: JSONLStore | SQLiteStore | SegmentedStore):
+        any_store.save_many(_corpus())
+        titles = [e.title for e, _ in any_store.search("pytest failure")]
+        assert titles == ["Run pytest with -x", "Use pytest fixtures"]
+
+    def test_sees_new_saves(self, any_store: JSONLStore | SQLiteStore | SegmentedStore):
+        any_store.save_many(_corpus())
+        assert any_store.search("docker") == []
+        any_store.save(_make_entry(title="Cache docker layers"))
+        assert [e.title for e, _ in any_store.search("docker")] == ["Cache docker layers"]
+
+    def test_query_syntax_is_not_interpreted(self, any_store: JSONLStore | SQLiteStore | SegmentedStore):
+        any_store.save_many(_corpus())
+        assert [e.title for e, _ in any_store.search('"pathlib" AND (NOT*')] == ["Prefer pathlib"]
+
+    def test_clear(self, any_store: JSONLStore | SQLiteStore | SegmentedStore):
+        any_store.save_many(_corpus())
+        any_store.clear()
+        assert any_store.search("pytest") == []
+
+
+class TestPersistedSearch:
+    def test_cold_search_uses_persisted_index_and_tail(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        writer = JSONLStore(tmp_path / "f.jsonl")
+        writer.save_many(_corpus())
+        writer.write_snapshot()
+        writer.save(_make_entry(title="pytest markers", detail="Tag slow tests with pytest markers."))
+
+        reader = JSONLStore(tmp_path / "f.jsonl")
+        monkeypatch.setattr(reader, "_refresh", lambda: pytest.fail("cache should not be loaded"))
+        hits = reader.search("pytest", limit=2)
+        warm = JSONLStore(tmp_path / "f.jsonl").search("pytest", limit=2)
+        assert hits == warm
+        assert hits[0][0].title == "pytest markers"
+
+    def test_sqlite_indexes_existing_rows(self, tmp_path: Path):
+        store = SQLiteStore(tmp_path / "f.db")
+        store.save_many(_corpus())
+        store._conn.execute("DROP TABLE entries_fts")
+        store.close()
+        reopened = SQLiteStore(tmp_path / "f.db")
+        assert [e.title for e, _ in reopened.search("pathlib")] == ["Prefer pathlib"]
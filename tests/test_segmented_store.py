@@ -0,0 +1,164 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from agent_feedback.models import FeedbackCategory, FeedbackEntry
+from agent_feedback.segmented_store import MANIFEST_NAME, SegmentedStore
+from agent_feedback.store import open_store
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> SegmentedStore:
+    return SegmentedStore(tmp_path / "store", segment_bytes=1024)
+
+
+def _make_entry(**kwargs: object) -> FeedbackEntry:
+    defaults: dict[str, object] = {
+        "agent_id": "agent-1",
+        "task_type": "build-todo-app",
+        "category": FeedbackCategory.TIP,
+        "title": "A tip",
+        "detail": "Some detail",
+    }
+    defaults.update(kwargs)
+    return FeedbackEntry(**defaults)  # type: ignore[arg-type]
+
+
+def _manifest(store: SegmentedStore) -> dict:
+    return json.loads((store.root / MANIFEST_NAME).read_text())
+
+
+class TestSegmentedStore:
+    def test_save_and_query(self, store: SegmentedStore):
+        store.save(_make_entry(task_type="t1", tags=["x"]))
+        store.save(_make_entry(task_type="t2", agent_id="agent-2"))
+        assert store.count() == 2
+        assert len(store.query(task_type="t1")) == 1
+        assert len(store.query(tags=["x"])) == 1
+        assert len(store.query(exclude_agent="agent-1")) == 1
+
+    def test_segments_rotate(self, store: SegmentedStore):
+        for i in range(20):
+            store.save(_make_entry(title=f"Tip {i}"))
+        assert len(_manifest(store)["segments"]) > 1
+        assert [e.title for e in store.get_all()] == [f"Tip {i}" for i in range(20)]
+
+    def test_update_and_delete(self, store: SegmentedStore):
+        a, b = _make_entry(title="a"), _make_entry(title="b")
+        store.save_many([a, b])
+        store.update(a.model_copy(update={"confidence": 0.5}))
+        store.delete(b.id)
+        entries = store.get_all()
+        assert [(e.id, e.confidence) for e in entries] == [(a.id, 0.5)]
+
+    def test_compaction_drops_dead_records(self, store: SegmentedStore):
+        entries = [_make_entry(title=f"Tip {i}") for i in range(10)]
+        store.save_many(entries)
+        for e in entries[:5]:
+            store.delete(e.id)
+        store.update(entries[9].model_copy(update={"title": "Tip 9 (edited)"}))
+        before = [e.title for e in store.get_all()]
+        old_segments = [s["name"] for s in _manifest(store)["segments"]]
+
+        stats = store.compact()
+
+        assert stats.records_kept == 5
+        assert stats.records_dropped == 11
+        assert [e.title for e in store.get_all()] == before
+        assert len(_manifest(store)["segments"]) == 1
+        assert not any((store.root / name).exists() for name in old_segments)
+
+    def test_fresh_instance_reads_compacted_store(self, store: SegmentedStore):
+        store.save_many([_make_entry(title=f"Tip {i}") for i in range(10)])
+        store.compact()
+        store.save(_make_entry(title="after"))
+        other = SegmentedStore(store.root)
+        assert other.count() == 11
+        assert other.get_all()[-1].title == "after"
+
+    def test_changes_since_survives_compaction(self, store: SegmentedStore):
+        store.save_many([_make_entry(title=f"Tip {i}") for i in range(5)])
+        cursor = store.cursor()
+        store.compact()
+        assert store.changes_since(cursor) == ([], cursor)
+        store.save(_make_entry(title="new"))
+        entries, new_cursor = store.changes_since(cursor)
+        assert [e.title for e in entries] == ["new"]
+        assert new_cursor > cursor
+
+    def test_changes_since_gives_latest_live_versions(self, store: SegmentedStore):
+        kept, edited, gone = (_make_entry(title=t) for t in ("kept", "edited", "gone"))
+        store.save(gone)
+        cursor = store.cursor()
+        store.save_many([edited, kept])
+        store.update(edited.model_copy(update={"title": "edited again"}))
+        store.delete(gone.id)
+        entries, _ = store.changes_since(cursor)
+        assert [e.title for e in entries] == ["kept", "edited again"]
+
+    def test_lsns_not_reused_after_clear(self, tmp_path: Path):
+        # Large segments, so every record is still in the active one when it is dropped.
+        store = SegmentedStore(tmp_path / "store")
+        store.save_many([_make_entry(title=f"Tip {i}") for i in range(5)])
+        cursor = store.cursor()
+        store.clear()
+        store.save_many([_make_entry(title=f"New {i}") for i in range(3)])
+        entries, new_cursor = store.changes_since(cursor)
+        assert [e.title for e in entries] == ["New 0", "New 1", "New 2"]
+        assert new_cursor > cursor
+
+    def test_live_view_is_cached_until_a_write(self, store: SegmentedStore):
+        store.save_many([_make_entry(title=f"Tip {i}") for i in range(20)])
+        view = store._live()
+        assert store._live() is view
+        entries = store.iter_entries()
+        first = next(entries)
+        store.delete(first.id)
+        assert store._live() is not view and store.count() == 19
+        # An iterator started before the write carries on over its own view.
+        assert len(list(entries)) == 19
+
+    def test_search_index_extends_on_appends(self, tmp_path: Path):
+        store = SegmentedStore(tmp_path / "store")
+        entries = [_make_entry(title=f"Cache tip {i}") for i in range(3)]
+        store.save_many(entries[:2])
+        assert len(store.search("cache")) == 2
+        index = store._text
+        store.save(entries[2])
+        assert [e.title for e, _ in store.search("cache")] == ["Cache tip 0", "Cache tip 1", "Cache tip 2"]
+        assert store._text is index and len(index) == 3
+
+        store.update(entries[0].model_copy(update={"title": "Pin versions"}))
+        assert [e.title for e, _ in store.search("cache")] == ["Cache tip 1", "Cache tip 2"]
+        assert store._text is not index
+        store.delete(entries[1].id)
+        assert [e.title for e, _ in store.search("cache")] == ["Cache tip 2"]
+
+    def test_lsns_not_reused_after_everything_is_deleted(self, store: SegmentedStore):
+        entry = _make_entry()
+        store.save(entry)
+        store.delete(entry.id)
+        cursor = store.cursor()
+        store.compact()
+        store.save(_make_entry(title="later"))
+        entries, _ = store.changes_since(cursor)
+        assert [e.title for e in entries] == ["later"]
+
+    def test_background_compaction(self, tmp_path: Path):
+        store = SegmentedStore(tmp_path / "store", segment_bytes=512, auto_compact_segments=3)
+        for i in range(30):
+            store.save(_make_entry(title=f"Tip {i}"))
+        if store._compaction is not None:
+            store._compaction.join()
+        assert store.count() == 30
+
+    def test_clear(self, store: SegmentedStore):
+        store.save_many([_make_entry() for _ in range(10)])
+        store.clear()
+        assert store.get_all() == []
+        store.save(_make_entry())
+        assert store.count() == 1
+
+    def test_open_store_selects_directories(self, tmp_path: Path):
+        assert isinstance(open_store(tmp_path / "segments"), SegmentedStore)
@@ -0,0 +1,134 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from agent_feedback.models import FeedbackCategory, FeedbackEntry
+from agent_feedback.sharded_store import MANIFEST_NAME, ShardedStore, _shard_file
+from agent_feedback.store import JSONLStore, open_store
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> ShardedStore:
+    return ShardedStore(tmp_path / "feedback.shards")
+
+
+def _make_entry(**kwargs: object) -> FeedbackEntry:
+    defaults: dict[str, object] = {
+        "agent_id": "agent-1",
+        "task_type": "build-todo-app",
+        "category": FeedbackCategory.TIP,
+        "title": "A tip",
+        "detail": "Some detail",
+    }
+    defaults.update(kwargs)
+    return FeedbackEntry(**defaults)  # type: ignore[arg-type]
+
+
+def _manifest(store: ShardedStore) -> dict:
+    return json.loads((store.root / MANIFEST_NAME).read_text())
+
+
+class TestLayout:
+    def test_one_file_per_task_type(self, store: ShardedStore):
+        store.save_many([_make_entry(task_type="build"), _make_entry(task_type="deploy/prod"), _make_entry(task_type="build")])
+        shards = _manifest(store)["shards"]
+        assert [s["task_type"] for s in shards] == ["build", "deploy/prod"]
+        assert JSONLStore(store.root / shards[0]["file"]).count() == 2
+        assert "/" not in shards[1]["file"]
+
+    def test_similar_task_types_get_distinct_files(self):
+        assert _shard_file("a b") != _shard_file("a/b")
+
+    def test_task_type_query_opens_only_its_shard(self, store: ShardedStore):
+        store.save_many([_make_entry(task_type="build"), _make_entry(task_type="deploy")])
+        other = ShardedStore(store.root)
+        assert len(other.query(task_type="build")) == 1
+        assert [s._stat_key is not None for s in other._all_shards()] == [True, False]
+
+    def test_unknown_task_type_is_empty(self, store: ShardedStore):
+        store.save(_make_entry())
+        assert store.query(task_type="nope") == []
+        assert list(store.iter_entries(task_type="nope")) == []
+        assert not (store.root / _shard_file("nope")).exists()
+
+    def test_open_store(self, tmp_path: Path, store: ShardedStore):
+        assert isinstance(open_store(tmp_path / "other.shards"), ShardedStore)
+        store.save(_make_entry())
+        # An existing sharded directory is recognized by its manifest, whatever its name.
+        renamed = store.root.rename(tmp_path / "renamed")
+        assert isinstance(open_store(renamed), ShardedStore)
+
+
+class TestShardedStore:
+    def test_cross_shard_queries(self, store: ShardedStore):
+        store.save_many([
+            _make_entry(task_type="t1", tags=["x"]),
+            _make_entry(task_type="t2", agent_id="agent-2", tags=["x"]),
+            _make_entry(task_type="t3", title="Pin numpy", detail="Avoid ABI breaks"),
+        ])
+        assert store.count() == 3
+        assert len(store.query(tags=["x"])) == 2
+        assert [e.agent_id for e in store.iter_entries(exclude_agent="agent-1")] == ["agent-2"]
+        assert [e.task_type for e in store.get_all()] == ["t1", "t2", "t3"]
+        hits = store.search("numpy")
+        assert [e.title for e, _ in hits] == ["Pin numpy"]
+
+    def test_get_update_delete(self, store: ShardedStore):
+        a, b = _make_entry(task_type="t1"), _make_entry(task_type="t2")
+        store.save_many([a, b])
+        assert store.get(b.id).id == b.id
+        store.update(b.model_copy(update={"title": "Edited"}))
+        assert store.get(b.id).title == "Edited"
+        store.delete(a.id)
+        assert [e.id for e in store.get_all()] == [b.id]
+        store.delete_many([b.id, "missing"])
+        assert store.count() == 0
+
+    def test_update_moves_between_shards(self, store: ShardedStore):
+        entry = _make_entry(task_type="t1")
+        store.save(entry)
+        store.update(entry.model_copy(update={"task_type": "t2"}))
+        assert store.query(task_type="t1") == []
+        assert [e.id for e in store.query(task_type="t2")] == [entry.id]
+
+    def test_changes_since_spans_shards(self, store: ShardedStore):
+        store.save(_make_entry(task_type="t1", title="Old"))
+        cursor = store.cursor()
+        store.save_many([_make_entry(task_type="t1", title="New 1"), _make_entry(task_type="t2", title="New 2")])
+        entries, cursor = store.changes_since(cursor)
+        assert sorted(e.title for e in entries) == ["New 1", "New 2"]
+        assert store.changes_since(cursor) == ([], cursor)
+        assert cursor == store.cursor()
+
+    def test_clear(self, store: ShardedStore):
+        store.save_many([_make_entry(task_type=t) for t in ("t1", "t2", "t1", "t2")])
+        cursor = store.cursor()
+        store.clear()
+        assert store.count() == 0
+        store.save(_make_entry(task_type="t2", title="fresh"))
+        entries, _ = store.changes_since(cursor)
+        assert [e.title for e in entries] == ["fresh"]
+
+    def test_sees_shards_added_by_other_processes(self, store: ShardedStore):
+        store.save(_make_entry(task_type="t1"))
+        assert store.count() == 1
+        ShardedStore(store.root).save(_make_entry(task_type="t2"))
+        assert store.count() == 2
+
+    def test_watch(self, store: ShardedStore):
+        async def run() -> list[str]:
+            seen = []
+            feed = store.watch(store.cursor(), poll_interval=0.05)
+            asyncio.get_running_loop().call_later(0.05, store.save, _make_entry(task_type="late"))
+            async with asyncio.timeout(5):
+                async for entry in feed:
+                    seen.append(entry.task_type)
+                    break
+            await feed.aclose()
+            return seen
+
+        store.save(_make_entry())
+        assert asyncio.run(run()) == ["late"]
+        store.close()
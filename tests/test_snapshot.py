@@ -0,0 +1,120 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from agent_feedback.models import FeedbackCategory, FeedbackEntry
+from agent_feedback.snapshot import SnapshotHeader, SnapshotWriter, iter_row_groups, read_header
+from agent_feedback.store import JSONLStore
+
+
+def _make_entry(**kwargs: object) -> FeedbackEntry:
+    defaults: dict[str, object] = {
+        "agent_id": "agent-1",
+        "task_type": "build-todo-app",
+        "category": FeedbackCategory.TIP,
+        "title": "A tip",
+        "detail": "Some detail",
+    }
+    defaults.update(kwargs)
+    return FeedbackEntry(**defaults)  # type: ignore[arg-type]
+
+
+def _sample() -> list[FeedbackEntry]:
+    return [
+        _make_entry(
+            agent_id=f"agent-{i % 3}",
+            task_type=f"t{i % 2}",
+            category=list(FeedbackCategory)[i % 5],
+            title=f"Tip {i} ✓",
+            detail=f"Line one\nline two {i}",
+            tags=[f"tag{i % 4}", "shared"] if i % 2 else [],
+            confidence=i / 10,
+            harness="claude-code",
+            parent_tips_used=[f"p{i}"],
+        )
+        for i in range(10)
+    ]
+
+
+class TestSnapshotFormat:
+    def test_roundtrip(self, tmp_path: Path):
+        entries = _sample()
+        path = tmp_path / "fb.snap"
+        with SnapshotWriter(path, SnapshotHeader(source_ino=7, source_end=99)) as writer:
+            writer.write_row_group(entries[:4], list(range(4)))
+            writer.write_row_group(entries[4:], list(range(4, 10)))
+        assert read_header(path) == SnapshotHeader(source_ino=7, source_end=99)
+        groups = list(iter_row_groups(path))
+        assert [g.rows for g in groups] == [4, 6]
+        loaded = [e for g in groups for e in g.entries()]
+        assert [e.model_dump() for e in loaded] == [e.model_dump() for e in entries]
+
+    def test_select_on_columns(self, tmp_path: Path):
+        entries = _sample()
+        path = tmp_path / "fb.snap"
+        with SnapshotWriter(path, SnapshotHeader()) as writer:
+            writer.write_row_group(entries)
+        (group,) = iter_row_groups(path)
+        assert group.select(task_type="t1") == [1, 3, 5, 7, 9]
+        assert group.select(tags=["tag1"]) == [1, 5, 9]
+        assert group.select(exclude_agent="agent-0") == [1, 2, 4, 5, 7, 8]
+        assert group.select(task_type="missing") == []
+
+    def test_failed_write_leaves_no_file(self, tmp_path: Path):
+        path = tmp_path / "fb.snap"
+        with pytest.raises(RuntimeError):
+            with SnapshotWriter(path, SnapshotHeader()):
+                raise RuntimeError("boom")
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestStoreSnapshots:
+    def test_cold_start_loads_snapshot_then_tail(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        import agent_feedback.store as store_mod
+
+        path = tmp_path / "fb.jsonl"
+        writer = JSONLStore(path, snapshot_every=5)
+        writer.save_many(_sample())
+        assert writer.count() == 10
+        assert writer.snapshot_path.exists()
+        writer.save(_make_entry(title="tail"))
+
+        parsed: list[bytes] = []
+        original = store_mod._parse_lines
+        monkeypatch.setattr(store_mod, "_parse_lines", lambda lines: parsed.extend(lines) or original(lines))
+        cold = JSONLStore(path, snapshot_every=5)
+        titles = [e.title for e in cold.get_all()]
+        assert titles == [e.title for e in _sample()] + ["tail"]
+        assert len(parsed) == 1
+
+    def test_iter_entries_uses_snapshot(self, tmp_path: Path):
+        path = tmp_path / "fb.jsonl"
+        store = JSONLStore(path, snapshot_every=1)
+        store.save_many(_sample())
+        store.write_snapshot()
+        store.save(_make_entry(task_type="t1", title="tail"))
+        plain = JSONLStore(path, snapshot_every=None)
+        for kwargs in ({}, {"task_type": "t1"}, {"tags": ["shared"]}, {"exclude_agent": "agent-1"}):
+            assert [e.id for e in store.iter_entries(**kwargs)] == [e.id for e in plain.iter_entries(**kwargs)]
+        since = datetime.now(UTC) - timedelta(hours=1)
+        assert len(list(store.iter_entries(since=since))) == 11
+
+    def test_snapshot_ignored_after_rewrite(self, tmp_path: Path):
+        path = tmp_path / "fb.jsonl"
+        store = JSONLStore(path, snapshot_every=1)
+        store.save_many(_sample())
+        store.write_snapshot()
+        snapshot_bytes = store.snapshot_path.read_bytes()
+        store.clear()
+        store.snapshot_path.write_bytes(snapshot_bytes)
+        store.save_many([_make_entry(title="x" * 500) for _ in range(3)])
+        cold = JSONLStore(path, snapshot_every=1)
+        assert [e.title for e in cold.get_all()] == ["x" * 500] * 3
+
+    def test_clear_removes_snapshot(self, tmp_path: Path):
+        store = JSONLStore(tmp_path / "fb.jsonl", snapshot_every=1)
+        store.save_many(_sample())
+        store.write_snapshot()
+        store.clear()
+        assert not store.snapshot_path.exists()
@@ -4,7 +4,7 @@ from pathlib import Path
 import pytest
 
 from agent_feedback.models import FeedbackCategory, FeedbackEntry
-from agent_feedback.store import JSONLStore
+from agent_feedback.store import JSONLStore, SQLiteStore, open_store
 
 
 @pytest.fixture
@@ -12,6 +12,11 @@ def store(tmp_path: Path) -> JSONLStore:
     return JSONLStore(tmp_path / "feedback.jsonl")
 
 
+@pytest.fixture
+def sqlite_store(tmp_path: Path) -> SQLiteStore:
+    return SQLiteStore(tmp_path / "feedback.db")
+
+
 def _make_entry(**kwargs: object) -> FeedbackEntry:
     defaults: dict[str, object] = {
         "agent_id": "agent-1",
@@ -88,3 +93,355 @@ class TestJSONLStore:
         store = JSONLStore(tmp_path / "a" / "b" / "c" / "fb.jsonl")
         store.save(_make_entry())
         assert len(store.get_all()) == 1
+
+    def test_picks_up_appends_from_other_writers(self, store: JSONLStore):
+        store.save(_make_entry(title="first"))
+        assert len(store.get_all()) == 1
+        other = JSONLStore(store.path)
+        other.save(_make_entry(title="second"))
+        assert [e.title for e in store.get_all()] == ["first", "second"]
+
+    def test_only_new_tail_is_parsed(self, store: JSONLStore, monkeypatch: pytest.MonkeyPatch):
+        import agent_feedback.store as store_mod
+
+        parsed: list[bytes] = []
+        original = store_mod._parse_lines
+
+        def counting_parse(lines: list[bytes]) -> list:
+            parsed.extend(lines)
+            return original(lines)
+
+        monkeypatch.setattr(store_mod, "_parse_lines", counting_parse)
+        for i in range(3):
+            store.save(_make_entry(title=f"Tip {i}"))
+        store.get_all()
+        store.get_all()
+        assert len(parsed) == 3
+        store.save(_make_entry(title="Tip 3"))
+        assert len(store.get_all()) == 4
+        assert len(parsed) == 4
+
+    def test_partial_line_is_deferred(self, store: JSONLStore):
+        store.save(_make_entry(title="complete"))
+        line = _make_entry(title="partial").model_dump_json()
+        with store.path.open("a") as f:
+            f.write(line[:10])
+        assert [e.title for e in store.get_all()] == ["complete"]
+        with store.path.open("a") as f:
+            f.write(line[10:] + "\n")
+        assert [e.title for e in store.get_all()] == ["complete", "partial"]
+
+    def test_detects_rewrite_by_other_process(self, store: JSONLStore):
+        store.save(_make_entry(title="old"))
+        assert len(store.get_all()) == 1
+        other = JSONLStore(store.path)
+        other.clear()
+        other.save(_make_entry(title="new and longer title"))
+        other.save(_make_entry(title="another"))
+        assert [e.title for e in store.get_all()] == ["new and longer title", "another"]
+
+
+class TestSQLiteStore:
+    def test_empty_store_returns_empty(self, sqlite_store: SQLiteStore):
+        assert sqlite_store.get_all() == []
+
+    def test_save_and_retrieve_roundtrip(self, sqlite_store: SQLiteStore):
+        entry = _make_entry(tags=["python", "click"], confidence=0.7, parent_tips_used=["abc"])
+        sqlite_store.save(entry)
+        results = sqlite_store.get_all()
+        assert len(results) == 1
+        assert results[0].to_entry() == entry
+
+    def test_query_filters(self, sqlite_store: SQLiteStore):
+        sqlite_store.save(_make_entry(agent_id="a1", task_type="t1", tags=["x", "y"]))
+        sqlite_store.save(_make_entry(agent_id="a2", task_type="t1", tags=["x"]))
+        sqlite_store.save(_make_entry(agent_id="a1", task_type="t2", tags=["y"]))
+        assert len(sqlite_store.query(task_type="t1")) == 2
+        assert len(sqlite_store.query(tags=["y"])) == 2
+        assert len(sqlite_store.query(tags=["x", "y"])) == 3
+        assert len(sqlite_store.query(tags=["z"])) == 0
+        result = sqlite_store.query(task_type="t1", exclude_agent="a1")
+        assert [e.agent_id for e in result] == ["a2"]
+
+    def test_preserves_insertion_order(self, sqlite_store: SQLiteStore):
+        for i in range(5):
+            sqlite_store.save(_make_entry(title=f"Tip {i}"))
+        assert [e.title for e in sqlite_store.get_all()] == [f"Tip {i}" for i in range(5)]
+
+    def test_clear(self, sqlite_store: SQLiteStore):
+        sqlite_store.save(_make_entry(tags=["x"]))
+        sqlite_store.clear()
+        assert sqlite_store.get_all() == []
+        assert sqlite_store.query(tags=["x"]) == []
+
+    def test_visible_to_other_connections(self, sqlite_store: SQLiteStore):
+        other = SQLiteStore(sqlite_store.path)
+        other.save(_make_entry())
+        assert len(sqlite_store.get_all()) == 1
+
+
+class TestOpenStore:
+    def test_selects_by_extension(self, tmp_path: Path):
+        assert isinstance(open_store(tmp_path / "fb.jsonl"), JSONLStore)
+        assert isinstance(open_store(tmp_path / "fb.db"), SQLiteStore)
+        assert isinstance(open_store(tmp_path / "fb.sqlite"), SQLiteStore)
+
+
+class TestJSONLStoreWrites:
+    def test_save_many_writes_batch(self, store: JSONLStore):
+        store.save_many([_make_entry(title=f"Tip {i}") for i in range(4)])
+        assert [e.title for e in store.get_all()] == [f"Tip {i}" for i in range(4)]
+
+    def test_save_many_empty_is_noop(self, store: JSONLStore):
+        store.save_many([])
+        assert not store.path.exists()
+
+    @pytest.mark.parametrize("durability", ["none", "flush", "fsync"])
+    def test_durability_modes(self, tmp_path: Path, durability: str):
+        store = JSONLStore(tmp_path / "fb.jsonl", durability=durability)
+        store.save(_make_entry())
+        store.save_many([_make_entry(), _make_entry()])
+        assert len(store.get_all()) == 3
+
+    def test_invalid_durability(self, tmp_path: Path):
+        with pytest.raises(ValueError):
+            JSONLStore(tmp_path / "fb.jsonl", durability="sometimes")
+
+    def test_concurrent_writers_do_not_tear_lines(self, store: JSONLStore):
+        import threading
+
+        big_detail = "x" * 200_000
+
+        def writer(n: int) -> None:
+            local = JSONLStore(store.path)
+            for i in range(5):
+                local.save(_make_entry(agent_id=f"agent-{n}", detail=big_detail))
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        entries = store.get_all()
+        assert len(entries) == 20
+        assert all(e.detail == big_detail for e in entries)
+
+
+class TestIterEntries:
+    def test_streams_all_entries(self, store: JSONLStore):
+        for i in range(3):
+            store.save(_make_entry(title=f"Tip {i}"))
+        assert [e.title for e in store.iter_entries()] == ["Tip 0", "Tip 1", "Tip 2"]
+
+    def test_missing_file(self, tmp_path: Path):
+        store = JSONLStore(tmp_path / "nope.jsonl")
+        assert list(store.iter_entries()) == []
+
+    def test_filters_match_query(self, store: JSONLStore):
+        store.save(_make_entry(agent_id="a1", task_type="t1", tags=["x"]))
+        store.save(_make_entry(agent_id="a2", task_type="t1", tags=["y"]))
+        store.save(_make_entry(agent_id="a1", task_type="t2", tags=["x", "y"]))
+        for kwargs in (
+            {"task_type": "t1"},
+            {"tags": ["x"]},
+            {"exclude_agent": "a1"},
+            {"task_type": "t1", "tags": ["y"], "exclude_agent": "a1"},
+        ):
+            assert [e.id for e in store.iter_entries(**kwargs)] == [e.id for e in store.query(**kwargs)]
+
+    def test_value_in_other_field_does_not_match(self, store: JSONLStore):
+        store.save(_make_entry(task_type="t1", title="t2", detail='"agent_id":"agent-1"'))
+        assert list(store.iter_entries(task_type="t2")) == []
+        assert len(list(store.iter_entries(exclude_agent="agent-9"))) == 1
+
+    def test_since(self, store: JSONLStore):
+        from datetime import UTC, datetime, timedelta
+
+        now = datetime.now(UTC)
+        store.save(_make_entry(title="old", timestamp=now - timedelta(days=2)))
+        store.save(_make_entry(title="new", timestamp=now))
+        recent = store.iter_entries(since=now - timedelta(days=1))
+        assert [e.title for e in recent] == ["new"]
+        naive = (now - timedelta(days=1)).replace(tzinfo=None)
+        assert [e.title for e in store.iter_entries(since=naive)] == ["new"]
+
+    def test_sqlite_iter_entries(self, sqlite_store: SQLiteStore):
+        from datetime import UTC, datetime, timedelta
+
+        now = datetime.now(UTC)
+        sqlite_store.save(_make_entry(title="old", timestamp=now - timedelta(days=2), tags=["x"]))
+        sqlite_store.save(_make_entry(title="new", timestamp=now, tags=["x"]))
+        recent = sqlite_store.iter_entries(tags=["x"], since=now - timedelta(days=1))
+        assert [e.title for e in recent] == ["new"]
+
+
+class TestCursors:
+    def test_count(self, store: JSONLStore):
+        assert store.count() == 0
+        store.save_many([_make_entry(), _make_entry()])
+        assert store.count() == 2
+
+    def test_changes_since(self, store: JSONLStore):
+        assert store.cursor() == 0
+        store.save(_make_entry(title="before"))
+        cursor = store.cursor()
+        assert store.changes_since(cursor) == ([], cursor)
+        store.save(_make_entry(title="after 1"))
+        store.save(_make_entry(title="after 2"))
+        entries, cursor = store.changes_since(cursor)
+        assert [e.title for e in entries] == ["after 1", "after 2"]
+        assert store.changes_since(cursor) == ([], cursor)
+
+    def test_cursor_ignores_partial_line(self, store: JSONLStore):
+        store.save(_make_entry())
+        cursor = store.cursor()
+        with store.path.open("a") as f:
+            f.write('{"id": "half')
+        assert store.cursor() == cursor
+        assert store.changes_since(cursor) == ([], cursor)
+
+    def test_cursor_after_clear(self, store: JSONLStore):
+        store.save_many([_make_entry(), _make_entry()])
+        cursor = store.cursor()
+        store.clear()
+        store.save(_make_entry(title="fresh"))
+        entries, _ = store.changes_since(cursor)
+        assert [e.title for e in entries] == ["fresh"]
+
+    def test_cursor_after_clear_and_refill(self, store: JSONLStore):
+        store.save(_make_entry(title="old " * 10))
+        cursor = store.cursor()
+        store.clear()
+        store.save_many([_make_entry(title=f"fresh {i}") for i in range(6)])
+        entries, new_cursor = store.changes_since(cursor)
+        assert [e.title for e in entries] == [f"fresh {i}" for i in range(6)]
+        assert new_cursor == store.cursor()
+
+    def test_sqlite_cursor(self, sqlite_store: SQLiteStore):
+        sqlite_store.save(_make_entry(title="before"))
+        cursor = sqlite_store.cursor()
+        sqlite_store.save(_make_entry(title="after"))
+        entries, new_cursor = sqlite_store.changes_since(cursor)
+        assert [e.title for e in entries] == ["after"]
+        assert new_cursor > cursor
+        assert sqlite_store.count() == 2
+
+
+class TestUpdateAndDelete:
+    @pytest.fixture(params=["jsonl", "sqlite", "segmented"])
+    def any_store(self, request: pytest.FixtureRequest, tmp_path: Path):
+        return open_store(tmp_path / {"jsonl": "f.jsonl", "sqlite": "f.db", "segmented": "seg"}[request.param])
+
+    def test_get(self, any_store):
+        entry = _make_entry()
+        any_store.save(entry)
+        assert any_store.get(entry.id).title == entry.title
+        assert any_store.get("missing") is None
+
+    def test_update_replaces_entry(self, any_store):
+        first, second = _make_entry(title="First"), _make_entry(title="Second")
+        any_store.save_many([first, second])
+        cursor = any_store.cursor()
+        any_store.update(first.model_copy(update={"confidence": 0.3, "supporters": ["agent-2"]}))
+        updated = any_store.get(first.id)
+        assert updated.confidence == 0.3
+        assert updated.supporters == ["agent-2"]
+        assert sorted(e.title for e in any_store.get_all()) == ["First", "Second"]
+        assert any_store.count() == 2
+        changes, _ = any_store.changes_since(cursor)
+        assert [e.id for e in changes] == [first.id]
+
+    def test_delete_many(self, any_store):
+        entries = [_make_entry(title=f"Tip {i}") for i in range(5)]
+        any_store.save_many(entries)
+        any_store.update(entries[1].model_copy(update={"confidence": 0.5}))
+        any_store.delete_many([entries[1].id, entries[3].id, "missing"])
+        assert sorted(e.title for e in any_store.get_all()) == ["Tip 0", "Tip 2", "Tip 4"]
+        assert any_store.get(entries[1].id) is None
+        assert any_store.count() == 3
+
+    def test_delete(self, any_store):
+        first, second = _make_entry(title="First"), _make_entry(title="Second")
+        any_store.save_many([first, second])
+        any_store.delete(first.id)
+        any_store.delete("missing")
+        assert any_store.get(first.id) is None
+        assert [e.title for e in any_store.get_all()] == ["Second"]
+        assert [e.title for e in any_store.iter_entries()] == ["Second"]
+
+
+class TestJSONLRetiredRows:
+    def test_update_keeps_other_offsets(self, store: JSONLStore):
+        first, second = _make_entry(title="First"), _make_entry(title="Second")
+        store.save_many([first, second])
+        size = store.path.stat().st_size
+        store.update(first.model_copy(update={"confidence": 0.5}))
+        data = store.path.read_bytes()
+        assert data[size:].startswith(b'{"id":"' + first.id.encode())
+        assert not data.split(b"\n")[0].strip()
+
+    def test_repeated_id_in_one_append(self, store: JSONLStore):
+        entry = _make_entry(title="Old")
+        store.save_many([entry, entry.model_copy(update={"title": "New"})])
+        assert [e.title for e in store.get_all()] == ["New"]
+        assert store.count() == 1
+
+    def test_warm_cache_sees_other_writers_changes(self, tmp_path: Path):
+        path = tmp_path / "f.jsonl"
+        reader, writer = JSONLStore(path), JSONLStore(path)
+        entries = [_make_entry(title=f"Tip {i}") for i in range(3)]
+        writer.save_many(entries)
+        assert reader.count() == 3
+        writer.delete(entries[1].id)
+        assert [e.title for e in reader.get_all()] == ["Tip 0", "Tip 2"]
+        writer.update(entries[2].model_copy(update={"title": "Tip 2b"}))
+        assert [e.title for e in reader.query()] == ["Tip 0", "Tip 2b"]
+        assert [e.title for e, _ in reader.search("tip")] == ["Tip 0", "Tip 2b"]
+
+    @pytest.mark.parametrize("filters", [{}, {"task_type": "build-todo-app"}])
+    def test_sidecars_skip_retired_rows(self, tmp_path: Path, filters: dict):
+        path = tmp_path / "f.jsonl"
+        store = JSONLStore(path)
+        entries = [_make_entry(title=f"Tip {i}") for i in range(3)]
+        store.save_many(entries)
+        store.write_snapshot()
+        store.delete(entries[0].id)
+        store.update(entries[2].model_copy(update={"title": "Tip 2b"}))
+
+        cold = JSONLStore(path)
+        assert [e.title for e in cold.iter_entries(**filters)] == ["Tip 1", "Tip 2b"]
+        assert [e.title for e, _ in JSONLStore(path).search("tip")] == ["Tip 1", "Tip 2b"]
+        assert [e.title for e in cold.get_all()] == ["Tip 1", "Tip 2b"]
+
+    def test_snapshot_compacts_retired_rows(self, store: JSONLStore):
+        entries = [_make_entry(title=f"Tip {i}") for i in range(3)]
+        store.save_many(entries)
+        store.delete(entries[1].id)
+        store.write_snapshot()
+        fresh = JSONLStore(store.path)
+        assert [e.title for e in fresh.query(task_type="build-todo-app")] == ["Tip 0", "Tip 2"]
+
+    def test_clear_removes_retired_offsets(self, store: JSONLStore):
+        entry = _make_entry()
+        store.save(entry)
+        store.delete(entry.id)
+        store.clear()
+        assert not store.retired_path.exists()
+
+    def test_compact_reclaims_blanked_lines(self, tmp_path: Path):
+        path = tmp_path / "f.jsonl"
+        store, reader = JSONLStore(path), JSONLStore(path)
+        entries = [_make_entry(title=f"Tip {i}") for i in range(4)]
+        store.save_many(entries)
+        store.write_snapshot()
+        assert reader.count() == 4
+        store.delete_many([entries[0].id, entries[2].id])
+        size = path.stat().st_size
+
+        assert store.compact() > 0
+        assert path.stat().st_size < size
+        assert b"  " not in path.read_bytes()
+        assert not store.retired_path.exists() and not store.snapshot_path.exists()
+        assert [e.title for e in reader.get_all()] == ["Tip 1", "Tip 3"]
+        store.save(_make_entry(title="Tip 4"))
+        assert [e.title for e, _ in reader.search("tip")] == ["Tip 1", "Tip 3", "Tip 4"]
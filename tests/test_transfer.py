@@ -0,0 +1,141 @@
+import io
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from agent_feedback.cli import main
+from agent_feedback.models import FeedbackCategory, FeedbackEntry
+from agent_feedback.store import JSONLStore, open_store
+from agent_feedback.transfer import FORMATS, TransferError, export_entries, import_entries
+
+
+def _make_entry(**kwargs: object) -> FeedbackEntry:
+    defaults: dict[str, object] = {
+        "agent_id": "agent-1",
+        "task_type": "build-todo-app",
+        "category": FeedbackCategory.TIP,
+        "title": "A tip",
+        "detail": "Some detail",
+        "timestamp": datetime(2025, 6, 1, 12, 30, tzinfo=UTC),
+    }
+    defaults.update(kwargs)
+    return FeedbackEntry(**defaults)  # type: ignore[arg-type]
+
+
+ENTRIES = [
+    _make_entry(tags=["python", "a,b"], confidence=0.5),
+    _make_entry(
+        agent_id="agent-2",
+        category=FeedbackCategory.GOTCHA,
+        title='Quotes " and, commas',
+        detail="Line one\nline two — ünïcode",
+        harness="claude",
+        parent_tips_used=["abc"],
+        supporters=["agent-3"],
+    ),
+]
+
+
+class TestRoundTrip:
+    @pytest.mark.parametrize("fmt", FORMATS)
+    def test_round_trip(self, fmt: str, tmp_path: Path):
+        buf = io.BytesIO()
+        assert export_entries(ENTRIES, buf, fmt, batch_size=1) == 2
+        buf.seek(0)
+        store = JSONLStore(tmp_path / "in.jsonl")
+        stats = import_entries(store, buf, fmt, batch_size=1)
+        assert stats.imported == 2
+        assert [e.model_dump() for e in store.get_all()] == [e.model_dump() for e in ENTRIES]
+
+    @pytest.mark.parametrize("name", ["in.jsonl", "in.db"])
+    def test_reimport_adds_nothing(self, name: str, tmp_path: Path):
+        buf = io.BytesIO()
+        export_entries([*ENTRIES, ENTRIES[0]], buf)
+        store = open_store(tmp_path / name)
+        buf.seek(0)
+        stats = import_entries(store, buf)
+        assert (stats.imported, stats.duplicates) == (2, 1)
+        buf.seek(0)
+        stats = import_entries(store, buf, batch_size=2)
+        assert (stats.imported, stats.duplicates) == (0, 3)
+        assert store.count() == 2
+        assert sorted(e.id for e in store.iter_entries()) == sorted(e.id for e in ENTRIES)
+
+    def test_columnar_export_is_a_snapshot(self):
+        buf = io.BytesIO()
+        export_entries(ENTRIES, buf, "columnar")
+        assert buf.getvalue().startswith(b"AFSNAP")
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError, match="Unknown format"):
+            export_entries(ENTRIES, io.BytesIO(), "xml")
+
+
+class TestValidation:
+    def _source(self) -> io.BytesIO:
+        first, last = (e.model_dump_json() for e in ENTRIES)
+        return io.BytesIO(f'{first}\nnot json\n{{"title": "missing fields"}}\n{last}\n'.encode())
+
+    def test_invalid_record_is_named(self, tmp_path: Path):
+        store = JSONLStore(tmp_path / "in.jsonl")
+        with pytest.raises(TransferError, match="record 2") as info:
+            import_entries(store, self._source(), batch_size=10)
+        assert "record 3: agent_id" in str(info.value)
+        assert store.count() == 0
+
+    def test_skip_invalid(self, tmp_path: Path):
+        store = JSONLStore(tmp_path / "in.jsonl")
+        stats = import_entries(store, self._source(), batch_size=3, skip_invalid=True)
+        assert (stats.imported, stats.skipped) == (2, 2)
+        assert store.count() == 2
+
+    def test_csv_checks_values(self, tmp_path: Path):
+        buf = io.BytesIO()
+        export_entries([ENTRIES[0]], buf, "csv")
+        bad = io.BytesIO(buf.getvalue().replace(b",0.5,", b",5,"))
+        with pytest.raises(TransferError, match="record 1: confidence"):
+            import_entries(JSONLStore(tmp_path / "in.jsonl"), bad, "csv")
+
+
+class TestCli:
+    @pytest.fixture
+    def runner(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> CliRunner:
+        monkeypatch.setenv("AGENT_FEEDBACK_STORE", str(tmp_path / "feedback.jsonl"))
+        monkeypatch.setenv("AGENT_FEEDBACK_SOCKET", str(tmp_path / "none.sock"))
+        return CliRunner()
+
+    def test_export_import_between_stores(self, runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        open_store(tmp_path / "feedback.jsonl").save_many([*ENTRIES, _make_entry(task_type="other")])
+        result = runner.invoke(main, ["export", "-o", str(tmp_path / "out.csv"), "--task-type", "build-todo-app"])
+        assert result.exit_code == 0, result.output
+        assert "Exported 2 entries" in result.output
+
+        monkeypatch.setenv("AGENT_FEEDBACK_STORE", str(tmp_path / "copy.db"))
+        result = runner.invoke(main, ["import", str(tmp_path / "out.csv")])
+        assert result.exit_code == 0, result.output
+        assert "Imported 2 entries." in result.output
+        assert sorted(e.id for e in open_store(tmp_path / "copy.db").get_all()) == sorted(e.id for e in ENTRIES)
+
+    def test_import_twice(self, runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        source = tmp_path / "tips.ndjson"
+        source.write_text("".join(e.model_dump_json() + "\n" for e in ENTRIES))
+        monkeypatch.setenv("AGENT_FEEDBACK_STORE", str(tmp_path / "copy.db"))
+        assert "Imported 2 entries." in runner.invoke(main, ["import", str(source)]).output
+        result = runner.invoke(main, ["import", str(source)])
+        assert result.exit_code == 0, result.output
+        assert "Imported 0 entries, 2 already in the store." in result.output
+
+    def test_export_to_stdout(self, runner: CliRunner, tmp_path: Path):
+        open_store(tmp_path / "feedback.jsonl").save_many(ENTRIES)
+        result = runner.invoke(main, ["export"])
+        assert result.stdout.splitlines() == [e.model_dump_json() for e in ENTRIES]
+        assert "Exported 2 entries" in result.stderr
+
+    def test_import_reports_invalid_records(self, runner: CliRunner, tmp_path: Path):
+        source = tmp_path / "bad.ndjson"
+        source.write_text('{"title": "x"}\n')
+        result = runner.invoke(main, ["import", str(source)])
+        assert result.exit_code != 0
+        assert "record 1" in result.stderr
@@ -0,0 +1,113 @@
+import asyncio
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from rich.console import Console
+
+from agent_feedback.models import FeedbackCategory, FeedbackEntry, FeedbackRecord
+from agent_feedback.store import FeedbackStore, open_store
+from agent_feedback.stream import StreamDisplay
+from agent_feedback.watch import watch_store
+
+
+@pytest.fixture(params=["feedback.jsonl", "feedback.db", "segments", "feedback.shards"])
+def store(request: pytest.FixtureRequest, tmp_path: Path) -> FeedbackStore:
+    return open_store(tmp_path / request.param)
+
+
+def _make_entry(**kwargs: object) -> FeedbackEntry:
+    defaults: dict[str, object] = {
+        "agent_id": "agent-1",
+        "task_type": "build-todo-app",
+        "category": FeedbackCategory.TIP,
+        "title": "A tip",
+        "detail": "Some detail",
+    }
+    defaults.update(kwargs)
+    return FeedbackEntry(**defaults)  # type: ignore[arg-type]
+
+
+async def _take(feed: AsyncIterator[FeedbackRecord], n: int) -> list[FeedbackRecord]:
+    taken: list[FeedbackRecord] = []
+    try:
+        async with asyncio.timeout(5):
+            async for entry in feed:
+                taken.append(entry)
+                if len(taken) == n:
+                    break
+    finally:
+        await feed.aclose()  # type: ignore[attr-defined]
+    return taken
+
+
+def _save_later(store: FeedbackStore, *entries: FeedbackEntry) -> None:
+    loop = asyncio.get_running_loop()
+    for i, entry in enumerate(entries, 1):
+        loop.call_later(0.05 * i, store.save, entry)
+
+
+class TestWatch:
+    def test_yields_entries_written_after_start(self, store: FeedbackStore):
+        store.save(_make_entry(title="Old"))
+
+        async def run() -> list[FeedbackRecord]:
+            _save_later(store, _make_entry(title="New 1"), _make_entry(title="New 2"))
+            return await _take(store.watch(poll_interval=0.01), 2)
+
+        assert [e.title for e in asyncio.run(run())] == ["New 1", "New 2"]
+
+    def test_resumes_from_cursor(self, store: FeedbackStore):
+        store.save(_make_entry(title="Before"))
+        cursor = store.cursor()
+        store.save(_make_entry(title="After"))
+
+        async def run() -> list[FeedbackRecord]:
+            return await _take(store.watch(cursor, poll_interval=0.01), 1)
+
+        assert [e.title for e in asyncio.run(run())] == ["After"]
+
+    def test_updated_entry_is_yielded_again(self, store: FeedbackStore):
+        entry = _make_entry(confidence=0.5)
+        store.save(entry)
+
+        async def run() -> list[FeedbackRecord]:
+            updated = entry.model_copy(update={"confidence": 0.9})
+            asyncio.get_running_loop().call_later(0.05, store.update, updated)
+            return await _take(store.watch(poll_interval=0.01), 1)
+
+        [seen] = asyncio.run(run())
+        assert seen.id == entry.id
+        assert seen.confidence == 0.9
+
+    def test_polling_fallback(self, tmp_path: Path):
+        store = open_store(tmp_path / "feedback.jsonl")
+
+        async def run() -> list[FeedbackRecord]:
+            _save_later(store, _make_entry(title="Polled"))
+            return await _take(watch_store(store, tmp_path, poll_interval=0.01, use_inotify=False), 1)
+
+        assert [e.title for e in asyncio.run(run())] == ["Polled"]
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+    def test_inotify_wakes_without_polling(self, store: FeedbackStore):
+        async def run() -> list[FeedbackRecord]:
+            _save_later(store, _make_entry(title="Notified"))
+            # Far longer than the test's timeout: only a notification can deliver it.
+            return await _take(store.watch(poll_interval=60), 1)
+
+        assert [e.title for e in asyncio.run(run())] == ["Notified"]
+
+
+class TestStreamDisplay:
+    def test_on_feedback_counts_confirmed_submissions(self):
+        display = StreamDisplay(console=Console(record=True, width=120))
+        display.show_agent_header(1, 0)
+
+        asyncio.run(display.on_stream("feedback", "agent-feedback submit --title x\n"))
+        assert display.feedback_submitted == 0
+
+        display.on_feedback(_make_entry(title="Use a venv"))
+        assert display.feedback_submitted == 1
+        assert "FEEDBACK SAVED: [tip] Use a venv" in display.console.export_text()
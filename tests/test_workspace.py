@@ -0,0 +1,100 @@
+import errno
+import os
+from pathlib import Path
+
+import pytest
+
+from agent_feedback import workspace
+from agent_feedback.workspace import retire_workspace, seed_workspace
+
+
+@pytest.fixture
+def template(tmp_path: Path) -> Path:
+    root = tmp_path / "template"
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "README.md").write_text("readme")
+    (root / "src" / "pkg" / "mod.py").write_text("x = 1\n")
+    (root / "empty").mkdir()
+    os.symlink("README.md", root / "link.md")
+    os.symlink("src", root / "src-link")
+    return root
+
+
+def _tree(root: Path) -> dict[str, str]:
+    return {
+        str(p.relative_to(root)): (f"-> {os.readlink(p)}" if p.is_symlink() else p.read_text() if p.is_file() else "/")
+        for p in root.rglob("*")
+    }
+
+
+class TestSeedWorkspace:
+    @pytest.mark.parametrize("mode", ["auto", "reflink", "hardlink", "copy"])
+    def test_reproduces_tree(self, tmp_path: Path, template: Path, mode: str):
+        dest = tmp_path / "agent-1"
+        stats = seed_workspace(template, dest, mode)
+        assert _tree(dest) == _tree(template)
+        assert stats.files == 2 and stats.kept == 0
+
+    def test_copy_is_independent(self, tmp_path: Path, template: Path):
+        dest = tmp_path / "agent-1"
+        assert seed_workspace(template, dest, "copy").copied == 2
+        (dest / "README.md").write_text("changed")
+        assert (template / "README.md").read_text() == "readme"
+
+    def test_hardlink_shares_inodes(self, tmp_path: Path, template: Path):
+        dest = tmp_path / "agent-1"
+        assert seed_workspace(template, dest, "hardlink").hardlinked == 2
+        assert (dest / "README.md").stat().st_ino == (template / "README.md").stat().st_ino
+
+    def test_keeps_existing_files(self, tmp_path: Path, template: Path):
+        dest = tmp_path / "agent-1"
+        dest.mkdir()
+        (dest / "README.md").write_text("agent's own")
+        stats = seed_workspace(template, dest, "copy")
+        assert (dest / "README.md").read_text() == "agent's own"
+        assert stats.kept == 1 and stats.copied == 1
+
+    def test_unsupported_reflink_falls_back_to_copy_once(
+        self, tmp_path: Path, template: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        calls = []
+
+        def no_reflink(src: Path, dst: Path) -> None:
+            calls.append(src)
+            raise OSError(errno.EOPNOTSUPP, "not supported")
+
+        monkeypatch.setattr(workspace, "_reflink", no_reflink)
+        stats = seed_workspace(template, tmp_path / "agent-1", "reflink")
+        assert stats.copied == 2 and len(calls) == 1
+
+    def test_cross_device_hardlink_falls_back_to_copy(
+        self, tmp_path: Path, template: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        def cross_device(src: Path, dst: Path) -> None:
+            raise OSError(errno.EXDEV, "cross-device link")
+
+        monkeypatch.setattr(workspace.os, "link", cross_device)
+        assert seed_workspace(template, tmp_path / "agent-1", "hardlink").copied == 2
+
+    def test_unknown_mode(self, tmp_path: Path, template: Path):
+        with pytest.raises(ValueError, match="Unknown link mode"):
+            seed_workspace(template, tmp_path / "agent-1", "symlink")
+
+
+class TestRetireWorkspace:
+    def test_moves_aside_then_deletes(self, tmp_path: Path, template: Path):
+        thread = retire_workspace(template)
+        assert not template.exists()
+        template.mkdir()  # The name is free again at once.
+        thread.join()
+        assert [p.name for p in tmp_path.iterdir()] == ["template"]
+
+    def test_nothing_to_delete(self, tmp_path: Path):
+        assert retire_workspace(tmp_path / "missing") is None
+
+    def test_sweeps_unfinished_retirements(self, tmp_path: Path):
+        leftover = tmp_path / ".workspace.trash-0000"
+        (leftover / "deep").mkdir(parents=True)
+        thread = retire_workspace(tmp_path / "workspace")
+        thread.join()
+        assert not leftover.exists()